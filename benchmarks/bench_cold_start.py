@@ -0,0 +1,148 @@
+"""Cold start: import time of the app and time to first response.
+
+Run from the repo root (needs the full requirements: uvicorn, mcp, httpx):
+    python -m benchmarks.bench_cold_start
+    python -m benchmarks.bench_cold_start --runs 5 --modes blocking background off
+
+Import time is `python -X importtime -c "import main"` in a fresh process,
+reported as wall time plus the modules with the largest cumulative import
+cost. Time to first response starts `uvicorn main:app` against the local
+fakes from bench_load (fake OpenAI, MCP and Zoho) once per WARMUP_MODE and
+measures, from process spawn:
+
+    listening   the port accepts connections (lifespan startup finished)
+    first_chat  the first POST /chat returned an answer
+    second_chat the next one, for comparison with a warm process
+
+Results go to benchmarks/results/cold-start-<timestamp>.json.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.bench_load import RESULTS_DIR, free_port, spawn, stop_stack, wait_for_port
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+QUERY = "Which deals from referrals are most likely to close soon and who owns them?"
+
+
+def import_profile(module: str = "main", top: int = 12) -> dict:
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT,
+                            capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    modules = []
+    for line in result.stderr.splitlines():
+        m = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)", line)
+        if m:
+            modules.append({"module": m.group(3), "self_ms": int(m.group(1)) / 1000,
+                            "cumulative_ms": int(m.group(2)) / 1000})
+    # A top-level package's cumulative time already includes its submodules.
+    roots = {}
+    for entry in modules:
+        if "." not in entry["module"] and entry["module"] != module:
+            roots[entry["module"]] = max(roots.get(entry["module"], 0), entry["cumulative_ms"])
+    ranked = sorted(roots.items(), key=lambda item: -item[1])[:top]
+    return {"wall_ms": round(wall * 1000, 1), "top": [{"package": n, "cumulative_ms": round(ms, 1)} for n, ms in ranked]}
+
+
+def start_fakes(args) -> tuple:
+    zoho_port, mcp_port, openai_port = free_port(), free_port(), free_port()
+    processes = []
+    try:
+        zoho = spawn(["benchmarks.fake_zoho", "--port", str(zoho_port), "--latency", str(args.zoho_latency)])
+        processes.append(zoho)
+        wait_for_port(zoho_port, zoho, "fake_zoho")
+        mcp = spawn(["benchmarks.fake_mcp", "--port", str(mcp_port), "--zoho", f"http://127.0.0.1:{zoho_port}"])
+        processes.append(mcp)
+        wait_for_port(mcp_port, mcp, "fake_mcp")
+        openai = spawn(["benchmarks.fake_openai", "--port", str(openai_port), "--latency", str(args.llm_latency)])
+        processes.append(openai)
+        wait_for_port(openai_port, openai, "fake_openai")
+    except Exception:
+        stop_stack(processes)
+        raise
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": "bench",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{openai_port}/v1",
+        "MCP_SSE_URL": f"http://127.0.0.1:{mcp_port}/sse",
+        "SHARED_STATE_URL": "memory://",
+        "ZOHO_CLIENT_ID": "",
+        "ZOHO_CLIENT_SECRET": "",
+        "PLAN_CACHE_ENABLED": "false",
+        "FILTER_CACHE_TTL": "0",
+        "RECORDS_CACHE_TTL": "0",
+    }
+    return processes, env
+
+
+def first_response(env: dict, mode: str, timeout: float = 120) -> dict:
+    port = free_port()
+    started = time.perf_counter()
+    app = spawn(["uvicorn", "main:app", "--port", str(port), "--log-level", "warning"], env={**env, "WARMUP_MODE": mode})
+    try:
+        wait_for_port(port, app, "uvicorn main:app", timeout=timeout)
+        listening = time.perf_counter() - started
+        timings = {"listening_ms": round(listening * 1000, 1)}
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=timeout) as client:
+            for name in ("first_chat_ms", "second_chat_ms"):
+                request_start = time.perf_counter()
+                response = client.post("/chat", json={"query": QUERY})
+                response.raise_for_status()
+                done = time.perf_counter()
+                timings[name] = round((done - started) * 1000, 1)
+                timings[name.replace("_ms", "_request_ms")] = round((done - request_start) * 1000, 1)
+        return timings
+    finally:
+        stop_stack([app])
+
+
+def median_of(runs: list) -> dict:
+    return {key: round(statistics.median(run[key] for run in runs), 1) for key in runs[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--modes", nargs="+", default=["blocking", "background", "off"])
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--zoho-latency", type=float, default=0.05)
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    imports = [import_profile() for _ in range(args.runs)]
+    print(f"import main: median {statistics.median(i['wall_ms'] for i in imports):.0f} ms (fresh interpreter, wall)")
+    for entry in imports[-1]["top"]:
+        print(f"  {entry['package']:<28} {entry['cumulative_ms']:>8.1f} ms")
+
+    processes, env = start_fakes(args)
+    results = {}
+    try:
+        print(f"\n{'WARMUP_MODE':<12} {'listening':>10} {'1st /chat':>10} {'1st req':>9} {'2nd req':>9}   (ms from spawn / per request)")
+        for mode in args.modes:
+            results[mode] = median_of([first_response(env, mode) for _ in range(args.runs)])
+            r = results[mode]
+            print(f"{mode:<12} {r['listening_ms']:>10.0f} {r['first_chat_ms']:>10.0f} "
+                  f"{r['first_chat_request_ms']:>9.0f} {r['second_chat_request_ms']:>9.0f}")
+    finally:
+        stop_stack(processes)
+
+    out = args.out or os.path.join(RESULTS_DIR, time.strftime("cold-start-%Y%m%d-%H%M%S.json"))
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump({"created_at": time.time(), "imports": imports, "first_response": results}, f, indent=2)
+    print(f"\nsaved {os.path.relpath(out)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Aggregate questions: paging through search results vs one COQL query.
+
+Run from the repo root:
+    python -m benchmarks.bench_coql
+
+Starts benchmarks.fake_zoho with a fixed per-request latency and answers
+each question twice: by paging every matching record into the analytics
+table (the search backend) and by asking the server for the aggregate
+(services.coql). Both answers must match; bytes are response bodies as
+received by the client.
+"""
+import asyncio
+import json
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks.fake_zoho import FakeZoho
+from services.analytics import RecordTable, answer, answer_aggregate, parse_intent
+from services.coql import COQL_PATH, build_coql, parse_aggregate
+from services.query_compiler import compile_query
+from services.zoho_pagination import PageStats, iter_pages, page_url
+from langgraph.graph_agent import build_criteria
+
+LATENCY = 0.08
+RECORDS = 5000
+QUESTIONS = [
+    ("how many deals over 50k", "deals over 50k"),
+    ("total amount of deals in closed won stage", "deals in closed won stage"),
+    ("average deal amount for deals with probability over 50", "deals with probability over 50"),
+    ("deals over 10k by stage", "deals over 10k"),
+    ("how many leads with status Contacted", "leads with status Contacted"),
+]
+
+
+def _request(url: str, body: dict = None):
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(url.replace(" ", "%20"), data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request) as response:
+            raw = response.read()
+    except urllib.error.HTTPError as e:
+        return {"error": f"HTTP {e.code}"}, 0
+    return {"results": json.loads(raw) if raw else None}, len(raw)
+
+
+async def via_search(server, module, filters, intent):
+    received = 0
+
+    async def fetch(url):
+        nonlocal received
+        result, nbytes = await asyncio.to_thread(_request, url)
+        received += nbytes
+        return result
+
+    url = page_url(f"{server.url}/crm/v7/{module}/search?criteria={build_criteria(filters)}", 1)
+    table, stats = RecordTable(), PageStats()
+    async for page in iter_pages(fetch, url, stats, max_records=RECORDS):
+        table.add_records(page.records)
+    return answer(table, module, intent, complete=not stats.truncated), received, stats.pages
+
+
+async def via_coql(server, module, filters, intent):
+    select_query = build_coql(module, filters, intent)
+    result, received = await asyncio.to_thread(_request, server.url + COQL_PATH, {"select_query": select_query})
+    return answer_aggregate(module, intent, parse_aggregate(result, intent)), received, 1
+
+
+async def main():
+    server = FakeZoho(records=RECORDS, latency=LATENCY).start()
+    try:
+        print(f"fake Zoho: {RECORDS} records per module, {LATENCY * 1000:.0f} ms per request\n")
+        print(f"{'question':<56} {'backend':<8} {'requests':>8} {'bytes':>11} {'time':>8}")
+        totals = {"search": [0, 0.0], "coql": [0, 0.0]}
+        for question, filter_text in QUESTIONS:
+            compiled = compile_query(filter_text)
+            module, filters = compiled["module"], compiled["filters"]
+            intent = parse_intent(question, module)
+            answers = []
+            for backend, run in (("search", via_search), ("coql", via_coql)):
+                started = time.perf_counter()
+                text, received, requests = await run(server, module, filters, intent)
+                elapsed = time.perf_counter() - started
+                totals[backend][0] += received
+                totals[backend][1] += elapsed
+                answers.append(text)
+                label = question if backend == "search" else ""
+                print(f"{label:<56} {backend:<8} {requests:>8} {received:>11,} {elapsed * 1000:>6.0f}ms")
+            assert answers[0] == answers[1], f"answers differ:\n{answers[0]}\n{answers[1]}"
+
+        print()
+        for backend, (received, elapsed) in totals.items():
+            print(f"{backend:<8} total {received:>11,} bytes {elapsed * 1000:>7.0f}ms")
+        print("all answers identical across backends")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,40 @@
+"""Per-request graph overhead: rebuilding with build_graph() vs the shared registry.
+
+Run from the repo root:
+    python -m benchmarks.bench_graph_registry [iterations]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+from langgraph.graph_agent import build_graph
+from services.agent_runner import get_graph, init_graph
+
+
+async def time_calls(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(name, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{name:<24} mean={statistics.mean(samples):8.3f}ms  p50={statistics.median(samples):8.3f}ms  p95={p95:8.3f}ms")
+
+
+async def main(iterations):
+    await init_graph()
+    rebuild = await time_calls(build_graph, iterations)
+    shared = await time_calls(get_graph, iterations)
+    report("build_graph per request", rebuild)
+    report("shared compiled graph", shared)
+    print(f"overhead removed per request: {statistics.mean(rebuild) - statistics.mean(shared):.3f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
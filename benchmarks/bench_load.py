@@ -0,0 +1,303 @@
+"""End-to-end load test of POST /chat against local fakes of every dependency.
+
+Run from the repo root (needs the full requirements: uvicorn, mcp, httpx):
+    python -m benchmarks.bench_load
+    python -m benchmarks.bench_load --concurrency 1 8 32 128 --seconds 20 --llm-latency 0.5
+    python -m benchmarks.bench_load --compare benchmarks/results/load-20261018-101500.json
+
+Starts benchmarks.fake_zoho, benchmarks.fake_mcp (proxying to it) and
+benchmarks.fake_openai as subprocesses, then `uvicorn main:app` with
+OPENAI_BASE_URL and MCP_SSE_URL pointing at them. For each concurrency level
+it keeps that many requests in flight for `seconds`, drawing queries from a
+mix of fast-path phrasings (query_compiler_corpus.json) and free-form
+questions that need the LLM planner.
+
+Caches, the plan cache and request coalescing are off by default so every
+request does the full work; --warm leaves them at their defaults. Per-stage
+time comes from the difference in /metrics before and after each level
+(graph_node_seconds per node, external_call_seconds per service/op).
+
+Results are written to benchmarks/results/load-<timestamp>.json (or --out)
+together with the settings used; --compare prints the change against an
+earlier file.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(HERE, "results")
+
+FREE_FORM = [
+    "Which deals from referrals are most likely to close soon and who owns them?",
+    "Give me an overview of the leads we have contacted that come from large companies",
+    "Who are our contacts in Pune and what are their job titles?",
+    "What does the pipeline look like for deals in negotiation with a high win probability?",
+    "Find leads from trade shows that we have not contacted yet and summarise them",
+    "Tell me about the biggest open deals owned by Priya",
+]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def load_queries(llm_share: float, n: int = 200, seed: int = 11) -> list:
+    with open(os.path.join(HERE, "query_compiler_corpus.json")) as f:
+        fast = [case["query"] for case in json.load(f) if case.get("expected")]
+    rng = random.Random(seed)
+    return [rng.choice(FREE_FORM) if rng.random() < llm_share else rng.choice(fast) for _ in range(n)]
+
+
+def percentile(samples: list, q: float):
+    if not samples:
+        return None
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, max(0, int(round(q * len(samples))) - 1))]
+
+
+# -- processes ---------------------------------------------------------------
+
+def spawn(args: list, env: dict = None) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, "-m", *args], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_for_port(port: int, process: subprocess.Popen, name: str, timeout: float = 60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{name} exited with code {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{name} did not start on port {port}")
+
+
+def start_stack(args) -> tuple:
+    zoho_port, mcp_port, openai_port, app_port = (free_port() for _ in range(4))
+    processes = []
+    try:
+        zoho = spawn(["benchmarks.fake_zoho", "--port", str(zoho_port), "--records", str(args.records),
+                      "--latency", str(args.zoho_latency)])
+        processes.append(zoho)
+        wait_for_port(zoho_port, zoho, "fake_zoho")
+
+        mcp = spawn(["benchmarks.fake_mcp", "--port", str(mcp_port), "--zoho", f"http://127.0.0.1:{zoho_port}",
+                     "--latency", str(args.mcp_latency)] + (["--coql"] if args.coql else []))
+        processes.append(mcp)
+        wait_for_port(mcp_port, mcp, "fake_mcp")
+
+        openai = spawn(["benchmarks.fake_openai", "--port", str(openai_port), "--latency", str(args.llm_latency),
+                        "--per-token", str(args.llm_per_token)])
+        processes.append(openai)
+        wait_for_port(openai_port, openai, "fake_openai")
+
+        env = {
+            **os.environ,
+            "OPENAI_API_KEY": "bench",
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{openai_port}/v1",
+            "MCP_SSE_URL": f"http://127.0.0.1:{mcp_port}/sse",
+            "SHARED_STATE_URL": "memory://",
+            "ZOHO_CLIENT_ID": "",
+            "ZOHO_CLIENT_SECRET": "",
+            "TRACE_SAMPLE_RATE": "0",
+        }
+        if not args.warm:
+            env.update({
+                "PLAN_CACHE_ENABLED": "false",
+                "FILTER_CACHE_TTL": "0",
+                "RECORDS_CACHE_TTL": "0",
+                "CHAT_COALESCING_ENABLED": "false",
+            })
+        app = spawn(["uvicorn", "main:app", "--port", str(app_port), "--workers", str(args.workers),
+                     "--log-level", "warning"], env=env)
+        processes.append(app)
+        wait_for_port(app_port, app, "uvicorn main:app", timeout=120)
+        return processes, app_port
+    except Exception:
+        stop_stack(processes)
+        raise
+
+
+def stop_stack(processes: list):
+    for process in reversed(processes):
+        process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+# -- /metrics ----------------------------------------------------------------
+
+_SAMPLE = re.compile(r"^(\w+)\{(.*)\} ([0-9.eE+-]+|NaN)$")
+
+
+def scrape(text: str) -> dict:
+    """{(name, labels): value} for the histogram _sum/_count series we break down."""
+    samples = {}
+    for line in text.splitlines():
+        m = _SAMPLE.match(line)
+        if not m or not m.group(1).endswith(("_sum", "_count")):
+            continue
+        labels = tuple(sorted(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', m.group(2))))
+        samples[(m.group(1), labels)] = float(m.group(3))
+    return samples
+
+
+def stage_breakdown(before: dict, after: dict, requests: int) -> dict:
+    """Mean seconds per call and per request for each node and external call."""
+    stages = {}
+    for (name, labels), total in after.items():
+        if not name.endswith("_sum"):
+            continue
+        base = name[:-4]
+        if base == "graph_node_seconds":
+            stage = "node:" + dict(labels).get("node", "?")
+        elif base == "external_call_seconds":
+            stage = "{service}:{op}".format(**{"service": "?", "op": "?", **dict(labels)})
+        else:
+            continue
+        seconds = total - before.get((name, labels), 0)
+        calls = after.get((base + "_count", labels), 0) - before.get((base + "_count", labels), 0)
+        if calls:
+            stages[stage] = {
+                "calls": int(calls),
+                "mean_ms": round(seconds / calls * 1000, 2),
+                "ms_per_request": round(seconds / max(requests, 1) * 1000, 2),
+            }
+    return dict(sorted(stages.items(), key=lambda item: -item[1]["ms_per_request"]))
+
+
+# -- load --------------------------------------------------------------------
+
+async def run_level(client: httpx.AsyncClient, queries: list, concurrency: int, seconds: float) -> dict:
+    latencies, statuses, errors = [], defaultdict(int), 0
+    cursor = iter(range(10 ** 9))
+    deadline = time.perf_counter() + seconds
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            query = queries[next(cursor) % len(queries)]
+            start = time.perf_counter()
+            try:
+                response = await client.post("/chat", json={"query": query})
+                elapsed = time.perf_counter() - start
+                statuses[response.status_code] += 1
+                if response.status_code == 200 and "error" not in (response.json().get("tool_output") or {}):
+                    latencies.append(elapsed)
+                else:
+                    errors += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "statuses": {str(k): v for k, v in statuses.items()},
+        "rps": round(len(latencies) / wall, 2),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1) if latencies else None,
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1) if latencies else None,
+    }
+
+
+async def drive(port: int, args) -> list:
+    queries = load_queries(args.llm_share)
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=args.timeout, limits=limits) as client:
+        # Warm-up: connect the MCP pool and touch every code path once.
+        for query in queries[:5]:
+            await client.post("/chat", json={"query": query})
+
+        levels = []
+        for concurrency in args.concurrency:
+            before = scrape((await client.get("/metrics")).text)
+            level = await run_level(client, queries, concurrency, args.seconds)
+            after = scrape((await client.get("/metrics")).text)
+            level["stages"] = stage_breakdown(before, after, level["requests"])
+            levels.append(level)
+            print(f"{concurrency:>11} {level['rps']:>8.1f} {level['p50_ms'] or 0:>8.0f} {level['p95_ms'] or 0:>8.0f} "
+                  f"{level['p99_ms'] or 0:>8.0f} {level['errors']:>7}")
+        return levels
+
+
+def print_stages(levels: list, top: int = 8):
+    for level in levels:
+        print(f"\nconcurrency {level['concurrency']}: where a request spends its time")
+        for stage, s in list(level["stages"].items())[:top]:
+            print(f"  {stage:<40} {s['ms_per_request']:>9.1f} ms/request  ({s['calls']} calls, mean {s['mean_ms']:.1f} ms)")
+
+
+def compare(levels: list, previous_path: str):
+    with open(previous_path) as f:
+        previous = {level["concurrency"]: level for level in json.load(f)["levels"]}
+    print(f"\nvs {os.path.relpath(previous_path)}")
+    print(f"{'concurrency':>11} {'req/s':>16} {'p95 ms':>18}")
+    for level in levels:
+        old = previous.get(level["concurrency"])
+        if old is None or not old["rps"] or not old["p95_ms"] or level["p95_ms"] is None:
+            continue
+        print(f"{level['concurrency']:>11} {level['rps']:>8.1f} ({(level['rps'] / old['rps'] - 1) * 100:+5.0f}%) "
+              f"{level['p95_ms']:>9.0f} ({(level['p95_ms'] / old['p95_ms'] - 1) * 100:+5.0f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--llm-share", type=float, default=0.5, help="share of free-form (LLM-planned) queries")
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--llm-per-token", type=float, default=0.0)
+    parser.add_argument("--mcp-latency", type=float, default=0.1)
+    parser.add_argument("--zoho-latency", type=float, default=0.05)
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--coql", action="store_true", help="let fetch_zoho_results take COQL bodies")
+    parser.add_argument("--warm", action="store_true", help="leave caches and coalescing enabled")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--out", help="results file (default benchmarks/results/load-<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    processes, port = start_stack(args)
+    try:
+        print(f"{'concurrency':>11} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        levels = asyncio.run(drive(port, args))
+    finally:
+        stop_stack(processes)
+    print_stages(levels)
+
+    out = args.out or os.path.join(RESULTS_DIR, time.strftime("load-%Y%m%d-%H%M%S.json"))
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump({"created_at": time.time(), "settings": vars(args), "levels": levels}, f, indent=2)
+    print(f"\nsaved {os.path.relpath(out)}")
+    if args.compare:
+        compare(levels, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Zoho search pagination: one page vs sequential vs concurrent page fetches.
+
+Run from the repo root:
+    python -m benchmarks.bench_pagination
+
+Starts benchmarks.fake_zoho on a local port with a fixed per-request
+latency and reads full result sets through services.zoho_pagination the way
+tool_use_step does. `requests` counts what the server saw, including pages
+requested past the end of the result set. Every run is checked against the fake server's own
+count, so this doubles as a correctness check for page ordering and the
+record/byte caps.
+"""
+import asyncio
+import json
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks.fake_zoho import FakeZoho, matches_criteria
+from services.zoho_pagination import PageStats, iter_pages, page_url
+
+LATENCY = 0.08
+RECORDS = 3000
+CRITERIA = ["(Amount:greater_than:0)", "(Amount:greater_than:125000)", "(Stage:equals:Closed Won)"]
+
+
+def _get(url: str):
+    try:
+        with urllib.request.urlopen(url.replace(" ", "%20")) as response:
+            body = response.read()
+    except urllib.error.HTTPError as e:
+        return {"error": f"HTTP {e.code}"}
+    return {"results": json.loads(body) if body else None}
+
+
+async def fetch(url: str):
+    return await asyncio.to_thread(_get, url)
+
+
+async def read_all(url: str, **kwargs):
+    stats = PageStats()
+    ids = []
+    started = time.perf_counter()
+    async for page in iter_pages(fetch, url, stats, **kwargs):
+        ids.extend(r["id"] for r in page.records)
+    return ids, stats, time.perf_counter() - started
+
+
+async def main():
+    server = FakeZoho(records=RECORDS, latency=LATENCY).start()
+    try:
+        print(f"fake Zoho: {RECORDS} records per module, {LATENCY * 1000:.0f} ms per request\n")
+        print(f"{'criteria':<32} {'mode':<20} {'records':>8} {'pages':>6} {'requests':>9} {'time':>9}")
+        for criteria in CRITERIA:
+            expected = [r["id"] for r in server.data["Deals"] if matches_criteria(r, criteria)]
+            url = f"{server.url}/crm/v7/Deals/search?criteria={criteria}"
+
+            started = time.perf_counter()
+            single = _get(page_url(url, 1, 15))
+            elapsed = time.perf_counter() - started
+            print(f"{criteria:<32} {'old (1 x 15)':<20} {len(single['results']['data']):>8} {1:>6} {1:>9} {elapsed * 1000:>7.0f}ms")
+
+            for label, concurrency, read_ahead in (("sequential", 1, 0), ("read-ahead 1", 4, 1),
+                                                   ("read-ahead 3", 4, 3), ("read-ahead 7", 8, 7)):
+                before = server.requests
+                ids, stats, elapsed = await read_all(url, concurrency=concurrency, read_ahead=read_ahead,
+                                                     max_records=RECORDS)
+                await asyncio.sleep(LATENCY * 2)  # let requests past the end land
+                assert ids == expected, f"{label}: got {len(ids)} records, expected {len(expected)}"
+                assert not stats.truncated and not stats.error
+                assert server.requests - before <= stats.pages + read_ahead
+                print(f"{'':<32} {label:<20} {stats.records:>8} {stats.pages:>6} {server.requests - before:>9} "
+                      f"{elapsed * 1000:>7.0f}ms")
+
+        url = f"{server.url}/crm/v7/Deals/search?criteria=(Amount:greater_than:0)"
+        ids, stats, _ = await read_all(url, max_records=500)
+        assert len(ids) == 500 and stats.truncated, "record cap not enforced"
+        ids, stats, _ = await read_all(url, max_bytes=200_000)
+        assert stats.truncated and stats.bytes <= 200_000 and len(ids) < RECORDS, "byte cap not enforced"
+        ids, stats, _ = await read_all(f"{server.url}/crm/v7/Deals/search?criteria=(Amount:less_than:0)")
+        assert ids == [] and stats.pages == 1 and not stats.truncated, "empty result mishandled"
+        ids, stats, _ = await read_all(f"{server.url}/crm/v7/Nope/search?criteria=(Amount:less_than:0)")
+        assert ids == [] and stats.error, "error page mishandled"
+        print("\ncaps: record cap, byte cap, empty (204) and error responses OK")
+        print(f"fake server handled {server.requests} requests, {server.bytes_sent / 1e6:.1f} MB")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,69 @@
+"""Hit rate, accuracy and latency of the rule-based fast path.
+
+Run from the repo root:
+    python -m benchmarks.bench_query_compiler [--llm-ms 1200]
+
+`--llm-ms` is the assumed latency of one gpt-4.1-mini call; every fast-path
+hit skips two of them (reasoning_step and the filter LLM call).
+"""
+import argparse
+import json
+import os
+import time
+
+from services.query_compiler import compile_query
+
+CORPUS = os.path.join(os.path.dirname(__file__), "query_compiler_corpus.json")
+
+
+def as_triples(compiled):
+    return [[f.key, f.value.operator.value, f.value.value] for f in compiled["filters"]]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--llm-ms", type=float, default=1200.0)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with open(CORPUS) as f:
+        corpus = json.load(f)
+
+    hits = correct = false_positives = 0
+    for case in corpus:
+        compiled = compile_query(case["query"])
+        expected = case["expected"]
+        if compiled is None:
+            status = "miss" if expected else "ok (llm)"
+        else:
+            hits += 1
+            got = {"module": compiled["module"], "filters": as_triples(compiled)}
+            if expected is None:
+                false_positives += 1
+                status = f"FALSE POSITIVE {got}"
+            elif got == expected:
+                correct += 1
+                status = "ok (fast)"
+            else:
+                status = f"WRONG {got}"
+        print(f"{status:<16} {case['query']}")
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for case in corpus:
+            compile_query(case["query"])
+    per_query_ms = (time.perf_counter() - start) * 1000 / (args.repeat * len(corpus))
+
+    expected_hits = sum(1 for c in corpus if c["expected"])
+    print()
+    print(f"corpus size:            {len(corpus)}")
+    print(f"fast-path hit rate:     {hits / len(corpus):.1%} ({hits}/{len(corpus)})")
+    print(f"recall on simple set:   {correct / expected_hits:.1%} ({correct}/{expected_hits})")
+    print(f"precision:              {correct / hits:.1%}" if hits else "precision:              n/a")
+    print(f"false positives:        {false_positives}")
+    print(f"compile latency:        {per_query_ms:.3f}ms/query")
+    print(f"LLM latency saved/hit:  ~{2 * args.llm_ms - per_query_ms:.0f}ms (2 calls x {args.llm_ms:.0f}ms)")
+
+
+if __name__ == "__main__":
+    main()
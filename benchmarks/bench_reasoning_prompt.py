@@ -0,0 +1,68 @@
+"""Prompt tokens per request for reasoning_step: all module docs vs the local pre-router.
+
+The corpus is free-form questions that reach reasoning: none compiles on the
+fast path or names its module, so the "no docs" case should not occur. Each
+has the module a person would pick, to count one-doc prompts that send the
+wrong doc.
+
+Run from the repo root:
+    python -m benchmarks.bench_reasoning_prompt
+
+Token counts use tiktoken's o200k_base encoding when it is installed and
+fall back to ~4 characters per token otherwise.
+"""
+import json
+import os
+import statistics
+
+from langgraph.graph_agent import build_reasoning_prompt, current_date
+from services.query_compiler import compile_query
+from services.query_router import classify_module
+
+CORPUS = os.path.join(os.path.dirname(__file__), "reasoning_corpus.json")
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("o200k_base")
+
+    def count_tokens(text):
+        return len(_encoding.encode(text))
+except ImportError:
+    def count_tokens(text):
+        return len(text) // 4
+
+
+def main():
+    with open(CORPUS) as f:
+        cases = json.load(f)
+    # Anything the fast path answers never builds a reasoning prompt.
+    queries = [case["query"] for case in cases if compile_query(case["query"]) is None]
+    expected = {case["query"]: case["module"] for case in cases}
+
+    today = current_date()
+    full, routed, modes = [], [], {"no docs": 0, "one doc": 0, "all docs": 0}
+    wrong_doc = 0
+    for query in queries:
+        full_prompt, _ = build_reasoning_prompt(query, today, routed=False)
+        routed_prompt, pinned = build_reasoning_prompt(query, today, routed=True)
+        full.append(count_tokens(full_prompt))
+        routed.append(count_tokens(routed_prompt))
+        if pinned:
+            modes["no docs"] += 1
+        elif len(routed_prompt) < len(full_prompt):
+            modes["one doc"] += 1
+            wrong_doc += classify_module(query)[0] != expected[query]
+        else:
+            modes["all docs"] += 1
+        print(f"{full[-1]:>6} -> {routed[-1]:>6} tokens  {query}")
+
+    saved = [a - b for a, b in zip(full, routed)]
+    print()
+    print(f"queries:                 {len(queries)}/{len(cases)} reach reasoning  ({', '.join(f'{k}: {v}' for k, v in modes.items())})")
+    print(f"one doc, wrong module:   {wrong_doc}/{modes['one doc']}")
+    print(f"mean prompt tokens:      {statistics.mean(full):.0f} -> {statistics.mean(routed):.0f}")
+    print(f"mean tokens saved/req:   {statistics.mean(saved):.0f} ({statistics.mean(saved) / statistics.mean(full):.1%})")
+
+
+if __name__ == "__main__":
+    main()
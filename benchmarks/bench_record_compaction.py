@@ -0,0 +1,39 @@
+"""Summary prompt size and serialization time: indented JSON vs compact rows.
+
+Run from the repo root:
+    python -m benchmarks.bench_record_compaction
+
+Uses the synthetic Deals records served by benchmarks.fake_zoho (owner and
+account lookups, system fields, `$`-prefixed metadata). Prompt tokens are
+estimated at ~4 characters per token; time-to-first-token of the summary
+call grows with these prompt sizes.
+"""
+import json
+import time
+
+from benchmarks.fake_zoho import make_records
+from services.record_compactor import compact_records, estimate_tokens
+
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best * 1000
+
+
+def main():
+    print(f"{'records':>8} {'json tokens':>12} {'json ms':>8} {'compact tokens':>15} {'compact ms':>11} {'shown':>7} {'reduction':>10}")
+    for n in (15, 200, 2000):
+        records = make_records("Deals", n)
+        json_text, json_ms = timed(lambda records=records: json.dumps(records, indent=2))
+        (compact_text, shown, total), compact_ms = timed(lambda records=records: compact_records(records, "Deals", ["Amount"]))
+        json_tokens, compact_tokens = estimate_tokens(json_text), estimate_tokens(compact_text)
+        print(f"{n:>8} {json_tokens:>12} {json_ms:>8.2f} {compact_tokens:>15} {compact_ms:>11.2f} "
+              f"{shown:>7} {1 - compact_tokens / json_tokens:>10.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Per-commit latency and CPU cost of the /chat pipeline, replayed from a cassette.
+
+Record once against live services (OPENAI_API_KEY and a reachable MCP server):
+    python -m benchmarks.bench_replay --record
+
+then on any commit, with no network:
+    python -m benchmarks.bench_replay                      # recorded latencies
+    python -m benchmarks.bench_replay --latency zero       # CPU-side cost only
+    python -m benchmarks.bench_replay --compare benchmarks/results/replay-<commit>-<time>.json
+
+Runs every query in replay_corpus.json through agent_runner.run_agent (what
+POST /chat calls) in this process, `--repeat` times each. OpenAI and MCP calls
+are answered from services/cassette.py; caches, the plan cache and request
+coalescing are off so every run does the same work that was recorded. For
+each query it reports wall time and process CPU time; with --latency zero the
+wall time is the pipeline's own overhead.
+
+Results go to benchmarks/results/replay-<commit>-<timestamp>.json.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(HERE, "results")
+
+
+def configure(args):
+    # Must run before any app module reads config.settings.
+    os.environ.update({
+        "CASSETTE_MODE": "record" if args.record else "replay",
+        "CASSETTE_PATH": args.cassette,
+        "CASSETTE_LATENCY": args.latency,
+        "PLAN_CACHE_ENABLED": "false",
+        "FILTER_CACHE_TTL": "0",
+        "RECORDS_CACHE_TTL": "0",
+        "CHAT_COALESCING_ENABLED": "false",
+        "SHARED_STATE_URL": "memory://",
+        "TRACE_SAMPLE_RATE": "0",
+        "MCP_POOL_SIZE": "1",
+        "MCP_HEALTHCHECK_INTERVAL": "0",
+    })
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run(queries: list, repeat: int) -> dict:
+    from services.agent_runner import init_graph, run_agent
+    from services.cassette import cassette
+    from services.mcp_pool import mcp_pool
+
+    await init_graph()
+    await mcp_pool.start()
+    results = {}
+    try:
+        for query in queries:
+            wall, cpu, errors = [], [], []
+            for _ in range(repeat):
+                wall_start, cpu_start = time.perf_counter(), time.process_time()
+                result = await run_agent(query)
+                wall.append(time.perf_counter() - wall_start)
+                cpu.append(time.process_time() - cpu_start)
+                error = result["tool_output"].get("error")
+                if error:
+                    errors.append(error)
+            results[query] = {
+                "path": result["tool_output"].get("path"),
+                "wall_ms": round(statistics.median(wall) * 1000, 2),
+                "cpu_ms": round(statistics.median(cpu) * 1000, 2),
+                "errors": len(errors),
+                "error": errors[0] if errors else None,
+            }
+            print(f"{results[query]['wall_ms']:>9.1f} {results[query]['cpu_ms']:>8.1f} {len(errors):>6}  {query[:70]}")
+    finally:
+        await mcp_pool.close()
+    return {"queries": results, "cassette": cassette.stats()}
+
+
+def compare(current: dict, previous_path: str):
+    with open(previous_path) as f:
+        previous = json.load(f)
+    print(f"\nvs {previous['commit']} ({os.path.relpath(previous_path)})")
+    for key in ("wall_ms", "cpu_ms"):
+        old, new = previous["totals"][key], current["totals"][key]
+        print(f"  total {key:<8} {old:>9.1f} -> {new:>9.1f}  ({(new / old - 1) * 100 if old else 0:+.1f}%)")
+    for query, new in current["queries"].items():
+        old = previous["queries"].get(query)
+        if old and old["cpu_ms"]:
+            change = (new["cpu_ms"] / old["cpu_ms"] - 1) * 100
+            if abs(change) >= 10:
+                print(f"  {change:+6.0f}% cpu  {query[:70]}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--record", action="store_true", help="call the live services and write the cassette")
+    parser.add_argument("--latency", choices=["original", "zero"], default="original")
+    parser.add_argument("--cassette", default=os.path.join(HERE, "cassettes", "corpus.jsonl"))
+    parser.add_argument("--corpus", default=os.path.join(HERE, "replay_corpus.json"))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out")
+    parser.add_argument("--compare")
+    args = parser.parse_args()
+    configure(args)
+
+    with open(args.corpus) as f:
+        queries = json.load(f)
+    # One live pass is enough to record; identical calls replay their recordings in turn.
+    repeat = 1 if args.record else args.repeat
+
+    print(f"{'wall ms':>9} {'cpu ms':>8} {'errors':>6}  query")
+    report = asyncio.run(run(queries, repeat))
+    rows = report["queries"].values()
+    report.update({
+        "commit": git_commit(),
+        "created_at": time.time(),
+        "mode": "record" if args.record else f"replay/{args.latency}",
+        "repeat": repeat,
+        "totals": {
+            "wall_ms": round(sum(r["wall_ms"] for r in rows), 2),
+            "cpu_ms": round(sum(r["cpu_ms"] for r in rows), 2),
+            "errors": sum(r["errors"] for r in rows),
+        },
+    })
+    print(f"{report['totals']['wall_ms']:>9.1f} {report['totals']['cpu_ms']:>8.1f} {report['totals']['errors']:>6}  total"
+          f"  (cassette misses: {report['cassette']['misses']})")
+    if args.record:
+        print(f"recorded {os.path.relpath(args.cassette)}")
+        return
+
+    out = args.out or os.path.join(RESULTS_DIR, f"replay-{report['commit']}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"saved {os.path.relpath(out)}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""API throughput as uvicorn workers are added, with state shared through sqlite.
+
+Run from the repo root (needs the full requirements, including uvicorn):
+    python -m benchmarks.bench_workers
+    python -m benchmarks.bench_workers --workers 1 2 4 8 --seconds 10 --clients 32
+
+Each run starts `uvicorn main:app --workers N` on a free port, with
+SHARED_STATE_URL pointing at a fresh sqlite file and MCP pointed at a closed
+port, so no MCP, OpenAI or Zoho traffic is involved. It pushes a token
+through /save-token, then `clients` processes call GET /token over
+keep-alive connections for `seconds`. Afterwards a new token is pushed to one
+worker and fresh connections must all see it from whichever worker
+answers: the consistency check that a process-global token could not pass.
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def request(port: int, method: str, path: str, body: dict = None, conn=None):
+    own = conn is None
+    conn = conn or http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    payload = json.dumps(body) if body is not None else None
+    conn.request(method, path, body=payload, headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    data = response.read()
+    if own:
+        conn.close()
+    return response.status, json.loads(data) if data else None
+
+
+def client(port: int, seconds: float):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    done = errors = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        try:
+            status, _ = request(port, "GET", "/token", conn=conn)
+            done += status == 200
+            errors += status != 200
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    conn.close()
+    return done, errors
+
+
+def start_server(workers: int, state_dir: str):
+    port = free_port()
+    env = {
+        **os.environ,
+        "SHARED_STATE_URL": "sqlite:///" + os.path.join(state_dir, "state.db"),
+        "TOKEN_STORE_PATH": os.path.join(state_dir, "no_legacy_token.json"),
+        "MCP_SSE_URL": f"http://127.0.0.1:{free_port()}/sse",
+        "MCP_POOL_SIZE": "1",
+        "MCP_CONNECT_TIMEOUT": "2",
+        "MCP_HEALTHCHECK_INTERVAL": "0",
+        "ZOHO_CLIENT_ID": "",
+        "ZOHO_CLIENT_SECRET": "",
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if request(port, "GET", "/")[0] == 200:
+                # Give the remaining workers a moment to finish their lifespan.
+                time.sleep(1 + 0.25 * workers)
+                return process, port
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"uvicorn with {workers} workers did not start")
+
+
+def run(workers: int, seconds: float, clients: int):
+    with tempfile.TemporaryDirectory() as state_dir:
+        process, port = start_server(workers, state_dir)
+        try:
+            request(port, "POST", "/save-token", {"access_token": "bench-1", "refresh_token": "r", "expires_in": 3600})
+            with ProcessPoolExecutor(clients) as pool:
+                results = list(pool.map(client, [port] * clients, [seconds] * clients))
+            done = sum(r[0] for r in results)
+            errors = sum(r[1] for r in results)
+
+            request(port, "POST", "/save-token", {"access_token": "bench-2", "refresh_token": "r", "expires_in": 3600})
+            seen = {request(port, "GET", "/token")[1]["access_token"] for _ in range(10 * workers)}
+            assert seen == {"bench-2"}, f"workers disagree about the token: {seen}"
+            return done / seconds, errors
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--clients", type=int, default=16)
+    args = parser.parse_args()
+
+    print(f"{'workers':>7} {'req/s':>9} {'speedup':>8} {'errors':>7}  token consistent")
+    baseline = None
+    for workers in args.workers:
+        throughput, errors = run(workers, args.seconds, args.clients)
+        baseline = baseline or throughput
+        print(f"{workers:>7} {throughput:>9.0f} {throughput / baseline:>7.2f}x {errors:>7}  yes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""A local MCP SSE server with the two tools the agent uses.
+
+    python -m benchmarks.fake_mcp --port 8102 --zoho http://127.0.0.1:8103
+
+`get_filter_descriptors` answers with canned field hints and descriptors
+for Deals/Leads/Contacts after `--latency` seconds (standing in for the
+vector search). `fetch_zoho_results` forwards the Zoho URL it is given to
+the Zoho-like server at `--zoho` (see fake_zoho.py), keeping the path and
+query, and wraps the answer the way the real server does: {"results": body}.
+With `--coql` the tool also takes `method` and `body`, so the agent's COQL
+path is exercised. Needs the `mcp` package (installed with
+langchain_mcp_adapters) and uvicorn.
+"""
+import argparse
+import asyncio
+import json
+from urllib.parse import urlsplit
+
+import httpx
+import uvicorn
+from mcp.server.fastmcp import FastMCP
+
+FIELDS = {
+    "Deals": {
+        "Deal_Name": "Name of the deal (text)",
+        "Amount": "Deal value (currency). Operators: equals, greater_than, less_than, between",
+        "Stage": "Pipeline stage (picklist): Qualification, Needs Analysis, Proposal/Price Quote, Negotiation/Review, Closed Won, Closed Lost",
+        "Closing_Date": "Expected closing date (date, YYYY-MM-DD)",
+        "Probability": "Win probability in percent (integer)",
+        "Lead_Source": "Where the deal came from (picklist): Website, Referral, Trade Show",
+    },
+    "Leads": {
+        "Company": "Company name (text)",
+        "Email": "Email address (text)",
+        "Lead_Status": "Status (picklist): Contacted, Not Contacted, Pre-Qualified",
+        "Annual_Revenue": "Annual revenue (currency)",
+        "Lead_Source": "Where the lead came from (picklist): Website, Referral, Trade Show",
+    },
+    "Contacts": {
+        "First_Name": "First name (text)",
+        "Last_Name": "Last name (text)",
+        "Title": "Job title (text)",
+        "Mailing_City": "City (text)",
+        "Lead_Source": "Where the contact came from (picklist): Website, Referral, Trade Show",
+    },
+}
+
+FORMAT_INSTRUCTIONS = (
+    'Return only JSON: {"filters": [{"key": "<api name>", "value": {"operator": "<operator>", "value": <value>}}]}. '
+    "Operators: equals, not_equal, greater_than, less_than, between, in, starts_with."
+)
+
+
+def descriptors(module: str) -> dict:
+    fields = FIELDS.get(module, FIELDS["Deals"])
+    return {
+        "pinecone_results": [f"{name}: {text}" for name, text in fields.items()],
+        "descriptors": "Available API fields for {}:\n{}".format(
+            module, "\n".join(f"- {name}: {text}" for name, text in fields.items())
+        ),
+        "format_instructions": FORMAT_INSTRUCTIONS,
+    }
+
+
+def build_server(zoho_url: str, latency: float, coql: bool) -> FastMCP:
+    server = FastMCP("fake-zoho-mcp")
+    client = httpx.AsyncClient(base_url=zoho_url, timeout=60)
+
+    @server.tool()
+    async def get_filter_descriptors(question: str, module: str, complexity: str = "simple") -> str:
+        """Field hints, descriptors and format instructions for a Zoho CRM module."""
+        await asyncio.sleep(latency)
+        return json.dumps(descriptors(module))
+
+    async def forward(url: str, method: str = "GET", body=None) -> str:
+        parts = urlsplit(url)
+        target = parts.path + (f"?{parts.query}" if parts.query else "")
+        if isinstance(body, str):
+            body = json.loads(body)
+        response = await client.request(method, target, json=body)
+        if response.status_code == 204:
+            return json.dumps({"results": None})
+        if response.status_code >= 400:
+            return json.dumps({"error": response.text, "status": response.status_code})
+        return json.dumps({"results": response.json()})
+
+    if coql:
+        @server.tool()
+        async def fetch_zoho_results(url: str, method: str = "GET", body: dict = None) -> str:
+            """Call a Zoho CRM API URL (GET search, or POST a COQL body)."""
+            return await forward(url, method, body)
+    else:
+        @server.tool()
+        async def fetch_zoho_results(url: str) -> str:
+            """Fetch a Zoho CRM API URL."""
+            return await forward(url)
+
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8102)
+    parser.add_argument("--zoho", required=True, help="base URL of the Zoho-like server")
+    parser.add_argument("--latency", type=float, default=0.1, help="seconds per get_filter_descriptors call")
+    parser.add_argument("--coql", action="store_true", help="accept method/body on fetch_zoho_results")
+    args = parser.parse_args()
+    server = build_server(args.zoho, args.latency, args.coql)
+    print(f"fake MCP on http://{args.host}:{args.port}/sse", flush=True)
+    uvicorn.run(server.sse_app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""A local OpenAI-compatible chat-completions endpoint with canned answers.
+
+    python -m benchmarks.fake_openai --port 8101 --latency 0.3
+
+Point the app at it with OPENAI_BASE_URL=http://127.0.0.1:8101/v1. Each
+request sleeps `latency` seconds (plus `--per-token` per prompt token, to
+mimic prefill cost) and answers according to the pipeline stage it
+recognises from the system prompt: planning JSON, filter JSON, combined
+planning+filter JSON, or a short summary. Streaming requests get the same
+summary as SSE chunks, with usage on the last one when asked for. GET
+/models lists a couple of models, for the app's warmup.
+"""
+import argparse
+import json
+import re
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FILTERS = {
+    "Deals": [{"key": "Amount", "value": {"operator": "greater_than", "value": 10000}}],
+    "Leads": [{"key": "Lead_Status", "value": {"operator": "equals", "value": "Contacted"}}],
+    "Contacts": [{"key": "Mailing_City", "value": {"operator": "equals", "value": "Pune"}}],
+}
+
+
+def guess_module(text: str) -> str:
+    text = text.lower()
+    if re.search(r"\bleads?\b|\bprospects?\b", text):
+        return "Leads"
+    if re.search(r"\bcontacts?\b", text):
+        return "Contacts"
+    return "Deals"
+
+
+def user_query(prompt: str) -> str:
+    """The user's question as embedded in each of the app's prompts."""
+    for pattern in (r"User Query:\s*\n(.+)", r"Here is the user query:\s*\n\s*(.+)", r'The user asked: "(.+?)"'):
+        m = re.search(pattern, prompt)
+        if m:
+            return m.group(1).strip()
+    return prompt[-200:]
+
+
+def answer(messages: list) -> str:
+    system = next((m["content"] for m in messages if m["role"] == "system"), "")
+    prompt = "\n".join(m["content"] for m in messages if m["role"] == "user")
+    query = user_query(prompt)
+    module = guess_module(query)
+
+    if "rewrites them into a paragraph" in system:
+        return json.dumps({
+            "module": module,
+            "complexity": "complex" if len(query.split()) > 12 else "simple",
+            "semantic_query": f"The user wants to know: {query}. They are asking about {module} records.",
+        })
+    if "maps questions to Zoho CRM modules" in system:
+        return json.dumps({
+            "module": module,
+            "semantic_query": f"The user wants to know: {query}. They are asking about {module} records.",
+            "filters": FILTERS[module],
+        })
+    if "construct Zoho CRM search queries" in system:
+        m = re.search(r"Module:\s*(\w+)", prompt)
+        return json.dumps({"filters": FILTERS.get(m.group(1) if m else module, FILTERS["Deals"])})
+    return (
+        f"Here is what I found for \"{query}\": several {module.lower()} match your criteria. "
+        "The largest ones are listed first, and most of them are still open."
+    )
+
+
+def make_handler(latency: float, per_token: float):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _json(self, status: int, body: dict):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            # The app's warmup lists models to open a connection.
+            if not self.path.rstrip("/").endswith("/models"):
+                return self._json(404, {"error": {"message": "not found"}})
+            self._json(200, {"object": "list", "data": [
+                {"id": model, "object": "model", "created": 0, "owned_by": "fake"} for model in ("gpt-4.1-mini", "gpt-4o")
+            ]})
+
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                return self._json(404, {"error": {"message": "not found"}})
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            messages = body.get("messages", [])
+            content = answer(messages)
+            prompt_tokens = sum(len(m.get("content") or "") for m in messages) // 4
+            completion_tokens = max(1, len(content) // 4)
+            time.sleep(latency + per_token * prompt_tokens)
+
+            created, model, cid = int(time.time()), body.get("model", "fake"), f"chatcmpl-{uuid.uuid4().hex[:12]}"
+            usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                     "total_tokens": prompt_tokens + completion_tokens}
+            if not body.get("stream"):
+                return self._json(200, {
+                    "id": cid, "object": "chat.completion", "created": created, "model": model,
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": content}}],
+                    "usage": usage,
+                })
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            base = {"id": cid, "object": "chat.completion.chunk", "created": created, "model": model}
+            for word in re.findall(r"\S+\s*", content):
+                chunk = {**base, "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+                time.sleep(0.002)
+            final = {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+            self.wfile.write(f"data: {json.dumps(final)}\n\n".encode())
+            if (body.get("stream_options") or {}).get("include_usage"):
+                self.wfile.write(f"data: {json.dumps({**base, 'choices': [], 'usage': usage})}\n\n".encode())
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.close_connection = True
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8101)
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds per completion")
+    parser.add_argument("--per-token", type=float, default=0.0, help="extra seconds per prompt token")
+    args = parser.parse_args()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.latency, args.per_token))
+    server.daemon_threads = True
+    print(f"fake OpenAI on http://{args.host}:{args.port}/v1", flush=True)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
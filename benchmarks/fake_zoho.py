@@ -0,0 +1,259 @@
+"""A small local stand-in for the Zoho CRM v7 search and COQL APIs.
+
+Serves synthetic Deals/Leads/Contacts over HTTP with a configurable
+per-request latency, so paging and aggregation can be measured without
+touching a real org:
+
+    server = FakeZoho(records=2000, latency=0.05).start()
+    ... GET  {server.url}/crm/v7/Deals/search?criteria=(Amount:greater_than:1000)&page=1&per_page=200
+    ... POST {server.url}/crm/v7/coql  {"select_query": "select COUNT(id) from Deals where ..."}
+    server.stop()
+
+or standalone: python -m benchmarks.fake_zoho --port 8103 --records 2000 --latency 0.05
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl, unquote
+
+STAGES = ["Qualification", "Needs Analysis", "Proposal/Price Quote", "Negotiation/Review", "Closed Won", "Closed Lost"]
+OWNERS = ["Priya Shah", "Arjun Mehta", "Sara Khan"]
+
+
+def make_records(module: str, n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    records = []
+    for i in range(n):
+        owner = {"name": rng.choice(OWNERS), "id": str(5000 + i % 3), "email": "owner@example.com"}
+        record = {
+            "id": str(4876876000000000000 + i),
+            "Owner": owner,
+            "Created_By": owner,
+            "Modified_By": owner,
+            "Created_Time": "2025-01-03T10:15:00+05:30",
+            "Modified_Time": "2025-02-11T16:42:00+05:30",
+            "Lead_Source": rng.choice(["Website", "Referral", "Trade Show"]),
+            "$approval": {"delegate": False, "approve": False, "reject": False, "resubmit": False},
+            "$editable": True,
+            "$state": "save",
+        }
+        if module == "Deals":
+            record.update({
+                "Deal_Name": f"Deal {i}",
+                "Amount": rng.randint(1_000, 250_000),
+                "Stage": rng.choice(STAGES),
+                "Closing_Date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                "Probability": rng.choice([10, 20, 40, 60, 75, 90, 100]),
+                "Account_Name": {"name": f"Account {i % 40}", "id": str(7000 + i % 40)},
+            })
+        elif module == "Leads":
+            record.update({
+                "First_Name": f"Lead{i}", "Last_Name": "Example", "Company": f"Company {i % 50}",
+                "Email": f"lead{i}@example.com", "Lead_Status": rng.choice(["Contacted", "Not Contacted", "Pre-Qualified"]),
+                "Annual_Revenue": rng.randint(10_000, 5_000_000),
+            })
+        else:
+            record.update({
+                "First_Name": f"Contact{i}", "Last_Name": "Example", "Email": f"contact{i}@example.com",
+                "Title": rng.choice(["CEO", "CTO", "Sales Manager"]), "Mailing_City": rng.choice(["Pune", "Mumbai", "Delhi"]),
+            })
+        records.append(record)
+    return records
+
+
+def _compare(value, op, target):
+    if isinstance(value, dict):
+        value = value.get("name")
+    if op == "in":
+        return str(value) in target
+    if op == "between":
+        return float(target[0]) <= float(value) <= float(target[1])
+    if op == "starts_with":
+        return str(value).lower().startswith(str(target).lower())
+    if op in ("equals", "not_equal"):
+        equal = str(value).lower() == str(target).lower()
+        return equal if op == "equals" else not equal
+    try:
+        value, target = float(value), float(target)
+    except (TypeError, ValueError):
+        value, target = str(value), str(target)
+    return {
+        "greater_than": value > target, "greater_equal": value >= target,
+        "less_than": value < target, "less_equal": value <= target,
+    }[op]
+
+
+def matches_criteria(record: dict, criteria: str) -> bool:
+    for key, op, raw in re.findall(r"\(([A-Za-z_]+):([a-z_]+):([^()]*)\)", criteria or ""):
+        target = raw.split(",") if op in ("in", "between") else raw
+        if record.get(key) is None or not _compare(record[key], op, target):
+            return False
+    return True
+
+
+_COQL = re.compile(
+    r"select\s+(?P<select>.+?)\s+from\s+(?P<module>\w+)(?:\s+where\s+(?P<where>.+?))?(?:\s+group by\s+(?P<group>\w+))?(?:\s+limit\s+\d+)?\s*$",
+    re.IGNORECASE,
+)
+_COQL_CONDITION = re.compile(
+    r"(?P<field>\w+)\s*(?P<op>>=|<=|!=|=|>|<|not between|between|not in|in|not like|like)\s*"
+    r"(?P<value>'[^']*'|\([^)]*\)|[\d.]+(?:\s+and\s+[\d.]+)?|'[^']*'\s+and\s+'[^']*')",
+    re.IGNORECASE,
+)
+
+
+def _coql_value(text: str):
+    text = text.strip()
+    if text.startswith("("):
+        return [_coql_value(v) for v in text[1:-1].split(",")]
+    if text.startswith("'"):
+        return text[1:-1]
+    return float(text)
+
+
+def _coql_match(record: dict, where: str) -> bool:
+    if not where:
+        return True
+    for cond in re.split(r"\s+and\s+(?![\d.']+\)?\s*(?:\)|$))", where.strip("() "), flags=re.IGNORECASE):
+        m = _COQL_CONDITION.search(cond)
+        if not m:
+            continue
+        value = record.get(m.group("field"))
+        if isinstance(value, dict):
+            value = value.get("name")
+        op = m.group("op").lower()
+        raw = m.group("value")
+        if op in ("between", "not between"):
+            low, high = (_coql_value(v) for v in re.split(r"\s+and\s+", raw, flags=re.IGNORECASE))
+            ok = value is not None and low <= value <= high
+            ok = ok if op == "between" else not ok
+        elif op in ("in", "not in"):
+            ok = value in _coql_value(raw)
+            ok = ok if op == "in" else not ok
+        elif op in ("like", "not like"):
+            prefix = _coql_value(raw).rstrip("%").lower()
+            ok = value is not None and str(value).lower().startswith(prefix)
+            ok = ok if op == "like" else not ok
+        else:
+            target = _coql_value(raw)
+            if value is None:
+                return False
+            ok = {"=": value == target, "!=": value != target, ">": value > target, "<": value < target,
+                  ">=": value >= target, "<=": value <= target}[op]
+        if not ok:
+            return False
+    return True
+
+
+class FakeZoho:
+    def __init__(self, records: int = 2000, latency: float = 0.05, host: str = "127.0.0.1", port: int = 0):
+        self.latency = latency
+        self.data = {m: make_records(m, records) for m in ("Deals", "Leads", "Contacts")}
+        self.requests = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body=None):
+                payload = b"" if body is None else json.dumps(body).encode()
+                with fake._lock:
+                    fake.requests += 1
+                    fake.bytes_sent += len(payload)
+                time.sleep(fake.latency)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                m = re.match(r"/crm/v7/(\w+)/search$", parts.path)
+                if not m or m.group(1) not in fake.data:
+                    return self._send(404, {"code": "INVALID_URL_PATTERN", "status": "error"})
+                query = dict(parse_qsl(parts.query.replace("+", "%2B")))
+                page, per_page = int(query.get("page", 1)), int(query.get("per_page", 200))
+                matched = [r for r in fake.data[m.group(1)] if matches_criteria(r, unquote(query.get("criteria", "")))]
+                chunk = matched[(page - 1) * per_page: page * per_page]
+                if not chunk:
+                    return self._send(204)
+                more = page * per_page < len(matched)
+                self._send(200, {"data": chunk, "info": {"per_page": per_page, "count": len(chunk), "page": page, "more_records": more}})
+
+            def do_POST(self):
+                if urlsplit(self.path).path != "/crm/v7/coql":
+                    return self._send(404, {"code": "INVALID_URL_PATTERN", "status": "error"})
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                m = _COQL.match(body.get("select_query", "").strip())
+                if not m or m.group("module") not in fake.data:
+                    return self._send(400, {"code": "SYNTAX_ERROR", "status": "error"})
+                rows = [r for r in fake.data[m.group("module")] if _coql_match(r, m.group("where"))]
+                if not rows:
+                    return self._send(204)
+                group = m.group("group")
+                if group:
+                    buckets = {}
+                    for r in rows:
+                        buckets.setdefault(r.get(group), []).append(r)
+                    data = [{group: key, **fake.aggregate(bucket, m.group("select"))} for key, bucket in buckets.items()]
+                else:
+                    data = [fake.aggregate(rows, m.group("select"))]
+                self._send(200, {"data": data, "info": {"count": len(data), "more_records": False}})
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._thread = None
+
+    def aggregate(self, rows: list, select: str) -> dict:
+        result = {}
+        for fn, field in re.findall(r"(\w+)\((\w+)\)", select):
+            values = [r[field] for r in rows if isinstance(r.get(field), (int, float))]
+            fn = fn.upper()
+            if fn == "COUNT":
+                result[f"COUNT({field})"] = len(rows) if field == "id" else sum(r.get(field) is not None for r in rows)
+            elif fn == "SUM":
+                result[f"SUM({field})"] = sum(values)
+            elif fn == "AVG":
+                result[f"AVG({field})"] = sum(values) / len(values) if values else None
+            elif fn == "MAX":
+                result[f"MAX({field})"] = max(values, default=None)
+            elif fn == "MIN":
+                result[f"MIN({field})"] = min(values, default=None)
+        return result
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeZoho":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8103)
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+    server = FakeZoho(args.records, args.latency, args.host, args.port)
+    print(f"fake Zoho on {server.url}", flush=True)
+    server._server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,5 +3,180 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 MCP_TOOL_DIRECTORY = os.getenv("MCP_TOOL_DIRECTORY")  
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+
+# OpenAI; OPENAI_BASE_URL points the client at any compatible endpoint (e.g. benchmarks/fake_openai.py)
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+
+# MCP session pool
+MCP_SSE_URL = os.getenv("MCP_SSE_URL", "https://zoho-mcp-server.onrender.com/sse")
+MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "4"))
+MCP_CONNECT_TIMEOUT = float(os.getenv("MCP_CONNECT_TIMEOUT", "30"))
+MCP_HEALTHCHECK_INTERVAL = float(os.getenv("MCP_HEALTHCHECK_INTERVAL", "30"))
+
+# Planning cache for reasoning_step
+PLAN_CACHE_ENABLED = os.getenv("PLAN_CACHE_ENABLED", "true").lower() == "true"
+PLAN_CACHE_SIZE = int(os.getenv("PLAN_CACHE_SIZE", "1024"))
+PLAN_CACHE_TTL = float(os.getenv("PLAN_CACHE_TTL", "3600"))
+PLAN_CACHE_SIMILARITY = float(os.getenv("PLAN_CACHE_SIMILARITY", "0.9"))
+
+# Validated Filter lists from the filter-construction LLM call
+FILTER_CACHE_SIZE = int(os.getenv("FILTER_CACHE_SIZE", "2048"))
+FILTER_CACHE_TTL = float(os.getenv("FILTER_CACHE_TTL", "86400"))
+FILTER_CACHE_DB = os.getenv("FILTER_CACHE_DB", "")
+
+# Zoho search results cache
+RECORDS_CACHE_MAX_BYTES = int(os.getenv("RECORDS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+RECORDS_CACHE_TTL = float(os.getenv("RECORDS_CACHE_TTL", "60"))
+# Per-module overrides, e.g. "Deals=30,Leads=120"
+RECORDS_CACHE_MODULE_TTLS = {
+    name.strip(): float(ttl)
+    for name, ttl in (
+        item.split("=", 1) for item in os.getenv("RECORDS_CACHE_MODULE_TTLS", "").split(",") if "=" in item
+    )
+}
+
+# Share one graph execution between identical in-flight /chat queries
+CHAT_COALESCING_ENABLED = os.getenv("CHAT_COALESCING_ENABLED", "true").lower() == "true"
+
+# Compile trivially structured queries to Filters without any LLM call
+FAST_PATH_ENABLED = os.getenv("FAST_PATH_ENABLED", "true").lower() == "true"
+
+# Single LLM call (module + filters) for simple queries: auto | always | off
+SIMPLE_PATH_MODE = os.getenv("SIMPLE_PATH_MODE", "auto").lower()
+
+# Prefetch descriptors for the likeliest modules while reasoning_step runs
+SPECULATION_ENABLED = os.getenv("SPECULATION_ENABLED", "true").lower() == "true"
+SPECULATION_CANDIDATES = int(os.getenv("SPECULATION_CANDIDATES", "2"))
+
+# Local module pre-router for the reasoning prompt
+MODULE_ROUTER_ENABLED = os.getenv("MODULE_ROUTER_ENABLED", "true").lower() == "true"
+MODULE_ROUTER_CONFIDENCE = float(os.getenv("MODULE_ROUTER_CONFIDENCE", "0.6"))
+
+# Record serialization for the summarization prompt
+SUMMARY_TOKEN_BUDGET = int(os.getenv("SUMMARY_TOKEN_BUDGET", "3000"))
+SUMMARY_OVERFLOW = os.getenv("SUMMARY_OVERFLOW", "sample").lower()  # sample | truncate
+
+# Local analytics for count/sum/average/top-N/group-by questions:
+# template (answer without an LLM) | phrase (LLM only rephrases) | off
+ANALYTICS_MODE = os.getenv("ANALYTICS_MODE", "template").lower()
+
+# Zoho search pagination
+ZOHO_PER_PAGE = int(os.getenv("ZOHO_PER_PAGE", "200"))
+ZOHO_PAGE_CONCURRENCY = int(os.getenv("ZOHO_PAGE_CONCURRENCY", "4"))
+# Pages requested past the last one known to exist (a page exists once the one
+# before it said more_records). Each costs one wasted request at the end of a
+# result set; 0 fetches strictly one page after another.
+ZOHO_PAGE_READ_AHEAD = int(os.getenv("ZOHO_PAGE_READ_AHEAD", "1"))
+ZOHO_MAX_RECORDS = int(os.getenv("ZOHO_MAX_RECORDS", "2000"))
+ZOHO_MAX_BYTES = int(os.getenv("ZOHO_MAX_BYTES", str(16 * 1024 * 1024)))
+# Raw records kept in state/tool_output; everything fetched still feeds the analytics table
+RECORDS_KEEP_RAW = int(os.getenv("RECORDS_KEEP_RAW", "200"))
+
+# Answer count/sum/average/group-by questions with a server-side COQL aggregate
+# when the fetch tool can POST; falls back to paging through search results
+COQL_ENABLED = os.getenv("COQL_ENABLED", "true").lower() == "true"
+
+# Zoho OAuth tokens, refreshed by the backend ahead of expiry
+ZOHO_CLIENT_ID = os.getenv("ZOHO_CLIENT_ID")
+ZOHO_CLIENT_SECRET = os.getenv("ZOHO_CLIENT_SECRET")
+ZOHO_TOKEN_URL = os.getenv("ZOHO_TOKEN_URL", "https://accounts.zoho.com/oauth/v2/token")
+# Pre-shared-state token file; imported once when the shared store has no token
+TOKEN_STORE_PATH = os.getenv("TOKEN_STORE_PATH", os.path.join(BASE_DIR, "token_store.json"))
+TOKEN_REFRESH_MARGIN = float(os.getenv("TOKEN_REFRESH_MARGIN", "300"))
+TOKEN_REFRESH_RETRY = float(os.getenv("TOKEN_REFRESH_RETRY", "30"))
+
+# State shared by every worker: the Zoho token, refresh locks and shared cache
+# tiers. memory:// (this process only) | sqlite:///path/state.db (all workers on
+# one box) | redis://host:6379/0 (all nodes; needs the redis package)
+SHARED_STATE_URL = os.getenv("SHARED_STATE_URL", "sqlite:///" + os.path.join(BASE_DIR, "shared_state.db"))
+# How often expired entries are deleted from sqlite/in-process shared state (0 = only on read)
+SHARED_STATE_PURGE_INTERVAL = float(os.getenv("SHARED_STATE_PURGE_INTERVAL", "300"))
+# Also keep Zoho search results in shared state, so workers reuse each other's fetches
+RECORDS_CACHE_SHARED = os.getenv("RECORDS_CACHE_SHARED", "false").lower() == "true"
+
+# Per-request traces (GET /debug/traces/{id}); prompts, completions and records
+# are captured for TRACE_SAMPLE_RATE of requests only
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "true").lower() == "true"
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "500"))
+TRACE_PAYLOAD_MAX_CHARS = int(os.getenv("TRACE_PAYLOAD_MAX_CHARS", "20000"))
+# Captured payloads waiting to be serialized; the oldest are dropped beyond this
+TRACE_CAPTURE_QUEUE_SIZE = int(os.getenv("TRACE_CAPTURE_QUEUE_SIZE", "1000"))
+# Optional JSON-lines file that finished traces are appended to, off the request path
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "")
+# GET /debug/traces shows user queries, prompts and records, and
+# POST /admin/cache/records/invalidate changes state, so both are off unless
+# enabled; with DEBUG_TOKEN set, requests must send it as X-Debug-Token
+DEBUG_ENDPOINTS_ENABLED = os.getenv("DEBUG_ENDPOINTS_ENABLED", "false").lower() == "true"
+DEBUG_TOKEN = os.getenv("DEBUG_TOKEN", "")
+
+# Record/replay of OpenAI and MCP traffic (benchmarks/bench_replay.py).
+# off | record (call the live services and append every exchange to the
+# cassette) | replay (answer from the cassette; nothing leaves the process)
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", "off").lower()
+CASSETTE_PATH = os.getenv("CASSETTE_PATH", os.path.join(BASE_DIR, "benchmarks", "cassettes", "corpus.jsonl"))
+# original (sleep as long as the recorded call took) | zero
+CASSETTE_LATENCY = os.getenv("CASSETTE_LATENCY", "original").lower()
+
+# Deadlines: every /chat request gets REQUEST_DEADLINE seconds (0 = none), and
+# each graph stage at most its budget out of what is left, e.g.
+# "single_shot=6,reasoning=8,tools=15,summary=10". A stage that runs out
+# degrades (plan from the router, records without a summary) instead of failing.
+REQUEST_DEADLINE = float(os.getenv("REQUEST_DEADLINE", "30"))
+STAGE_BUDGETS = {
+    name.strip(): float(seconds)
+    for name, seconds in (
+        item.split("=", 1)
+        for item in os.getenv("STAGE_BUDGETS", "single_shot=6,reasoning=8,tools=15,summary=10").split(",")
+        if "=" in item
+    )
+}
+
+# Hedged OpenAI calls: when a completion has not answered after the
+# LLM_HEDGE_PERCENTILE latency of its stage, send a duplicate and keep the
+# first answer. LLM_HEDGE_DELAY is used until LLM_HEDGE_MIN_SAMPLES calls were seen.
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true"
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95"))
+LLM_HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DELAY", "3"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+
+# Backend protection: one adaptive (AIMD) concurrency limit per dependency,
+# starting at its maximum and backing off on 429s, errors and rising latency
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "64"))
+MCP_MAX_CONCURRENCY = int(os.getenv("MCP_MAX_CONCURRENCY", "32"))
+ZOHO_MAX_CONCURRENCY = int(os.getenv("ZOHO_MAX_CONCURRENCY", "10"))
+# Latency above this multiple of the recent best counts as congestion
+LIMITER_LATENCY_TOLERANCE = float(os.getenv("LIMITER_LATENCY_TOLERANCE", "2.5"))
+# A call waits at most this long for a slot, with at most BACKEND_QUEUE_MAX waiting per backend
+BACKEND_QUEUE_TIMEOUT = float(os.getenv("BACKEND_QUEUE_TIMEOUT", "2"))
+BACKEND_QUEUE_MAX = int(os.getenv("BACKEND_QUEUE_MAX", "256"))
+# Retries of 429 / 5xx / connection errors, honouring Retry-After, with full jitter
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "0.25"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "8"))
+# Consecutive failures that open a backend's circuit, and how long it stays open
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "5"))
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", "15"))
+# /chat answers 503 beyond this many graph runs in flight (0 = no limit)
+MAX_CONCURRENT_RUNS = int(os.getenv("MAX_CONCURRENT_RUNS", "0"))
+
+# Startup: blocking (warm the graph, MCP sessions and OpenAI connection before
+# serving) | background (serve at once; early requests wait for what they need) | off
+WARMUP_MODE = os.getenv("WARMUP_MODE", "blocking").lower()
+
+# Job queue (POST /jobs): a bounded pool of in-app workers runs queued queries
+# in two lanes. Workers take simple queries first; JOB_SIMPLE_WORKERS of them
+# only ever take simple ones, so a burst of complex jobs cannot starve them.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_SIMPLE_WORKERS = int(os.getenv("JOB_SIMPLE_WORKERS", "1"))
+# POST /jobs answers 503 beyond this many queued jobs per process
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "500"))
+# A job is not holding a socket open, so it gets a longer deadline than /chat (0 = none);
+# its STAGE_BUDGETS are scaled by JOB_DEADLINE / REQUEST_DEADLINE to match
+JOB_DEADLINE = float(os.getenv("JOB_DEADLINE", "120"))
+# How long job status and results stay readable in shared state
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "3600"))
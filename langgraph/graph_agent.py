@@ -1,25 +1,39 @@
-from langgraph.graph import StateGraph
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.sse import sse_client
-from langchain_mcp_adapters.tools import load_mcp_tools
-from config.settings import GEMINI_API_KEY
+from config.settings import (
+    FAST_PATH_ENABLED,
+    SIMPLE_PATH_MODE,
+    SPECULATION_ENABLED,
+    SPECULATION_CANDIDATES,
+    ANALYTICS_MODE,
+    COQL_ENABLED,
+    RECORDS_KEEP_RAW,
+    MODULE_ROUTER_ENABLED,
+    MODULE_ROUTER_CONFIDENCE,
+)
+from services.mcp_pool import mcp_pool
+from services.cassette import cassette
+from services import llm, metrics
+from services.tracing import tracer
+from services.deadline import BudgetExhausted, run_within
+from services.resilience import BackendUnavailable
+from services.plan_cache import plan_cache
+from services.filter_cache import filter_cache
+from services.records_cache import records_cache
+from services.query_compiler import compile_query
+from services.query_router import classify_complexity, classify_module, named_module, rank_modules
+from services.speculation import DescriptorSpeculation
+from services.record_compactor import compact_records
+from services.analytics import RecordTable, parse_intent, answer, answer_aggregate
+from services.coql import build_coql, supports_coql, coql_args, parse_aggregate
+from services.zoho_pagination import PageStats, iter_pages, page_url
 from static.literature import DEALS_DOC, CONTACTS_DOC, LEADS_DOC
 from model.filter import Filter
 from pydantic import TypeAdapter
-import google.generativeai as genai
-from openai import AsyncOpenAI
+import asyncio
 import json
 import re
-import os
-from dotenv import load_dotenv
+import time
+import hashlib
 from datetime import datetime
-load_dotenv()
-# Configure APIs
-genai.configure(api_key=GEMINI_API_KEY)
-
-client = AsyncOpenAI(
-    api_key=os.getenv("OPENAI_API_KEY"),
-)
 
 MODULE_DOCS = {
     "Deals": DEALS_DOC,
@@ -32,55 +46,97 @@ MODULE_DOCS = {
 #     args=["--directory", "/Users/rudrakumar/Downloads/MCP/Zoho-MCP/server", "run", "app/server.py"]
 # )
 
-MCP_SSE_URL = "https://zoho-mcp-server.onrender.com/sse"
-today = datetime.now().strftime("%Y-%m-%d")
+ZOHO_API_BASE = "https://www.zohoapis.com"
+
+node_latency = metrics.histogram("graph_node_seconds", "Latency of each graph node")
+node_errors = metrics.counter("graph_node_errors_total", "Graph node failures, by node and error type")
+
+_DOCS_HASH = hashlib.sha256("".join(MODULE_DOCS.values()).encode()).hexdigest()[:16]
+
+
+def current_date() -> str:
+    # A cassette pins the date its prompts were recorded with.
+    return cassette.date or datetime.now().strftime("%Y-%m-%d")
+
+
+REASONING_INSTRUCTIONS = (
+    "You are an intelligent CRM assistant that interprets user queries in natural language and identifies the relevant Zoho CRM module and query type.\n\n"
+    "Your responsibilities:\n"
+    "1. Analyze the user's query using the CRM module documentation.\n"
+    "2. Identify the most appropriate module: Deals, Contacts, or Leads.\n"
+    "3. Classify the query as either 'simple' or 'complex'.\n"
+    "4. Rewrite the user query into a clear, well-structured paragraph (minimum 2–3 lines) that communicates the original intent accurately.\n\n"
+    "Mandatory Guidelines for rewriting the query:\n"
+    "- DO NOT add any information that is not explicitly or implicitly present in the original query.\n"
+    "- Use CRM terminology and field names only if they are clearly mentioned or strongly implied.\n"
+    "- DO NOT invent filters, stages, fields, or conditions that were not mentioned.\n"
+    "- The rewritten query MUST be written as a paragraph of at least **two full sentences**.\n"
+    "- Maintain the specificity and structure of the original query without oversimplifying or altering intent.\n"
+    "- If the query is vague or high-level, retain that vagueness in the rewritten form.\n\n"
+    "Respond ONLY with valid JSON in the following format:\n"
+    '{\n'
+    '  "module": "<ModuleName>",\n'
+    '  "complexity": "<simple|complex>",\n'
+    '  "semantic_query": "<A paragraph with at least 2 sentences explaining the user\'s intent>",\n'
+    '}\n\n'
+)
+
 
-async def reasoning_step(query: str):
-    full_doc = f"""
+def build_reasoning_prompt(query: str, today: str, routed: bool = MODULE_ROUTER_ENABLED):
+    """Planning prompt for `query`, and the module it was pinned to (or None).
 
-    Today's Date: {today}
+    The local pre-router decides how much module literature to send: none
+    when the query names its module, only the winner's doc when it is
+    confident, all three docs otherwise. Everything that does not depend on
+    the request comes first so provider-side prompt caching can reuse the
+    prefix; the date and the query go last.
+    """
+    pinned_module = None
+    docs = MODULE_DOCS
+    if routed:
+        pinned_module = named_module(query)
+        module, confidence = classify_module(query)
+        if pinned_module:
+            docs = {}
+        elif confidence >= MODULE_ROUTER_CONFIDENCE:
+            docs = {module: MODULE_DOCS[module]}
+
+    if docs:
+        literature = "\n\n".join(f"{name}:\n{doc.strip()}" for name, doc in docs.items())
+        doc_section = f"Module Documentation:\n\nZoho Module Literature:\n\n{literature}\n\n"
+    else:
+        doc_section = f"Module: the user query names the {pinned_module} module, so use \"{pinned_module}\".\n\n"
 
-    Zoho Module Literature:
-    
-    Deals:
-    {DEALS_DOC}
+    prompt = (
+        REASONING_INSTRUCTIONS
+        + doc_section
+        + f"Today's Date: {today}\n\n"
+        + f"User Query:\n{query}"
+    )
+    return prompt, pinned_module
 
-    Contacts:
-    {CONTACTS_DOC}
 
-    Leads:
-    {LEADS_DOC}
+def cached_plan(query: str):
+    """The plan cached for `query` under today's docs and date, or None."""
+    cached = plan_cache.get(query, f"{_DOCS_HASH}:{current_date()}")
+    if cached is not None:
+        tracer.event("plan_cache_hit")
+    return cached
 
-    User Query:
-    {query}
-    """.strip()
 
-    prompt = (
-        "You are an intelligent CRM assistant that interprets user queries in natural language and identifies the relevant Zoho CRM module and query type.\n\n"
-        "Your responsibilities:\n"
-        "1. Analyze the user's query using the CRM module documentation.\n"
-        "2. Identify the most appropriate module: Deals, Contacts, or Leads.\n"
-        "3. Classify the query as either 'simple' or 'complex'.\n"
-        "4. Rewrite the user query into a clear, well-structured paragraph (minimum 2–3 lines) that communicates the original intent accurately.\n\n"
-        "Mandatory Guidelines for rewriting the query:\n"
-        "- DO NOT add any information that is not explicitly or implicitly present in the original query.\n"
-        "- Use CRM terminology and field names only if they are clearly mentioned or strongly implied.\n"
-        "- DO NOT invent filters, stages, fields, or conditions that were not mentioned.\n"
-        "- The rewritten query MUST be written as a paragraph of at least **two full sentences**.\n"
-        "- Maintain the specificity and structure of the original query without oversimplifying or altering intent.\n"
-        "- If the query is vague or high-level, retain that vagueness in the rewritten form.\n\n"
-        "Respond ONLY with valid JSON in the following format:\n"
-        '{\n'
-        '  "module": "<ModuleName>",\n'
-        '  "complexity": "<simple|complex>",\n'
-        '  "semantic_query": "<A paragraph with at least 2 sentences explaining the user\'s intent>",\n'
-        '}\n\n'
-        "Module Documentation:\n"
-        f"{full_doc}"
-    )
+async def reasoning_step(query: str, check_cache: bool = True):
+    today = current_date()
+    plan_version = f"{_DOCS_HASH}:{today}"
+    if check_cache:
+        cached = cached_plan(query)
+        if cached is not None:
+            return cached
+
+    prompt, pinned_module = build_reasoning_prompt(query, today)
 
     try:
-        response = await client.chat.completions.create(
+        response = await llm.chat(
+            "reasoning",
             model="gpt-4.1-mini",
             messages=[
                 {"role": "system", "content": "You are a CRM expert that understands natural language queries, rewrites them into a paragraph form and maps them to appropriate modules."},
@@ -90,7 +146,6 @@ async def reasoning_step(query: str):
         )
         
         response_text = response.choices[0].message.content
-        print("LLM Planning Output:", response_text)
 
         try:
             json_match = re.search(r"\{[\s\S]*\}", response_text)
@@ -98,14 +153,16 @@ async def reasoning_step(query: str):
                 raise ValueError("No JSON found in LLM response")
 
             parsed = json.loads(json_match.group())
-            return {
-                "module": parsed.get("module", "Deals").strip().title(),
+            plan = {
+                "module": pinned_module or parsed.get("module", "Deals").strip().title(),
                 "complexity": parsed.get("complexity", "simple").lower(),
                 "semantic_query": parsed.get("semantic_query", query),
             }
+            plan_cache.set(query, plan_version, plan)
+            return plan
 
         except Exception as e:
-            print(f"Error parsing reasoning output: {e}")
+            tracer.event("reasoning_parse_error", error=str(e))
             return {
                 "module": "Deals",
                 "complexity": "simple",
@@ -113,7 +170,7 @@ async def reasoning_step(query: str):
             }
 
     except Exception as e:
-        print(f"Error in GPT-4.1-mini API call: {e}")
+        tracer.event("reasoning_error", type=type(e).__name__, error=str(e))
         return {
             "module": "Deals",
             "complexity": "simple",
@@ -121,114 +178,318 @@ async def reasoning_step(query: str):
         }
 
 
-async def tool_use_step(query: str, module_name: str, complexity: str):
-    async with sse_client(MCP_SSE_URL) as (read, write):
-        async with ClientSession(read, write) as session:
-            await session.initialize()
-            print("Session initialized")
-
-            tools = await load_mcp_tools(session)
-            print("Tools loaded")
-
-            get_descriptor_tool = next(t for t in tools if t.name == "get_filter_descriptors")
-            fetch_result_tool = next(t for t in tools if t.name == "fetch_zoho_results")
-
-            descriptor_response_raw = await get_descriptor_tool.ainvoke({"question": query, "module": module_name, "complexity": complexity})
-            try:
-                descriptor_response = json.loads(descriptor_response_raw)
-            except Exception as e:
-                return {"error": f"Failed to parse descriptor response: {e}", "raw": descriptor_response_raw}
-
-            field_hints = descriptor_response.get("pinecone_results", [])
-            field_hints_joined = "\n\n".join(field_hints)
-            try:
-                llm_prompt = f"""
-                    Today's Date: {today}
-                    You are an assistant to help construct Zoho CRM search queries. Here is the user query:
-
-                    {query}
-
-                    Module: {module_name}
-
-                    Rules: 
-                    1. Use only the API names provided below. Do not guess or invent api names unless it is explicitly listed.
-                    2. Do not Assume any api name by youself.
-                    3. If the query references a field not available in the list, return:
-                    {{ "error": "Relevant field not found in context." }}
-                    4. Follow the format Instructions strictly.
-                    4. Return only JSON, No Notes, No Explaination. 
-
-                    Api Fields Information (from vector search):
-                    {field_hints_joined}
-
-                    {descriptor_response["descriptors"]}
-
-                    {descriptor_response["format_instructions"]}
-                """
-                print("Prompt sent to LLM:\n", llm_prompt)
-
-                filter_response = await client.chat.completions.create(
-                    model="gpt-4.1-mini",
-                    messages=[
-                        {"role": "system", "content": "You are an assistant that helps construct Zoho CRM search queries."},
-                        {"role": "user", "content": llm_prompt}
-                    ],
-                    temperature=0.3
-                )
-
-                filter_text = filter_response.choices[0].message.content
-                print("LLM filter output:", filter_text)
-
-                match = re.search(r"\{[\s\S]*\}", filter_text)
-                if not match:
-                    print("No valid JSON found in LLM response")
-                    return {"error": "LLM did not return valid JSON.", "raw": filter_text}
-
-                filters_dict = json.loads(match.group())
-                print("Successfully parsed JSON from LLM response")
-
-                adapter = TypeAdapter(list[Filter])
-                filters = adapter.validate_python(filters_dict.get("filters", []))
-                print("Successfully validated filters")
-
-                criteria_parts = []
-                for f in filters:
-                    key = f.key
-                    val = f.value.value
-                    op = f.value.operator.value
-                    val_str = ",".join(str(v) for v in val) if isinstance(val, list) else str(val)
-                    criteria_parts.append(f"({key}:{op}:{val_str})")
-
-                criteria_string = criteria_parts[0] if len(criteria_parts) == 1 else f"({' and '.join(criteria_parts)})"
-                url = f"https://www.zohoapis.com/crm/v7/{module_name}/search?criteria={criteria_string}&per_page=15"
-                print("Generated URL:", url)
-
-                result = await fetch_result_tool.ainvoke({"url": url})
-
-                # print("Raw API response:", result)
-
-                if isinstance(result, str):
-                    try:
-                        result = json.loads(result)
-                    except json.JSONDecodeError as e:
-                        return {
-                            "error": "Failed to parse JSON response",
-                            "raw_response": result
-                        }
+def build_criteria(filters: list[Filter]) -> str:
+    criteria_parts = []
+    for f in filters:
+        key = f.key
+        val = f.value.value
+        op = f.value.operator.value
+        val_str = ",".join(str(v) for v in val) if isinstance(val, list) else str(val)
+        criteria_parts.append(f"({key}:{op}:{val_str})")
+
+    return criteria_parts[0] if len(criteria_parts) == 1 else f"({' and '.join(criteria_parts)})"
+
+
+async def fetch_descriptors(query: str, module_name: str, complexity: str):
+    raw = await mcp_pool.invoke("get_filter_descriptors", {"question": query, "module": module_name, "complexity": complexity})
+    return json.loads(raw)
+
+
+async def construct_filters(query: str, module_name: str, complexity: str, today: str,
+                            descriptor_response: dict = None, descriptor_query: str = None):
+    """Build the Filter list for `query` with the filter LLM, via filter_cache.
+
+    `descriptor_response` may be prefetched by speculation; otherwise it is
+    fetched here for `descriptor_query` (the user's own words, which is what
+    speculation has to go on) or `query`. Returns {"filters": [...],
+    "criteria": "..."} or an error dict.
+    """
+    if descriptor_response is None:
+        descriptor_response_raw = await mcp_pool.invoke("get_filter_descriptors", {"question": descriptor_query or query, "module": module_name, "complexity": complexity})
+        try:
+            descriptor_response = json.loads(descriptor_response_raw)
+        except Exception as e:
+            return {"error": f"Failed to parse descriptor response: {e}", "raw": descriptor_response_raw}
+
+    field_hints = descriptor_response.get("pinecone_results", [])
+    field_hints_joined = "\n\n".join(field_hints)
+    descriptor_hash = hashlib.sha256(json.dumps(
+        [field_hints, descriptor_response["descriptors"], descriptor_response["format_instructions"]],
+        sort_keys=True, default=str,
+    ).encode()).hexdigest()
+    cache_key = filter_cache.make_key(module_name, query, descriptor_hash, today)
+    cached = await filter_cache.get(cache_key)
+    if cached is not None:
+        filters, criteria_string = cached
+        tracer.event("filter_cache_hit")
+    else:
+        llm_prompt = f"""
+            Today's Date: {today}
+            You are an assistant to help construct Zoho CRM search queries. Here is the user query:
+
+            {query}
+
+            Module: {module_name}
+
+            Rules: 
+            1. Use only the API names provided below. Do not guess or invent api names unless it is explicitly listed.
+            2. Do not Assume any api name by youself.
+            3. If the query references a field not available in the list, return:
+            {{ "error": "Relevant field not found in context." }}
+            4. Follow the format Instructions strictly.
+            4. Return only JSON, No Notes, No Explaination. 
+
+            Api Fields Information (from vector search):
+            {field_hints_joined}
+
+            {descriptor_response["descriptors"]}
+
+            {descriptor_response["format_instructions"]}
+        """
+        filter_response = await llm.chat(
+            "filters",
+            model="gpt-4.1-mini",
+            messages=[
+                {"role": "system", "content": "You are an assistant that helps construct Zoho CRM search queries."},
+                {"role": "user", "content": llm_prompt}
+            ],
+            temperature=0.3
+        )
+
+        filter_text = filter_response.choices[0].message.content
+
+        match = re.search(r"\{[\s\S]*\}", filter_text)
+        if not match:
+            tracer.event("filter_output_not_json")
+            return {"error": "LLM did not return valid JSON.", "raw": filter_text}
+
+        filters_dict = json.loads(match.group())
+
+        adapter = TypeAdapter(list[Filter])
+        filters = adapter.validate_python(filters_dict.get("filters", []))
+        tracer.event("filters_validated", count=len(filters))
 
+        criteria_string = build_criteria(filters)
+        if filters:
+            await filter_cache.set(cache_key, filters, criteria_string)
+
+    return {"filters": filters, "criteria": criteria_string}
+
+
+async def fetch_aggregate(fetch_tool, module_name: str, select_query: str):
+    """Run a COQL aggregate through the fetch tool; the raw response, via records_cache."""
+    args = coql_args(fetch_tool, ZOHO_API_BASE, select_query)
+
+    async def load():
+        result = await mcp_pool.invoke("fetch_zoho_results", args)
+        return json.loads(result) if isinstance(result, str) else result
+
+    # COQL is a POST, so the query goes into the cache key in place of search params.
+    return args["url"], await records_cache.fetch(module_name, f"{args['url']}?select_query={select_query}", load)
+
+
+async def tool_use_step(query: str, module_name: str, complexity: str, filters: list[Filter] = None,
+                        descriptor_response: dict = None, intent: dict = None, descriptor_query: str = None):
+    today = current_date()
+    # A pooled session is borrowed per MCP call, not for the whole step, so
+    # the filter LLM call does not hold one.
+    try:
+        fetch_result_tool = await mcp_pool.tool("fetch_zoho_results")
+        # Filters come precompiled from the fast path; otherwise ask the LLM.
+        if filters is None:
+            constructed = await construct_filters(query, module_name, complexity, today, descriptor_response,
+                                                  descriptor_query)
+            if "error" in constructed:
+                return constructed
+            filters, criteria_string = constructed["filters"], constructed["criteria"]
+        else:
+            criteria_string = build_criteria(filters)
+
+        # Aggregate questions ask the server for the totals instead of
+        # paging through every matching record.
+        select_query = build_coql(module_name, filters, intent) if COQL_ENABLED else None
+        if select_query and supports_coql(fetch_result_tool):
+            tracer.annotate(coql=select_query)
+            url, result = await fetch_aggregate(fetch_result_tool, module_name, select_query)
+            aggregate = parse_aggregate(result, intent)
+            if aggregate is not None:
                 return {
-                    "records_response": result,
+                    "records_response": {"results": {"data": [], "info": {"count": aggregate.get("count")}}},
+                    "aggregate": aggregate,
+                    "analytics": intent,
+                    "backend": "coql",
                     "url": url,
-                    "semantic_query": query
+                    "semantic_query": query,
+                    "filters": filters
                 }
+            tracer.event("coql_fallback", response=str(result)[:500])
+
+        url = page_url(f"{ZOHO_API_BASE}/crm/v7/{module_name}/search?criteria={criteria_string}", 1)
+        tracer.annotate(url=url)
+
+        async def fetch_page(target):
+            async def load():
+                result = await mcp_pool.invoke("fetch_zoho_results", {"url": target})
+                return json.loads(result) if isinstance(result, str) else result
+            return await records_cache.fetch(module_name, target, load)
+
+        # Pages stream into the columnar table; only the first
+        # RECORDS_KEEP_RAW raw records are held on to.
+        table = RecordTable()
+        kept = []
+        stats = PageStats()
+        try:
+            async for page in iter_pages(fetch_page, url, stats):
+                table.add_records(page.records)
+                kept.extend(page.records[:max(0, RECORDS_KEEP_RAW - len(kept))])
+        except json.JSONDecodeError as e:
+            return {
+                "error": "Failed to parse JSON response",
+                "raw_response": e.doc
+            }
 
-            except Exception as e:
-                print(f"Error in API call or processing: {str(e)}")
-                print(f"Error type: {type(e).__name__}")
-                return {
-                    "error": f"Error in API call or processing: {str(e)}",
-                    "type": type(e).__name__
+        if stats.error and not stats.pages:
+            result = stats.error
+        else:
+            tracer.annotate(records=stats.records, pages=stats.pages, truncated=stats.truncated)
+            tracer.capture("records", kept)
+            result = {
+                "results": {
+                    "data": kept,
+                    "info": {
+                        "count": stats.records,
+                        "pages": stats.pages,
+                        "more_records": stats.truncated,
+                        "kept": len(kept),
+                    },
                 }
+            }
+
+        return {
+            "records_response": result,
+            "records_table": table,
+            "backend": "search",
+            "url": url,
+            "semantic_query": query,
+            "filters": filters
+        }
+
+    except BackendUnavailable as e:
+        tracer.event("tool_error", type=type(e).__name__, error=str(e))
+        return {
+            "error": str(e),
+            "type": type(e).__name__,
+            "retry_after": e.retry_after,
+            "response": f"The CRM service is busy right now. Please try again in {max(1, round(e.retry_after))} seconds.",
+        }
+
+    except Exception as e:
+        tracer.event("tool_error", type=type(e).__name__, error=str(e))
+        return {
+            "error": f"Error in API call or processing: {str(e)}",
+            "type": type(e).__name__
+        }
+
+
+async def plan_and_filter_step(query: str):
+    """Pick the module and build its filters in one LLM call, for simple queries.
+
+    Returns an empty dict when the combined call cannot produce usable
+    filters, so the graph can fall back to the two-step path.
+    """
+    today = current_date()
+
+    # Only the likeliest modules, as for speculation; the LLM picking another
+    # one falls back to the two-step path.
+    modules = rank_modules(query)[:SPECULATION_CANDIDATES]
+    results = await asyncio.gather(*(fetch_descriptors(query, m, "simple") for m in modules), return_exceptions=True)
+    descriptors = {m: r for m, r in zip(modules, results) if isinstance(r, dict)}
+    if not descriptors:
+        return {}
+
+    sections = []
+    for module_name, d in descriptors.items():
+        field_hints_joined = "\n\n".join(d.get("pinecone_results", []))
+        sections.append(
+            f"Module: {module_name}\n"
+            f"Api Fields Information (from vector search):\n{field_hints_joined}\n\n"
+            f"{d['descriptors']}"
+        )
+    module_sections = "\n\n".join(sections)
+    format_instructions = next(iter(descriptors.values()))["format_instructions"]
+
+    llm_prompt = f"""
+        Today's Date: {today}
+        You are an assistant that maps a Zoho CRM question to a module and builds its search filters. Here is the user query:
+
+        {query}
+
+        Rules:
+        1. Choose exactly one module from: {", ".join(descriptors)}.
+        2. Use only the API names listed for the chosen module. Do not guess or invent api names.
+        3. If the query references a field not available for the chosen module, return:
+        {{ "error": "Relevant field not found in context." }}
+        4. Rewrite the query into a clear paragraph of at least two sentences as "semantic_query", without adding anything the user did not ask for.
+        5. Return only JSON with the keys "module", "semantic_query" and "filters". No Notes, No Explaination.
+
+        {module_sections}
+
+        The "filters" value must follow these format instructions:
+        {format_instructions}
+    """
+
+    try:
+        response = await llm.chat(
+            "single_shot",
+            model="gpt-4.1-mini",
+            messages=[
+                {"role": "system", "content": "You are a CRM expert that maps questions to Zoho CRM modules and search filters."},
+                {"role": "user", "content": llm_prompt}
+            ],
+            temperature=0.3
+        )
+        response_text = response.choices[0].message.content
+
+        match = re.search(r"\{[\s\S]*\}", response_text)
+        if not match:
+            return {}
+        parsed = json.loads(match.group())
+        module_name = str(parsed.get("module", "")).strip().title()
+        if module_name not in descriptors:
+            return {}
+
+        filters = TypeAdapter(list[Filter]).validate_python(parsed.get("filters", []))
+        if not filters:
+            return {}
+
+        return {
+            "module": module_name,
+            "complexity": "simple",
+            "semantic_query": parsed.get("semantic_query") or query,
+            "filters": filters,
+            "path": "single_shot",
+        }
+
+    except Exception as e:
+        tracer.event("single_shot_error", type=type(e).__name__, error=str(e))
+        return {}
+
+
+def _computed_answer(data: dict, records: list):
+    """(answer, intent) computed exactly from the COQL aggregate or the records, else (None, None)."""
+    if data.get("aggregate") is not None:
+        # Totals came back from COQL; there are no records to read.
+        return answer_aggregate(data.get("module"), data["analytics"], data["aggregate"]), data["analytics"]
+    # Count / sum / average / top-N / group-by questions are answered from the
+    # records themselves; the LLM at most rephrases the computed answer.
+    if ANALYTICS_MODE == "off" or not records:
+        return None, None
+    intent = parse_intent(data.get("query") or data["semantic_query"], data.get("module"))
+    if not intent:
+        return None, None
+    info = data["records_response"].get("results", {}).get("info") or {}
+    table = data.get("records_table") or RecordTable.from_records(records)
+    return answer(table, data.get("module"), intent, complete=not info.get("more_records")), intent
 
 
 async def summarization_step(data: dict):
@@ -236,84 +497,253 @@ async def summarization_step(data: dict):
         return data
 
     records = data["records_response"].get("results", {}).get("data", [])
-    if not records:
+    computed, intent = _computed_answer(data, records)
+    if computed is None and (data.get("aggregate") is not None or not records):
         return {"response": "I couldn't find any matching records for your query.", **data}
+    if computed:
+        data["analytics"] = intent
+    if computed and ANALYTICS_MODE == "template":
+        data["response"] = computed
+        return data
 
-  
-    query = data["semantic_query"].lower()
+    if computed:
+        summary_prompt = f"""
+        You are a helpful CRM assistant that provides natural, conversational responses to user queries about Zoho CRM data.
 
-    # Simple intent classification 
-    is_search = any(t in query for t in ["show", "find", "list", "get", "search", "display"])
-    is_count = any(t in query for t in ["how many", "count", "number of"])
-    is_specific = any(t in query for t in ["who", "what", "which", "when", "where", "highest", "lowest", "top"])
-    is_summary = any(t in query for t in ["summary", "overview", "insight", "analyze"])
+        The user asked: "{data['semantic_query']}"
 
-    intent_flags = {
-        "search": is_search,
-        "count": is_count,
-        "specific": is_specific,
-        "summary": is_summary
-    }
+        This answer was computed exactly from their CRM records:
+        {computed}
+
+        Rephrase it as a short, natural reply. Keep every name and number exactly as given and do not add facts.
+        """
+    else:
+        query = data["semantic_query"].lower()
 
-    summary_prompt = f"""
-    You are a helpful CRM assistant that provides natural, conversational responses to user queries about Zoho CRM data.
+        # Simple intent classification 
+        is_search = any(t in query for t in ["show", "find", "list", "get", "search", "display"])
+        is_count = any(t in query for t in ["how many", "count", "number of"])
+        is_specific = any(t in query for t in ["who", "what", "which", "when", "where", "highest", "lowest", "top"])
+        is_summary = any(t in query for t in ["summary", "overview", "insight", "analyze"])
+
+        intent_flags = {
+            "search": is_search,
+            "count": is_count,
+            "specific": is_specific,
+            "summary": is_summary
+        }
+
+        filter_keys = [f.key for f in data.get("filters") or []]
+        records_text, shown, total = compact_records(records, data.get("module"), filter_keys)
+        matched = data["records_table"].rows if data.get("records_table") else total
+        coverage = f"all {matched} records" if shown == matched else f"{shown} of {matched} records"
+
+        summary_prompt = f"""
+        You are a helpful CRM assistant that provides natural, conversational responses to user queries about Zoho CRM data.
     
-    The user asked: "{data['semantic_query']}"
+        The user asked: "{data['semantic_query']}"
     
-    Here is the relevant data:
-    {json.dumps(records, indent=2)}
-
-    Rules for your response:
-    1. Be conversational and natural - don't sound like a robot listing data
-    2. If the user is searching for specific information, focus on answering their question directly
-    3. If they're looking for a list, organize the information in a way that makes sense for their query
-    4. If they're asking about counts or numbers, provide the count in a natural way
-    5. Use appropriate context from the query to frame your response
-    6. Don't just list the data - explain what it means in relation to their question
-    7. If there are multiple records, group or summarize them meaningfully
-    8. Use natural language to describe relationships between data points
-    9. Avoid technical jargon unless the user's query specifically asks for it
-
-    Intent flags: {json.dumps(intent_flags)}
-
-    Respond as if you're having a conversation with the user, not just listing data.
-    """
+        Here is the relevant data, as tab-separated rows ({coverage}):
+        {records_text}
+
+        Rules for your response:
+        1. Be conversational and natural - don't sound like a robot listing data
+        2. If the user is searching for specific information, focus on answering their question directly
+        3. If they're looking for a list, organize the information in a way that makes sense for their query
+        4. If they're asking about counts or numbers, provide the count in a natural way
+        5. Use appropriate context from the query to frame your response
+        6. Don't just list the data - explain what it means in relation to their question
+        7. If there are multiple records, group or summarize them meaningfully
+        8. Use natural language to describe relationships between data points
+        9. Avoid technical jargon unless the user's query specifically asks for it
+
+        Intent flags: {json.dumps(intent_flags)}
+
+        Respond as if you're having a conversation with the user, not just listing data.
+        """
+
+    messages = [
+        {"role": "system", "content": "You are a helpful CRM assistant that provides natural, conversational responses about CRM data."},
+        {"role": "user", "content": summary_prompt}
+    ]
+
+    # Streaming callers run the completion themselves, token by token.
+    if data.get("stream_summary"):
+        data["summary_messages"] = messages
+        return data
 
-    summary_response = await client.chat.completions.create(
-        model="gpt-4.1-mini",
-        messages=[
-            {"role": "system", "content": "You are a helpful CRM assistant that provides natural, conversational responses about CRM data."},
-            {"role": "user", "content": summary_prompt}
-        ],
-        temperature=0.7  
-    )
+    try:
+        summary_response = await llm.chat(
+            "summary",
+            model="gpt-4.1-mini",
+            messages=messages,
+            temperature=0.7  
+        )
+    except BackendUnavailable as e:
+        tracer.event("summary_skipped", error=str(e))
+        return {**summary_without_llm(data), "degraded": [*(data.get("degraded") or []), "summary"]}
 
     data["response"] = summary_response.choices[0].message.content
     return data
 
 
+def summary_without_llm(data: dict) -> dict:
+    """The reply when the summary ran out of time: the computed answer, or the records themselves."""
+    data = dict(data)
+    if data.get("error") or not data.get("records_response") or data.get("response"):
+        return data
+    records = data["records_response"].get("results", {}).get("data", [])
+    computed, _ = _computed_answer(data, records)
+    if computed:
+        data["response"] = computed
+    elif not records:
+        data["response"] = "I couldn't find any matching records for your query."
+    else:
+        filter_keys = [f.key for f in data.get("filters") or []]
+        records_text, shown, total = compact_records(records, data.get("module"), filter_keys)
+        data["response"] = (
+            f"A written summary was not ready in time, so here are {shown} of the {total} matching "
+            f"{data.get('module')} records:\n{records_text}"
+        )
+    return data
+
+
+def plan_without_llm(state: dict) -> dict:
+    """A plan from the keyword router, for when reasoning ran out of time."""
+    query = state["query"]
+    return {
+        **state,
+        "module": named_module(query) or rank_modules(query)[0],
+        "complexity": classify_complexity(query),
+        "semantic_query": query,
+        "path": "two_step",
+    }
+
+
+def tools_timed_out(state: dict) -> dict:
+    return {
+        **state,
+        "error": "Fetching records took too long.",
+        "type": "BudgetExhausted",
+        "response": "Sorry, fetching your CRM records took too long. Please try again or narrow the question.",
+    }
+
+
+async def stream_summary(messages: list):
+    """Yield the summary completion for `messages` as it is generated."""
+    async for token in llm.stream_chat("summary", model="gpt-4.1-mini", messages=messages, temperature=0.7):
+        yield token
+
+
+def _instrumented(name: str, node, degrade=None):
+    """Wrap a node with its span, metrics and time budget.
+
+    When the budget runs out, `degrade(state)` supplies the node's result if
+    given; otherwise BudgetExhausted propagates.
+    """
+    async def run(state):
+        start = time.perf_counter()
+        try:
+            with tracer.span(f"node:{name}"):
+                try:
+                    result = await run_within(name, state.get("deadline"), node(state), state.get("stage_budgets"))
+                except BudgetExhausted as e:
+                    if degrade is None:
+                        raise
+                    tracer.event("budget_exhausted", budget=round(e.budget, 3))
+                    result = {**degrade(state), "degraded": [*(state.get("degraded") or []), name]}
+        except Exception as e:
+            node_errors.inc(node=name, type=type(e).__name__)
+            raise
+        finally:
+            node_latency.observe(time.perf_counter() - start, node=name)
+        if result.get("error") and not state.get("error"):
+            node_errors.inc(node=name, type=result.get("type", "error"))
+        return result
+    return run
+
+
 async def build_graph():
+    # Imported here so that importing this module stays cheap; see main.py's warmup.
+    from langgraph.graph import StateGraph
+
     builder = StateGraph(dict)
 
+    # The compiled graph is shared by concurrent requests, so nodes build a
+    # new state dict instead of mutating the one they were handed.
+    async def fast_path_node(state):
+        compiled = compile_query(state["query"]) if FAST_PATH_ENABLED else None
+        if compiled is None:
+            return state
+        tracer.event("fast_path_compiled", module=compiled["module"])
+        return {**state, **compiled, "semantic_query": state["query"], "path": "fast_path"}
+
+    def route_after_fast_path(state):
+        if state.get("filters"):
+            return "tools"
+        if SIMPLE_PATH_MODE == "always" or (
+            SIMPLE_PATH_MODE == "auto" and classify_complexity(state["query"]) == "simple"
+        ):
+            return "single_shot"
+        return "reasoning"
+
+    async def single_shot_node(state):
+        planning = await plan_and_filter_step(state["query"])
+        return {**state, **planning}
+
+    def route_after_single_shot(state):
+        return "tools" if state.get("filters") else "reasoning"
+
     async def reasoning_node(state):
-        planning = await reasoning_step(state["query"])
-        state.update(planning)
-        return state
+        query = state["query"]
+        # A cached plan needs no speculation: nothing would use the prefetch.
+        planning = cached_plan(query)
+        if planning is not None:
+            return {**state, **planning, "path": "two_step", "prefetched_descriptors": None}
+        speculation = None
+        if SPECULATION_ENABLED:
+            # Descriptors are looked up with the user's query on both paths (see
+            # tool_node); a prefetch is only kept if module and complexity match.
+            speculation = DescriptorSpeculation(
+                lambda module, complexity: fetch_descriptors(query, module, complexity),
+                rank_modules(query)[:SPECULATION_CANDIDATES],
+                classify_complexity(query),
+            )
+        try:
+            planning = await reasoning_step(query, check_cache=False)
+        except BaseException:
+            if speculation:
+                speculation.cancel()
+            raise
+        prefetched = await speculation.resolve(planning["module"], planning["complexity"]) if speculation else None
+        return {**state, **planning, "path": "two_step", "prefetched_descriptors": prefetched}
 
     async def tool_node(state):
-        tool_data = await tool_use_step(state["semantic_query"], state["module"], state["complexity"])
-        state.update(tool_data)
-        return state
+        tool_data = await tool_use_step(
+            state["semantic_query"], state["module"], state["complexity"],
+            state.get("filters"), state.get("prefetched_descriptors"),
+            parse_intent(state["query"], state["module"]) if ANALYTICS_MODE != "off" else None,
+            # The same question speculation prefetched descriptors for.
+            descriptor_query=state["query"],
+        )
+        return {**state, **tool_data}
 
     async def summary_node(state):
-        state = await summarization_step(state)
-        return state
-
-    builder.add_node("reasoning", reasoning_node)
-    builder.add_node("tools", tool_node)
-    builder.add_node("summary", summary_node)
-
-    builder.set_entry_point("reasoning")
+        return await summarization_step(dict(state))
+
+    builder.add_node("fast_path", _instrumented("fast_path", fast_path_node))
+    # A stage that runs out of time falls back to the next best thing.
+    builder.add_node("single_shot", _instrumented("single_shot", single_shot_node, degrade=dict))
+    builder.add_node("reasoning", _instrumented("reasoning", reasoning_node, degrade=plan_without_llm))
+    builder.add_node("tools", _instrumented("tools", tool_node, degrade=tools_timed_out))
+    builder.add_node("summary", _instrumented("summary", summary_node, degrade=summary_without_llm))
+
+    builder.set_entry_point("fast_path")
+    builder.add_conditional_edges(
+        "fast_path", route_after_fast_path,
+        {"tools": "tools", "single_shot": "single_shot", "reasoning": "reasoning"},
+    )
+    builder.add_conditional_edges("single_shot", route_after_single_shot, {"tools": "tools", "reasoning": "reasoning"})
     builder.add_edge("reasoning", "tools")
     builder.add_edge("tools", "summary")
     builder.set_finish_point("summary")
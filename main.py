@@ -1,20 +1,60 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from routers.chat_router import router as chat_router
+from routers.job_router import router as job_router
 from routers.token_router import router as token_router
+from routers.admin_router import router as admin_router
+from routers.debug_router import router as debug_router
+from services.mcp_pool import mcp_pool
+from services.jobs import job_queue
+from services.token_manager import token_manager
+from services.shared_state import shared_state
+from services.http_metrics import MetricsMiddleware
+from services.tracing import tracer
+from services import metrics, warmup
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await tracer.start()
+    await shared_state.start()
+    await token_manager.start()
+    # Graph, MCP sessions and the OpenAI connection; see WARMUP_MODE.
+    await warmup.start()
+    await job_queue.start()
+    yield
+    await job_queue.close()
+    await warmup.close()
+    await mcp_pool.close()
+    await token_manager.close()
+    await shared_state.close()
+    await tracer.close()
 
-app = FastAPI(title="Zoho CRM LangGraph MCP Agent")
+
+app = FastAPI(title="Zoho CRM LangGraph MCP Agent", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"]
 )
+app.add_middleware(MetricsMiddleware)
 
 @app.get("/")
 async def root():
     return {"status": "Zoho MCP FastAPI backend is running."}
 
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
 app.include_router(chat_router)
-app.include_router(token_router)
\ No newline at end of file
+app.include_router(job_router)
+app.include_router(token_router)
+app.include_router(admin_router)
+app.include_router(debug_router)
@@ -8,3 +8,15 @@ class QueryResponse(BaseModel):
     response: Optional[str] = None
     messages: List[Dict[str, Any]] = []
     tool_output: Dict[str, Any] = {}
+    trace_id: Optional[str] = None
+
+class JobResponse(BaseModel):
+    id: str
+    status: str
+    lane: str
+    stage: Optional[str] = None
+    progress: float = 0.0
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[QueryResponse] = None
@@ -0,0 +1,53 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends
+
+from services.plan_cache import plan_cache
+from services.filter_cache import filter_cache
+from services.records_cache import records_cache
+from services.agent_runner import chat_flights
+from services.token_manager import token_manager
+from services.resilience import backend_stats
+from services.jobs import job_queue
+from services import metrics, warmup
+from routers.debug_router import require_debug_access
+
+router = APIRouter(prefix="/admin")
+
+
+def cache_stats() -> dict:
+    return {
+        "plan": plan_cache.stats(),
+        "filters": filter_cache.stats(),
+        "records": records_cache.stats(),
+    }
+
+
+metrics.gauge_callback(
+    "cache_hit_ratio", "Hit ratio of each in-process cache",
+    lambda: [({"cache": name}, s["hit_ratio"]) for name, s in cache_stats().items()],
+)
+metrics.gauge_callback(
+    "chat_coalescing_ratio", "Share of /chat calls served by an identical in-flight run",
+    lambda: [({}, chat_flights.stats()["coalescing_ratio"])],
+)
+
+
+@router.get("/stats")
+async def stats():
+    return {
+        "caches": cache_stats(),
+        "chat_coalescing": chat_flights.stats(),
+        "token": token_manager.stats(),
+        "backends": backend_stats(),
+        "startup": warmup.stats(),
+        "jobs": job_queue.stats(),
+        "metrics": metrics.snapshot(),
+    }
+
+
+# Changes state, so it is gated like /debug.
+@router.post("/cache/records/invalidate", dependencies=[Depends(require_debug_access)])
+async def invalidate_records(module: Optional[str] = None):
+    removed = await records_cache.invalidate_module(module)
+    return {"status": "ok", "module": module or "all", "invalidated": removed}
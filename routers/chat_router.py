@@ -1,12 +1,27 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from model.schema import QueryRequest, QueryResponse
-from services.agent_runner import run_agent
+from services.agent_runner import admission, run_agent, stream_agent
 import json
+import math
 
 router = APIRouter()
 
+
+def _unavailable(reason: str, retry_after: float):
+    return HTTPException(status_code=503, detail=reason, headers={"Retry-After": str(max(1, math.ceil(retry_after)))})
+
+
+def shed_load():
+    """Refuse a run up front when a dependency it needs is down or saturated."""
+    refused = admission()
+    if refused:
+        raise _unavailable(*refused)
+
+
 @router.post("/chat", response_model=QueryResponse)
 async def chat_endpoint(request: QueryRequest):
+    shed_load()
     try:
         result = await run_agent(request.query)
 
@@ -17,15 +32,32 @@ async def chat_endpoint(request: QueryRequest):
             except json.JSONDecodeError:
                 tool_output = {"raw": tool_output, "error": "Failed to parse tool_output JSON"}
 
+        if tool_output.get("retry_after") is not None:
+            raise _unavailable(result.get("response"), tool_output["retry_after"])
+
         return QueryResponse(
             response=result.get("response"),
             messages=result.get("messages", []),
-            tool_output=tool_output
+            tool_output=tool_output,
+            trace_id=result.get("trace_id")
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         return QueryResponse(
             response="An error occurred while processing your request.",
             messages=[],
             tool_output={"error": str(e)}
         )
+
+
+@router.post("/chat/stream")
+async def chat_stream_endpoint(request: QueryRequest):
+    """NDJSON stream: one event per graph node, then `token` events, then `done`."""
+    shed_load()
+    async def events():
+        async for event in stream_agent(request.query):
+            yield json.dumps(event, default=str) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
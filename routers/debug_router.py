@@ -0,0 +1,30 @@
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from config.settings import DEBUG_ENDPOINTS_ENABLED, DEBUG_TOKEN
+from services.tracing import tracer
+
+
+def require_debug_access(x_debug_token: Optional[str] = Header(default=None)):
+    if not DEBUG_ENDPOINTS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if DEBUG_TOKEN and not secrets.compare_digest(x_debug_token or "", DEBUG_TOKEN):
+        raise HTTPException(status_code=401, detail="Missing or invalid X-Debug-Token")
+
+
+router = APIRouter(prefix="/debug", dependencies=[Depends(require_debug_access)])
+
+
+@router.get("/traces")
+async def recent_traces(limit: int = 50):
+    return {"traces": tracer.recent(limit)}
+
+
+@router.get("/traces/{trace_id}")
+async def get_trace(trace_id: str):
+    trace = tracer.get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found (it may have aged out of the buffer)")
+    return trace
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, HTTPException
+from model.schema import QueryRequest, JobResponse
+from services.jobs import QueueFull, job_queue
+
+router = APIRouter()
+
+
+@router.post("/jobs", response_model=JobResponse, status_code=202)
+async def create_job(request: QueryRequest):
+    """Queue the query; poll GET /jobs/{id} for stage, progress and the result."""
+    try:
+        return await job_queue.submit(request.query)
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=f"job queue is full ({e})", headers={"Retry-After": "5"})
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    return job
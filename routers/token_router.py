@@ -1,34 +1,16 @@
-import json
-import os
 from fastapi import APIRouter, Request, HTTPException
 
-router = APIRouter()
+from services.token_manager import token_manager, TokenRefreshError
 
-# In-memory token storage
-token_data_memory = None
+router = APIRouter()
 
-# Optional: File backup path
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-TOKEN_PATH = os.path.join(BASE_DIR, "token_store.json")
 
 @router.post("/save-token")
 async def save_token(request: Request):
-    global token_data_memory
-
     try:
         token_data = await request.json()
-
-        # Inject timestamp if not present
-        if "timestamp" not in token_data:
-            import time
-            token_data["timestamp"] = int(time.time())
-
-        token_data_memory = token_data
-        print(token_data_memory)
-
-        with open(TOKEN_PATH, "w") as f:
-            json.dump(token_data, f, indent=2)
-
+        saved = await token_manager.save(token_data)
+        print(f"Zoho token saved, expires in {saved.get('expires_in')}s")
         return {"status": "Token saved successfully"}
 
     except Exception as e:
@@ -37,13 +19,12 @@ async def save_token(request: Request):
 
 @router.get("/token")
 async def get_token():
-    global token_data_memory
-
-    if token_data_memory:
-        return token_data_memory
+    try:
+        token = await token_manager.get()
+    except TokenRefreshError as e:
+        raise HTTPException(status_code=502, detail=str(e))
 
-    if os.path.exists(TOKEN_PATH):
-        with open(TOKEN_PATH, "r") as f:
-            return json.load(f)
+    if token:
+        return token
 
     raise HTTPException(status_code=404, detail="No token found")
@@ -1,28 +1,230 @@
-from langgraph.graph_agent import build_graph
+import asyncio
+import time
+
+from config.settings import CHAT_COALESCING_ENABLED, MAX_CONCURRENT_RUNS, REQUEST_DEADLINE
+from langgraph.graph_agent import build_graph, stream_summary, summary_without_llm
+from services.singleflight import SingleFlight
+from services import metrics
+from services.deadline import budget_exhausted, new_deadline, stage_budget
+from services.resilience import BackendUnavailable, shed_reason
+from services.tracing import tracer
+
+_graph = None
+_graph_lock = asyncio.Lock()
+
+chat_flights = SingleFlight()
+graph_latency = metrics.histogram("graph_latency_seconds", "End-to-end graph latency by execution path")
+runs_in_flight = metrics.gauge("agent_runs_in_flight", "Graph executions currently running, by mode (invoke/stream)")
+run_errors = metrics.counter("agent_errors_total", "Agent runs that failed, by exception type")
+
+
+async def init_graph():
+    """Compile the agent graph once and keep it for the lifetime of the app."""
+    global _graph
+    async with _graph_lock:
+        if _graph is None:
+            _graph = await build_graph()
+    return _graph
+
+
+async def get_graph():
+    if _graph is not None:
+        return _graph
+    return await init_graph()
+
 
 async def run_agent(query: str):
-    try:
-        graph = await build_graph()
-        result = await graph.ainvoke({"query": query})  
-        return {
-            "response": result.get("response"),
-            "messages": [],  
-            "tool_output": {
-                "module": result.get("module"),
-                "complexity": result.get("complexity"),
-                "semantic_query": result.get("semantic_query"),
-                "url": result.get("url"),
-                "records_response": result.get("records_response"),
-            }
+    """Run the agent for `query`, sharing the execution with identical in-flight queries.
+
+    Every call gets its own trace; a call that joined another's execution
+    points at that run's trace, which holds the spans.
+    """
+    with tracer.trace("chat", query=query) as trace:
+        if not CHAT_COALESCING_ENABLED:
+            result = await _execute(query)
+        else:
+            result = await chat_flights.do(query.strip(), lambda: _execute(query))
+        if trace is None:
+            return result
+        if result.get("trace_id") != trace.id:
+            tracer.annotate(coalesced_into=result.get("trace_id"))
+        tracer.annotate(path=result["tool_output"].get("path"))
+        return {**result, "trace_id": trace.id}
+
+
+def admission():
+    """(reason, retry_after) when a new run should be refused with 503, else None."""
+    if MAX_CONCURRENT_RUNS > 0:
+        running = runs_in_flight.value(mode="invoke") + runs_in_flight.value(mode="stream")
+        if running >= MAX_CONCURRENT_RUNS:
+            return "too many requests in progress", 1.0
+    return shed_reason()
+
+
+def _to_result(state: dict):
+    return {
+        "response": state.get("response"),
+        "messages": [],  
+        "tool_output": {
+            "module": state.get("module"),
+            "complexity": state.get("complexity"),
+            "semantic_query": state.get("semantic_query"),
+            "path": state.get("path"),
+            "url": state.get("url"),
+            "records_response": state.get("records_response"),
+            "degraded": state.get("degraded"),
+            "retry_after": state.get("retry_after"),
         }
+    }
 
-    except Exception as e:
+
+def _error_result(e: Exception):
+    run_errors.inc(type=type(e).__name__)
+    if isinstance(e, BackendUnavailable):
         return {
-            "response": "An error occurred.",
+            "response": f"The service is busy right now. Please try again in {max(1, round(e.retry_after))} seconds.",
             "messages": [],
             "tool_output": {
                 "error": str(e),
-                "type": type(e).__name__
+                "type": type(e).__name__,
+                "retry_after": e.retry_after,
             }
         }
+    return {
+        "response": "An error occurred.",
+        "messages": [],
+        "tool_output": {
+            "error": str(e),
+            "type": type(e).__name__
+        }
+    }
+
+
+async def _execute(query: str):
+    try:
+        graph = await get_graph()
+        start = time.perf_counter()
+        with runs_in_flight.track(mode="invoke"):
+            result = await graph.ainvoke({"query": query, "deadline": new_deadline()})
+        graph_latency.observe(time.perf_counter() - start, path=result.get("path", "unknown"))
+        return {**_to_result(result), "trace_id": tracer.current_trace_id()}
+
+    except Exception as e:
+        return {**_error_result(e), "trace_id": tracer.current_trace_id()}
+
+
+def _node_event(node: str, state: dict):
+    event = {"event": node}
+    if node == "fast_path":
+        event.update(matched=bool(state.get("filters")), module=state.get("module"))
+    elif node in ("reasoning", "single_shot"):
+        event.update(
+            module=state.get("module"),
+            complexity=state.get("complexity"),
+            semantic_query=state.get("semantic_query"),
+        )
+    elif node == "tools":
+        records = (state.get("records_response") or {}).get("results", {}) or {}
+        event.update(
+            url=state.get("url"),
+            backend=state.get("backend"),
+            record_count=(records.get("info") or {}).get("count", len(records.get("data") or [])),
+            error=state.get("error"),
+        )
+    return event
+
+
+_END = object()
+
+
+async def _stream_within_budget(tokens, deadline, budgets: dict = None):
+    """Relay `tokens` until the summary budget is spent, then yield None once.
+
+    One task of its own drains `tokens`, so the spans the stream opens are
+    entered and left in the same context (a wait_for per token would run each
+    step in a different one).
+    """
+    queue = asyncio.Queue()
+
+    async def drain():
+        try:
+            async for token in tokens:
+                queue.put_nowait(token)
+            queue.put_nowait(_END)
+        except Exception as e:
+            queue.put_nowait(e)
+        finally:
+            await tokens.aclose()
+
+    budget = stage_budget("summary", deadline, budgets)
+    ends = None if budget is None else time.monotonic() + budget
+    task = asyncio.create_task(drain())
+    try:
+        while True:
+            try:
+                timeout = None if ends is None else max(0, ends - time.monotonic())
+                item = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                budget_exhausted.inc(stage="summary")
+                tracer.event("budget_exhausted", stage="summary")
+                yield None
+                return
+            if item is _END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+async def stream_agent(query: str, deadline: float = REQUEST_DEADLINE, stage_budgets: dict = None):
+    """Yield progress events as each graph node completes, then the summary tokens.
+
+    The last event is always `done` (with the same payload run_agent returns)
+    or `error`. `deadline` is the run's time budget in seconds; `stage_budgets`
+    replaces STAGE_BUDGETS for this run.
+    """
+    runs_in_flight.inc(mode="stream")
+    with tracer.trace("chat_stream", query=query):
+        trace_id = tracer.current_trace_id()
+        try:
+            graph = await get_graph()
+            start = time.perf_counter()
+            state = {}
+            initial = {"query": query, "stream_summary": True, "deadline": new_deadline(deadline),
+                       "stage_budgets": stage_budgets}
+            async for update in graph.astream(initial, stream_mode="updates"):
+                for node, node_state in update.items():
+                    state = node_state
+                    yield _node_event(node, state)
+
+            messages = state.get("summary_messages")
+            if messages and not state.get("response"):
+                parts = []
+                async for token in _stream_within_budget(stream_summary(messages), state.get("deadline"),
+                                                       state.get("stage_budgets")):
+                    if token is None:
+                        # Out of time: finish with what we have, or the records without a summary.
+                        state = {**state, "degraded": [*(state.get("degraded") or []), "summary"]}
+                        if not parts:
+                            token = summary_without_llm(state).get("response") or ""
+                            parts.append(token)
+                            yield {"event": "token", "text": token}
+                        break
+                    parts.append(token)
+                    yield {"event": "token", "text": token}
+                state = {**state, "response": "".join(parts)}
+
+            graph_latency.observe(time.perf_counter() - start, path=state.get("path", "unknown"))
+            tracer.annotate(path=state.get("path"))
+            yield {"event": "done", **_to_result(state), "trace_id": trace_id}
 
+        except Exception as e:
+            yield {"event": "error", **_error_result(e), "trace_id": trace_id}
+        finally:
+            runs_in_flight.dec(mode="stream")
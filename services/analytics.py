@@ -0,0 +1,244 @@
+import math
+import re
+from array import array
+
+# Deterministic answers for count / sum / average / top-N / highest / lowest /
+# group-by questions, computed over a columnar copy of the fetched records.
+
+METRIC_FIELDS = {
+    "Deals": {"Amount": ["amount", "value", "size", "revenue", "worth"], "Probability": ["probability"]},
+    "Leads": {"Annual_Revenue": ["annual revenue", "revenue"], "No_of_Employees": ["employees", "employee count"]},
+    "Contacts": {},
+}
+GROUP_FIELDS = {
+    "Deals": {"Stage": ["stage", "status"], "Owner": ["owner", "rep", "sales rep"], "Lead_Source": ["source"]},
+    "Leads": {"Lead_Status": ["status", "stage"], "Owner": ["owner", "rep"], "Lead_Source": ["source"], "Industry": ["industry"]},
+    "Contacts": {"Owner": ["owner"], "Account_Name": ["account", "company"], "Lead_Source": ["source"]},
+}
+LABEL_FIELDS = {
+    "Deals": ["Deal_Name"],
+    "Leads": ["Full_Name", "First_Name", "Last_Name", "Company"],
+    "Contacts": ["Full_Name", "First_Name", "Last_Name"],
+}
+
+# Aggregate phrasing only: the operation has to name what it aggregates
+# ("how many deals", "total amount", "top 5 deals by amount", "... by stage"
+# at the end). A number, field or "by" elsewhere in a question is usually a
+# filter, so anything looser is left to the LLM.
+_NOUNS = r"(?:deals?|opportunit(?:y|ies)|leads?|prospects?|contacts?|records?)"
+_NOUN = r"(?:deal|opportunity|lead|prospect|contact|record)"
+_FILLER = r"(?:\w+\s+){0,2}?"
+# "total value over 10000" is a filter on the field, not a sum of it.
+_NOT_A_FILTER = (r"(?!\s+(?:of\s+)?(?:is\s+|are\s+)?(?:over|above|under|below|greater|more|less|fewer|higher|lower|"
+                 r"exceeding|at least|at most|between|equal|[<>=]))")
+
+_COUNT = re.compile(
+    rf"\bhow many\s+{_FILLER}{_NOUNS}\b"
+    rf"|^(?:(?:what(?:'s| is)|tell me|give me|show(?: me)?|get)\s+)?(?:the\s+)?(?:total\s+)?(?:count|number)\s+of\s+{_FILLER}{_NOUNS}\b"
+    rf"|^count\s+(?:all\s+|the\s+)?{_FILLER}{_NOUNS}\b"
+)
+_SUM = r"\b(?:total|sum of(?:\s+the)?|combined)\s+(?:(?:deal|lead)\s+)?(?P<field>{metric})\b" + _NOT_A_FILTER
+_AVG = r"\b(?:average|avg|mean)\s+(?:(?:deal|lead)\s+)?(?P<field>{metric})\b" + _NOT_A_FILTER
+_TOP = rf"\b(?:top|largest|biggest|highest)\s+(?P<n>\d+)\s+(?:\w+\s+)?{_NOUNS}\b(?:\s+by\s+(?P<field>{{metric}})\b)?"
+_BOTTOM = rf"\b(?:bottom|smallest|lowest)\s+(?P<n>\d+)\s+(?:\w+\s+)?{_NOUNS}\b(?:\s+by\s+(?P<field>{{metric}})\b)?"
+_MAX = rf"\b(?:highest|largest|biggest|max|maximum|most valuable)\s+(?:(?:deal|lead)\s+)?(?:(?P<field>{{metric}})|{_NOUN})\b" + _NOT_A_FILTER
+_MIN = rf"\b(?:lowest|smallest|min|minimum|least valuable)\s+(?:(?:deal|lead)\s+)?(?:(?P<field>{{metric}})|{_NOUN})\b" + _NOT_A_FILTER
+# The grouping has to end the question: "deals created by stage owners" is not one.
+_GROUP = re.compile(
+    r"(?:(?<=\s)|^)(?:grouped by|broken down by|breakdown by|by|per|for each|each)\s+(?:deal\s+|lead\s+)?"
+    r"(?P<by>\w+(?:\s\w+)?)\s*[?.!]?$"
+)
+_PARTICIPLE = re.compile(r"\b(?!grouped\b)\w+ed\s+by\s+\S+(?:\s\S+)?\s*[?.!]?$")
+
+
+class Column:
+    """One field: doubles in an array('d') (NaN = missing) or a list of strings."""
+
+    def __init__(self, rows: int = 0):
+        self.kind = "number"
+        self.values = array("d", [math.nan] * rows)
+
+    def append(self, value):
+        if isinstance(value, dict):
+            value = value.get("name") or value.get("id")
+        if self.kind == "number":
+            if value is None or (isinstance(value, (int, float)) and not isinstance(value, bool)):
+                self.values.append(math.nan if value is None else float(value))
+                return
+            self.kind = "text"
+            self.values = ["" if math.isnan(v) else _format_number(v) for v in self.values]
+        self.values.append("" if value is None else str(value))
+
+
+class RecordTable:
+    def __init__(self):
+        self.rows = 0
+        self.columns = {}
+
+    @classmethod
+    def from_records(cls, records: list) -> "RecordTable":
+        table = cls()
+        table.add_records(records)
+        return table
+
+    def add_records(self, records: list):
+        for record in records:
+            for name in record:
+                if name not in self.columns and not name.startswith("$"):
+                    self.columns[name] = Column(self.rows)
+            for name, column in self.columns.items():
+                column.append(record.get(name))
+            self.rows += 1
+
+    def numbers(self, field: str) -> list:
+        column = self.columns.get(field)
+        if column is None or column.kind != "number":
+            return []
+        return [(i, v) for i, v in enumerate(column.values) if not math.isnan(v)]
+
+    def text(self, field: str, row: int) -> str:
+        column = self.columns.get(field)
+        if column is None:
+            return ""
+        value = column.values[row]
+        return value if column.kind == "text" else ("" if math.isnan(value) else _format_number(value))
+
+    def label(self, module: str, row: int) -> str:
+        fields = LABEL_FIELDS.get(module, [])
+        if "First_Name" in fields and "Full_Name" not in self.columns:
+            name = " ".join(p for p in (self.text("First_Name", row), self.text("Last_Name", row)) if p)
+            if name:
+                return name
+        for field in fields:
+            if self.text(field, row):
+                return self.text(field, row)
+        return f"record {row + 1}"
+
+    def group_by(self, field: str, metric: str = None) -> dict:
+        """{group value: (count, metric sum or None)}, largest groups first."""
+        groups = {}
+        values = self.numbers(metric) if metric else []
+        metric_by_row = dict(values)
+        for row in range(self.rows):
+            key = self.text(field, row) or "(none)"
+            count, total = groups.get(key, (0, 0.0))
+            groups[key] = (count + 1, total + metric_by_row.get(row, 0.0))
+        ordered = sorted(groups.items(), key=lambda kv: (-kv[1][0], kv[0]))
+        return {k: (c, t if metric else None) for k, (c, t) in ordered}
+
+
+def _format_number(value: float) -> str:
+    return f"{int(value):,}" if float(value).is_integer() else f"{value:,.2f}"
+
+
+def _breakdown(groups: dict, rows: int, noun: str, by: str, metric_name: str, qualifier: str = "") -> str:
+    lines = []
+    for key, (count, total) in groups.items():
+        line = f"- {key}: {count:,}"
+        if total is not None:
+            line += f" ({metric_name} {_format_number(total)})"
+        lines.append(line)
+    by_name = by.replace("_", " ").lower()
+    return f"Here is the breakdown of the {rows:,} matching {noun} by {by_name}{qualifier}:\n" + "\n".join(lines)
+
+
+def _match_field(query: str, candidates: dict):
+    for field, aliases in candidates.items():
+        if any(re.search(rf"\b{re.escape(a)}\b", query) for a in aliases):
+            return field
+    return None
+
+
+def _aggregate(pattern: str, q: str, metrics: dict):
+    """(match, metric field) for an aggregate phrase, or (None, None)."""
+    aliases = "|".join(re.escape(a) for a in sorted((a for v in metrics.values() for a in v), key=len, reverse=True))
+    if not aliases:
+        return None, None
+    m = re.search(pattern.format(metric=aliases), q)
+    if not m:
+        return None, None
+    named = m.groupdict().get("field")
+    return m, _match_field(named, metrics) if named else next(iter(metrics))
+
+
+def parse_intent(query: str, module: str):
+    """Map a question to one analytic operation, or None if it is not one."""
+    q = " ".join(query.lower().split())
+    metrics = METRIC_FIELDS.get(module, {})
+
+    # "total amount of deals by stage" or "how many leads per owner"
+    group = _GROUP.search(q)
+    if group and not _PARTICIPLE.search(q):
+        by = _match_field(group.group("by"), GROUP_FIELDS.get(module, {}))
+        if by:
+            totals = _aggregate(_SUM, q, metrics)[1] or _aggregate(_AVG, q, metrics)[1]
+            return {"op": "group", "by": by, "metric": totals}
+
+    if _COUNT.search(q):
+        return {"op": "count"}
+    for pattern, op in ((_AVG, "avg"), (_SUM, "sum")):
+        m, metric = _aggregate(pattern, q, metrics)
+        if m:
+            return {"op": op, "metric": metric}
+    for pattern, reverse in ((_TOP, True), (_BOTTOM, False)):
+        m, metric = _aggregate(pattern, q, metrics)
+        if m:
+            return {"op": "top", "metric": metric, "n": int(m.group("n")), "reverse": reverse}
+    for pattern, reverse in ((_MAX, True), (_MIN, False)):
+        m, metric = _aggregate(pattern, q, metrics)
+        if m:
+            return {"op": "top", "metric": metric, "n": 1, "reverse": reverse}
+    return None
+
+
+def answer(table: RecordTable, module: str, intent: dict, complete: bool = True):
+    """A plain-language answer for `intent`, or None if the data cannot support it."""
+    noun = (module or "records").lower()
+    qualifier = "" if complete else " (from the records fetched so far; more matches exist)"
+    metric = intent.get("metric")
+    metric_name = (metric or "").replace("_", " ").lower()
+
+    if intent["op"] == "count":
+        prefix = "" if complete else "at least "
+        return f"There are {prefix}{table.rows:,} matching {noun}."
+
+    if intent["op"] == "group":
+        return _breakdown(table.group_by(intent["by"], metric), table.rows, noun, intent["by"], metric_name, qualifier)
+
+    values = table.numbers(metric)
+    if not values:
+        return None
+
+    if intent["op"] == "sum":
+        total = sum(v for _, v in values)
+        return f"The total {metric_name} across {len(values):,} matching {noun} is {_format_number(total)}{qualifier}."
+    if intent["op"] == "avg":
+        mean = sum(v for _, v in values) / len(values)
+        return f"The average {metric_name} across {len(values):,} matching {noun} is {_format_number(mean)}{qualifier}."
+
+    ranked = sorted(values, key=lambda rv: rv[1], reverse=intent["reverse"])[: intent["n"]]
+    direction = "highest" if intent["reverse"] else "lowest"
+    if len(ranked) == 1:
+        row, value = ranked[0]
+        return f"{table.label(module, row)} has the {direction} {metric_name}: {_format_number(value)}{qualifier}."
+    lines = [f"{i}. {table.label(module, row)}: {_format_number(value)}" for i, (row, value) in enumerate(ranked, 1)]
+    return f"The {len(ranked)} {noun} with the {direction} {metric_name}{qualifier}:\n" + "\n".join(lines)
+
+
+def answer_aggregate(module: str, intent: dict, aggregate: dict):
+    """Same wording as answer(), from server-side totals (see services.coql.parse_aggregate)."""
+    noun = (module or "records").lower()
+    metric_name = (intent.get("metric") or "").replace("_", " ").lower()
+
+    if intent["op"] == "count":
+        return f"There are {aggregate['count']:,} matching {noun}."
+    if not aggregate["count"]:
+        return None
+    if intent["op"] == "group":
+        return _breakdown(aggregate["groups"], aggregate["count"], noun, intent["by"], metric_name)
+    if aggregate.get("sum") is None:
+        return None
+    if intent["op"] == "sum":
+        return f"The total {metric_name} across {aggregate['count']:,} matching {noun} is {_format_number(aggregate['sum'])}."
+    mean = aggregate["sum"] / aggregate["count"]
+    return f"The average {metric_name} across {aggregate['count']:,} matching {noun} is {_format_number(mean)}."
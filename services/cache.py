@@ -0,0 +1,93 @@
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """In-process LRU cache with a per-entry time-to-live and hit/miss counters.
+
+    Bounded by entry count, and additionally by total size when `max_bytes` is
+    given; `sizeof` must then return the approximate size of a value in bytes.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300, clock=time.monotonic,
+                 max_bytes: int = None, sizeof=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        expires_at, value, _ = entry
+        if expires_at <= self.clock():
+            self._remove(key)
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl: float = None):
+        ttl = self.ttl if ttl is None else ttl
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        self._remove(key)
+        self._data[key] = (self.clock() + ttl, value, size)
+        self.bytes += size
+        while len(self._data) > self.maxsize or (
+            self.max_bytes is not None and self.bytes > self.max_bytes
+        ):
+            _, (_, _, evicted_size) = self._data.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+
+    def _remove(self, key):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+        return entry
+
+    def pop(self, key, default=None):
+        entry = self._remove(key)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        self._data.clear()
+        self.bytes = 0
+
+    def keys(self):
+        return list(self._data.keys())
+
+    def items(self):
+        """Live (key, value) pairs, oldest first. Does not touch LRU order or counters."""
+        now = self.clock()
+        return [(k, v) for k, (expires_at, v, _) in self._data.items() if expires_at > now]
+
+    def __contains__(self, key):
+        entry = self._data.get(key)
+        return entry is not None and entry[0] > self.clock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
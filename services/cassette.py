@@ -0,0 +1,175 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from config.settings import CASSETTE_MODE, CASSETTE_PATH, CASSETTE_LATENCY
+
+# Record/replay for the pipeline's external calls. In record mode every OpenAI
+# completion and MCP tool call is appended to a JSON-lines cassette together
+# with how long it took; in replay mode the same requests are answered from
+# the cassette, so a corpus of /chat queries runs without any network.
+#
+# A cassette pins "today": prompts carry the date, so replay (and any later
+# recording into the same file) uses the date the cassette was started on.
+
+
+class CassetteMiss(LookupError):
+    """Replay mode met a request that was never recorded."""
+
+
+class ReplayedError(Exception):
+    """A call that failed while recording, failing the same way on replay."""
+
+    def __init__(self, type_name: str, message: str):
+        super().__init__(f"{type_name}: {message}")
+        self.type_name = type_name
+
+
+def request_key(kind: str, name: str, request) -> str:
+    raw = json.dumps([kind, name, request], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class Cassette:
+    def __init__(self, mode: str = CASSETTE_MODE, path: str = CASSETTE_PATH, latency: str = CASSETTE_LATENCY):
+        if mode not in ("off", "record", "replay"):
+            raise ValueError(f"Unsupported CASSETTE_MODE: {mode}")
+        self.mode = mode
+        self.path = path
+        self.latency = latency
+        self.date = None
+        self.tools = {}
+        self.misses = 0
+        self._entries = {}
+        self._cursor = {}
+        self._lock = threading.Lock()
+        if mode != "off":
+            self._load()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    # -- file ------------------------------------------------------------
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            if self.replaying:
+                raise FileNotFoundError(f"No cassette at {self.path}; record one with CASSETTE_MODE=record")
+            self.date = datetime.now().strftime("%Y-%m-%d")
+            self._append({"type": "header", "date": self.date, "recorded_at": time.time()})
+            return
+        with open(self.path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                if item["type"] == "header":
+                    self.date = self.date or item["date"]
+                elif item["type"] == "tools":
+                    self.tools.update(item["tools"])
+                else:
+                    self._entries.setdefault(item["key"], []).append(item)
+
+    def _append(self, item: dict):
+        line = json.dumps(item, default=str)
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(line + "\n")
+
+    def _next(self, key: str, kind: str, name: str) -> dict:
+        entries = self._entries.get(key)
+        if not entries:
+            self.misses += 1
+            raise CassetteMiss(f"No recorded {kind} call for {name} ({key[:12]})")
+        # Identical requests replay their recordings in turn.
+        i = self._cursor.get(key, 0)
+        self._cursor[key] = i + 1
+        return entries[i % len(entries)]
+
+    async def _wait(self, seconds: float):
+        await asyncio.sleep(seconds if self.latency == "original" else 0)
+
+    # -- calls -----------------------------------------------------------
+
+    def record_tools(self, tools: dict):
+        """Remember the MCP tool schemas, so replayed sessions can describe their tools."""
+        if self.recording and tools != self.tools:
+            self.tools = dict(tools)
+            self._append({"type": "tools", "tools": self.tools})
+
+    async def call(self, kind: str, name: str, request, fn, encode=None, decode=None):
+        """await fn(), recorded or replayed under (kind, name, request)."""
+        if self.mode == "off":
+            return await fn()
+        key = request_key(kind, name, request)
+        if self.replaying:
+            entry = self._next(key, kind, name)
+            await self._wait(entry["elapsed"])
+            if entry.get("error"):
+                raise ReplayedError(*entry["error"])
+            return decode(entry["response"]) if decode else entry["response"]
+
+        start = time.perf_counter()
+        try:
+            result = await fn()
+        except Exception as e:
+            self._append({"type": kind, "name": name, "key": key, "request": request,
+                          "elapsed": time.perf_counter() - start, "error": [type(e).__name__, str(e)]})
+            raise
+        self._append({"type": kind, "name": name, "key": key, "request": request,
+                      "elapsed": time.perf_counter() - start, "response": encode(result) if encode else result})
+        return result
+
+    async def stream(self, kind: str, name: str, request, fn, encode=None, decode=None):
+        """Iterate the async iterator `await fn()` returns, recorded or replayed chunk by chunk."""
+        if self.mode == "off":
+            async for item in await fn():
+                yield item
+            return
+        key = request_key(kind, name, request)
+        if self.replaying:
+            entry = self._next(key, kind, name)
+            previous = 0.0
+            for offset, chunk in entry["chunks"]:
+                await self._wait(offset - previous)
+                previous = offset
+                yield decode(chunk) if decode else chunk
+            await self._wait(entry["elapsed"] - previous)
+            if entry.get("error"):
+                raise ReplayedError(*entry["error"])
+            return
+
+        start = time.perf_counter()
+        chunks, error = [], None
+        try:
+            async for item in await fn():
+                chunks.append((time.perf_counter() - start, encode(item) if encode else item))
+                yield item
+        except Exception as e:
+            error = [type(e).__name__, str(e)]
+            raise
+        finally:
+            self._append({"type": kind, "name": name, "key": key, "request": request,
+                          "elapsed": time.perf_counter() - start, "chunks": chunks, "error": error})
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "path": self.path if self.mode != "off" else None,
+            "date": self.date,
+            "recorded_calls": sum(len(v) for v in self._entries.values()),
+            "misses": self.misses,
+        }
+
+
+cassette = Cassette()
@@ -0,0 +1,153 @@
+import json
+import re
+from decimal import Decimal
+
+from model.filter import Filter, Operator
+
+# Second backend for the criteria compiler: turns a validated Filter list plus
+# an aggregate intent (count / sum / avg / group) into a Zoho COQL query, so
+# the server returns one number instead of every matching record.
+
+COQL_PATH = "/crm/v7/coql"
+
+# Lookup fields compare by id in COQL (Owner.id, Account_Name.id); filters and
+# group-bys over them stay on the search path, which matches by name.
+LOOKUP_FIELDS = {"Owner", "Created_By", "Modified_By", "Account_Name", "Contact_Name", "Vendor_Name"}
+
+_COMPARISONS = {
+    Operator.equals: "=",
+    Operator.not_equal: "!=",
+    Operator.greater_than: ">",
+    Operator.greater_equal: ">=",
+    Operator.less_than: "<",
+    Operator.less_equal: "<=",
+}
+_FIELD = re.compile(r"^[A-Za-z][A-Za-z0-9_]*$")
+
+
+def _literal(value) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        # Plain decimals: COQL rejects exponent notation such as 1e+16.
+        return format(Decimal(str(value)), "f")
+    return "'" + str(value).replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def build_condition(f: Filter):
+    """One COQL condition for `f`, or None if COQL cannot express it."""
+    if not _FIELD.match(f.key) or f.key in LOOKUP_FIELDS:
+        return None
+    op, value = f.value.operator, f.value.value
+    if op in _COMPARISONS and not isinstance(value, list):
+        return f"{f.key} {_COMPARISONS[op]} {_literal(value)}"
+    if op == Operator.between and isinstance(value, list) and len(value) == 2:
+        return f"{f.key} between {_literal(value[0])} and {_literal(value[1])}"
+    if op == Operator.in_:
+        values = value if isinstance(value, list) else str(value).split(",")
+        return f"{f.key} in ({', '.join(_literal(v) for v in values)})"
+    if op == Operator.starts_with and isinstance(value, str):
+        return f"{f.key} like {_literal(value.replace('%', '') + '%')}"
+    return None
+
+
+def build_where(filters: list[Filter]):
+    """WHERE clause for `filters`, or None if any filter cannot be expressed.
+
+    COQL only pairs two conditions per parenthesised group, so longer
+    conjunctions are nested: ((a and b) and c).
+    """
+    conditions = [build_condition(f) for f in filters]
+    if not conditions or None in conditions:
+        return None
+    where = conditions[0]
+    for condition in conditions[1:]:
+        where = f"({where} and {condition})"
+    return where
+
+
+def build_coql(module: str, filters: list[Filter], intent: dict):
+    """select_query for an aggregate `intent` (see analytics.parse_intent), or None."""
+    if not intent or intent.get("op") not in ("count", "sum", "avg", "group"):
+        return None
+    where = build_where(filters)
+    if where is None:
+        return None
+
+    metric = intent.get("metric")
+    if intent["op"] == "count":
+        select = "COUNT(id)"
+    elif intent["op"] in ("sum", "avg"):
+        if not metric or not _FIELD.match(metric):
+            return None
+        select = f"COUNT({metric}), SUM({metric})"
+    else:
+        by = intent.get("by")
+        if not by or by in LOOKUP_FIELDS or not _FIELD.match(by):
+            return None
+        select = f"{by}, COUNT(id)" + (f", SUM({metric})" if metric else "")
+        return f"select {select} from {module} where {where} group by {by} limit 2000"
+    return f"select {select} from {module} where {where}"
+
+
+def supports_coql(tool) -> bool:
+    """True when the fetch tool can send a POST body (COQL is POST-only)."""
+    schema = getattr(tool, "args_schema", None)
+    if isinstance(schema, dict):
+        properties = schema.get("properties") or {}
+    elif schema is not None and hasattr(schema, "model_json_schema"):
+        properties = schema.model_json_schema().get("properties") or {}
+    else:
+        properties = getattr(tool, "args", None) or {}
+    return "method" in properties and "body" in properties
+
+
+def coql_args(tool, base_url: str, select_query: str) -> dict:
+    body = {"select_query": select_query}
+    schema = getattr(tool, "args_schema", None)
+    body_type = ((schema or {}).get("properties") or {}).get("body", {}).get("type") if isinstance(schema, dict) else None
+    return {
+        "url": base_url.rstrip("/") + COQL_PATH,
+        "method": "POST",
+        "body": json.dumps(body) if body_type == "string" else body,
+    }
+
+
+def _number(row: dict, name: str):
+    for key, value in row.items():
+        if key.replace(" ", "").lower() == name.lower():
+            return value
+    return None
+
+
+def parse_aggregate(result, intent: dict):
+    """{"count", "sum"} or {"count", "groups": {value: (count, sum)}} from a COQL response, or None."""
+    if not isinstance(result, dict) or result.get("error"):
+        return None
+    body = result.get("results", result)
+    if body is None:
+        # 204: nothing matched
+        return {"count": 0, "groups": {}} if intent["op"] == "group" else {"count": 0, "sum": None}
+    rows = body.get("data")
+    if not isinstance(rows, list):
+        return None
+
+    metric = intent.get("metric")
+    if intent["op"] == "group":
+        groups = {}
+        for row in rows:
+            key = row.get(intent["by"])
+            count = _number(row, "COUNT(id)")
+            if count is None:
+                return None
+            total = _number(row, f"SUM({metric})") if metric else None
+            groups["(none)" if key in (None, "") else str(key)] = (int(count), float(total or 0) if metric else None)
+        ordered = dict(sorted(groups.items(), key=lambda kv: (-kv[1][0], kv[0])))
+        return {"count": sum(count for count, _ in ordered.values()), "groups": ordered}
+
+    row = rows[0] if rows else {}
+    count = _number(row, "COUNT(id)" if intent["op"] == "count" else f"COUNT({metric})")
+    if count is None:
+        return None
+    total = _number(row, f"SUM({metric})") if metric else None
+    return {"count": int(count), "sum": None if total is None else float(total)}
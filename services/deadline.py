@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+from config.settings import REQUEST_DEADLINE, STAGE_BUDGETS
+from services import metrics
+
+# A /chat request carries an absolute deadline (time.monotonic()) in its graph
+# state. Each stage runs for at most its own budget or whatever is left of the
+# deadline, whichever is smaller. A run with a longer deadline (a queued job)
+# also carries its own, proportionally larger, stage budgets.
+
+budget_exhausted = metrics.counter("stage_budget_exhausted_total", "Graph stages cut off by their time budget, by stage")
+
+
+class BudgetExhausted(asyncio.TimeoutError):
+    def __init__(self, stage: str, budget: float):
+        super().__init__(f"{stage} ran out of its {budget:.1f}s budget")
+        self.stage = stage
+        self.budget = budget
+
+
+def new_deadline(seconds: float = REQUEST_DEADLINE):
+    return time.monotonic() + seconds if seconds > 0 else None
+
+
+def scaled_budgets(seconds: float) -> dict:
+    """STAGE_BUDGETS stretched from REQUEST_DEADLINE to a run of `seconds`."""
+    if seconds <= 0 or REQUEST_DEADLINE <= 0:
+        return dict(STAGE_BUDGETS)
+    factor = seconds / REQUEST_DEADLINE
+    return {stage: budget * factor for stage, budget in STAGE_BUDGETS.items()}
+
+
+def remaining(deadline) -> float:
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def stage_budget(stage: str, deadline, budgets: dict = None):
+    """Seconds `stage` may take, or None when it is unbounded."""
+    budget = (STAGE_BUDGETS if budgets is None else budgets).get(stage)
+    left = remaining(deadline)
+    if left is None:
+        return budget
+    return left if budget is None else min(budget, left)
+
+
+async def run_within(stage: str, deadline, coro, budgets: dict = None):
+    """await `coro`, raising BudgetExhausted once the stage's budget is spent."""
+    budget = stage_budget(stage, deadline, budgets)
+    if budget is None:
+        return await coro
+    if budget <= 0:
+        coro.close()
+        budget_exhausted.inc(stage=stage)
+        raise BudgetExhausted(stage, 0)
+    ends = time.monotonic() + budget
+    try:
+        return await asyncio.wait_for(coro, budget)
+    except asyncio.TimeoutError:
+        # A timeout inside the stage (an MCP connect, say) is its own error,
+        # not the stage running out of time.
+        if time.monotonic() < ends:
+            raise
+        budget_exhausted.inc(stage=stage)
+        raise BudgetExhausted(stage, budget) from None
@@ -0,0 +1,69 @@
+import hashlib
+import json
+
+from pydantic import TypeAdapter
+
+from config.settings import FILTER_CACHE_SIZE, FILTER_CACHE_TTL, FILTER_CACHE_DB
+from model.filter import Filter
+from services.cache import TTLCache
+from services.shared_state import SqliteState, shared_state
+
+_filters_adapter = TypeAdapter(list[Filter])
+
+
+class FilterCache:
+    """Caches validated Filter lists and their compiled criteria string.
+
+    Lookups hit the in-memory LRU first and fall back to shared state, so
+    filters built by one worker are reused by the others and survive
+    restarts. FILTER_CACHE_DB pins the second tier to its own sqlite file.
+    """
+
+    def __init__(self, maxsize: int = FILTER_CACHE_SIZE, ttl: float = FILTER_CACHE_TTL,
+                 db_path: str = FILTER_CACHE_DB, store=None):
+        self.ttl = ttl
+        self._memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        if store is None:
+            store = SqliteState(db_path) if db_path else shared_state
+        # An in-process store would only duplicate the LRU.
+        self._shared = None if store.name == "memory" else store
+        self.shared_hits = 0
+
+    @staticmethod
+    def make_key(module: str, semantic_query: str, descriptor_hash: str, date: str) -> str:
+        raw = json.dumps([module, semantic_query.strip(), descriptor_hash, date])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    async def get(self, key: str):
+        entry = self._memory.get(key)
+        if entry is not None:
+            filters, criteria_string = entry
+            return list(filters), criteria_string
+        if self._shared is None:
+            return None
+
+        stored = await self._shared.get(f"filters:{key}")
+        if stored is None:
+            return None
+        filters = _filters_adapter.validate_python(stored["filters"])
+        self._memory.set(key, (filters, stored["criteria"]))
+        self.shared_hits += 1
+        return list(filters), stored["criteria"]
+
+    async def set(self, key: str, filters: list[Filter], criteria_string: str):
+        self._memory.set(key, (list(filters), criteria_string))
+        if self._shared is not None:
+            await self._shared.set(f"filters:{key}", {
+                "filters": [f.model_dump(mode="json") for f in filters],
+                "criteria": criteria_string,
+            }, self.ttl)
+
+    def stats(self) -> dict:
+        return {
+            **self._memory.stats(),
+            "shared_hits": self.shared_hits,
+            "shared": self._shared.name if self._shared is not None else None,
+        }
+
+
+filter_cache = FilterCache()
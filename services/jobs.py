@@ -0,0 +1,180 @@
+import asyncio
+import time
+import uuid
+from collections import deque
+
+from config.settings import JOB_WORKERS, JOB_SIMPLE_WORKERS, JOB_QUEUE_MAX, JOB_DEADLINE, JOB_RESULT_TTL
+from services import metrics
+from services.agent_runner import stream_agent
+from services.deadline import scaled_budgets
+from services.query_router import classify_complexity
+from services.shared_state import shared_state
+
+# POST /jobs: the query is queued and run by a bounded pool of workers inside
+# the app, so a long complex query does not hold an HTTP connection open. The
+# queue lives in this process; job status and results go to shared state
+# (JOB_RESULT_TTL), so GET /jobs/{id} works from any worker when
+# SHARED_STATE_URL is sqlite or redis.
+
+LANES = ("simple", "complex")
+# Share of the run that is done once each graph node has finished.
+PROGRESS = {"fast_path": 0.1, "single_shot": 0.2, "reasoning": 0.35, "tools": 0.7, "summary": 0.8}
+
+jobs_total = metrics.counter("jobs_total", "Finished jobs by lane and status (done/failed/cancelled)")
+job_wait = metrics.histogram("job_queue_wait_seconds", "Time jobs spent queued, by lane")
+job_errors = metrics.counter("job_errors_total", "Job queue failures outside the graph run, by where (worker/store) and type")
+job_run = metrics.histogram("job_run_seconds", "Time jobs spent running, by lane",
+                            buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 120, 300))
+
+
+class QueueFull(Exception):
+    pass
+
+
+class JobQueue:
+    def __init__(self, workers: int = JOB_WORKERS, simple_workers: int = JOB_SIMPLE_WORKERS,
+                 queue_max: int = JOB_QUEUE_MAX, deadline: float = JOB_DEADLINE, state=shared_state):
+        self.workers = max(1, workers)
+        # At least one worker must be able to take complex jobs.
+        self.simple_workers = min(max(0, simple_workers), self.workers - 1)
+        self.queue_max = queue_max
+        self.deadline = deadline
+        # /chat's stage budgets would cut a job off at the same points as /chat.
+        self.stage_budgets = scaled_budgets(deadline)
+        self.state = state
+        self.running = 0
+        self._lanes = {lane: deque() for lane in LANES}
+        self._ready = None
+        self._tasks = []
+
+    def queued(self, lane: str = None) -> int:
+        if lane is not None:
+            return len(self._lanes[lane])
+        return sum(len(jobs) for jobs in self._lanes.values())
+
+    async def start(self):
+        if self._tasks:
+            return
+        self._ready = asyncio.Condition()
+        self._tasks = [
+            asyncio.create_task(self._worker(simple_only=i < self.simple_workers))
+            for i in range(self.workers)
+        ]
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for jobs in self._lanes.values():
+            while jobs:
+                await self._finish(jobs.popleft(), "cancelled")
+
+    async def submit(self, query: str) -> dict:
+        """Queue `query` and return its job; raises QueueFull when the queue is at JOB_QUEUE_MAX."""
+        if self._ready is None:
+            raise RuntimeError("job queue is not started")
+        if self.queued() >= self.queue_max:
+            raise QueueFull(f"{self.queued()} jobs queued")
+        job = {
+            "id": uuid.uuid4().hex,
+            "status": "queued",
+            "lane": classify_complexity(query),
+            "query": query,
+            "stage": None,
+            "progress": 0.0,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+        }
+        await self._save(job)
+        self._lanes[job["lane"]].append(job)
+        async with self._ready:
+            # Wake everyone: a simple-only worker cannot take a complex job.
+            self._ready.notify_all()
+        return job
+
+    async def get(self, job_id: str):
+        return await self.state.get(f"job:{job_id}")
+
+    def _save(self, job: dict):
+        return self.state.set(f"job:{job['id']}", job, JOB_RESULT_TTL)
+
+    def _next(self, simple_only: bool):
+        for lane in ("simple",) if simple_only else LANES:
+            if self._lanes[lane]:
+                return self._lanes[lane].popleft()
+        return None
+
+    async def _worker(self, simple_only: bool):
+        while True:
+            async with self._ready:
+                await self._ready.wait_for(
+                    lambda: self._lanes["simple"] or (not simple_only and self._lanes["complex"])
+                )
+                job = self._next(simple_only)
+            try:
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job_errors.inc(where="worker", type=type(e).__name__)
+
+    async def _run(self, job: dict):
+        job.update(status="running", started_at=time.time())
+        job_wait.observe(job["started_at"] - job["created_at"], lane=job["lane"])
+        self.running += 1
+        status = "failed"
+        try:
+            await self._save(job)
+            async for event in stream_agent(job["query"], deadline=self.deadline, stage_budgets=self.stage_budgets):
+                name = event["event"]
+                if name in PROGRESS:
+                    job.update(stage=name, progress=PROGRESS[name])
+                    await self._save(job)
+                elif name in ("done", "error"):
+                    job["result"] = {k: v for k, v in event.items() if k != "event"}
+                    busy = (job["result"].get("tool_output") or {}).get("retry_after") is not None
+                    status = "done" if name == "done" and not busy else "failed"
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        except Exception as e:
+            job["result"] = {"response": "An error occurred.", "messages": [],
+                             "tool_output": {"error": str(e), "type": type(e).__name__}}
+        finally:
+            self.running -= 1
+            job_run.observe(time.time() - job["started_at"], lane=job["lane"])
+            await self._finish(job, status)
+
+    async def _finish(self, job: dict, status: str):
+        job.update(status=status, finished_at=time.time())
+        if status == "done":
+            job.update(stage="done", progress=1.0)
+        jobs_total.inc(lane=job["lane"], status=status)
+        try:
+            await self._save(job)
+        except Exception as e:
+            job_errors.inc(where="store", type=type(e).__name__)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "simple_workers": self.simple_workers,
+            "running": self.running,
+            "queued": {lane: self.queued(lane) for lane in LANES},
+            "queue_max": self.queue_max,
+        }
+
+
+job_queue = JobQueue()
+
+metrics.gauge_callback(
+    "jobs_queued", "Jobs waiting for a worker, by lane",
+    lambda: [({"lane": lane}, job_queue.queued(lane)) for lane in LANES],
+)
+metrics.gauge_callback(
+    "jobs_running", "Jobs currently running",
+    lambda: [({}, job_queue.running)],
+)
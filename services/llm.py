@@ -0,0 +1,202 @@
+import asyncio
+import time
+from collections import defaultdict, deque
+
+from config.settings import (
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    LLM_HEDGE_ENABLED,
+    LLM_HEDGE_PERCENTILE,
+    LLM_HEDGE_DELAY,
+    LLM_HEDGE_MIN_SAMPLES,
+)
+from services import metrics
+from services.cassette import cassette
+from services.resilience import openai_backend
+from services.tracing import tracer
+
+# Every OpenAI call goes through here, so latency, token usage and errors are
+# recorded per pipeline stage (reasoning, filters, single_shot, summary).
+
+# The SDK is imported and the client built on first use (or by warmup()), so
+# importing this module does not pay for the openai package.
+client = None
+
+
+def get_client():
+    global client
+    if client is None:
+        from openai import AsyncOpenAI
+        client = AsyncOpenAI(
+            api_key=OPENAI_API_KEY,
+            base_url=OPENAI_BASE_URL,
+            # Retries happen in services/resilience.py, under the adaptive limit.
+            max_retries=0,
+        )
+    return client
+
+
+async def warmup():
+    """Build the client and open a pooled connection to the API before the first request."""
+    get_client()
+    if cassette.replaying:
+        return
+    # A failure is reported by services/warmup.py as this step's result.
+    await client.models.list()
+
+
+llm_tokens = metrics.counter("llm_tokens_total", "OpenAI tokens by stage, model and kind (prompt/completion)")
+hedges = metrics.counter("llm_hedges_total", "Hedged OpenAI calls by stage and outcome (won: the duplicate answered first, lost: the original did)")
+hedge_saved = metrics.counter("llm_hedge_saved_seconds_total", "Estimated seconds saved by hedges that won, by stage")
+
+# Recent latencies of first attempts per stage, for the hedge delay. A hedge's
+# own latency is left out (it started late, so it looks fast), and an original
+# overtaken by its hedge counts with its time at cancellation, a lower bound,
+# so the slow tail the hedge exists for stays in the window.
+_latencies = defaultdict(lambda: deque(maxlen=500))
+
+
+def _record_usage(stage: str, model: str, usage):
+    if usage is None:
+        return
+    llm_tokens.inc(usage.prompt_tokens or 0, stage=stage, model=model, kind="prompt")
+    llm_tokens.inc(usage.completion_tokens or 0, stage=stage, model=model, kind="completion")
+    tracer.annotate(prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens)
+
+
+# Cassette encoding: responses are stored as plain JSON and rebuilt as SDK objects on replay.
+def _dump(obj) -> dict:
+    return obj.model_dump(mode="json")
+
+
+def _completion(data: dict):
+    from openai.types.chat import ChatCompletion
+    return ChatCompletion.model_validate(data)
+
+
+def _chunk(data: dict):
+    from openai.types.chat import ChatCompletionChunk
+    return ChatCompletionChunk.model_validate(data)
+
+
+def hedge_delay(stage: str) -> float:
+    window = _latencies[stage]
+    if len(window) < LLM_HEDGE_MIN_SAMPLES:
+        return LLM_HEDGE_DELAY
+    ordered = sorted(window)
+    return ordered[min(len(ordered) - 1, int(LLM_HEDGE_PERCENTILE * len(ordered)))]
+
+
+async def _timed(stage: str, create):
+    start = time.perf_counter()
+    response = await create()
+    _latencies[stage].append(time.perf_counter() - start)
+    return response
+
+
+def _estimated_saving(stage: str, elapsed: float) -> float:
+    """How much longer the overtaken original would likely have taken, from recent latencies.
+
+    The median of the latencies above `elapsed` (the original was known to be
+    slower than that); 0 when no recent call took that long.
+    """
+    slower = sorted(v for v in _latencies[stage] if v > elapsed)
+    return slower[len(slower) // 2] - elapsed if slower else 0.0
+
+
+async def _hedged(stage: str, create):
+    """create() once; if it has not answered within the stage's hedge delay, race a second one."""
+    started = time.perf_counter()
+    first = asyncio.ensure_future(_timed(stage, create))
+    try:
+        done, _ = await asyncio.wait({first}, timeout=hedge_delay(stage))
+    except BaseException:
+        first.cancel()
+        raise
+    if done:
+        return first.result()
+
+    tracer.event("hedge_fired", after_ms=round((time.perf_counter() - started) * 1000, 1))
+    second = asyncio.ensure_future(create())
+    pending = {first, second}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            winner = next((t for t in done if t.exception() is None), None)
+            if winner is None and pending:
+                continue  # one failed; the other may still answer
+            if winner is None:
+                hedges.inc(stage=stage, outcome="failed")
+                return first.result()
+            hedges.inc(stage=stage, outcome="won" if winner is second else "lost")
+            tracer.annotate(hedge="won" if winner is second else "lost")
+            if winner is second and first in pending:
+                # The original is cancelled below; it would only cost tokens and a limiter slot.
+                elapsed = time.perf_counter() - started
+                hedge_saved.inc(_estimated_saving(stage, elapsed), stage=stage)
+                _latencies[stage].append(elapsed)
+            return winner.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def chat(stage: str, **kwargs):
+    """client.chat.completions.create(**kwargs), instrumented under `stage`."""
+    model = kwargs.get("model", "")
+    with tracer.span(f"openai:{stage}", model=model):
+        tracer.capture("messages", kwargs.get("messages"))
+        start = time.perf_counter()
+        try:
+            def create():
+                return openai_backend.call(lambda: get_client().chat.completions.create(**kwargs))
+
+            response = await cassette.call(
+                "openai", stage, kwargs,
+                (lambda: _hedged(stage, create)) if LLM_HEDGE_ENABLED else create,
+                encode=_dump, decode=_completion,
+            )
+        except Exception as e:
+            metrics.external_errors.inc(service="openai", op=stage, type=type(e).__name__)
+            raise
+        finally:
+            metrics.external_latency.observe(time.perf_counter() - start, service="openai", op=stage)
+        _record_usage(stage, model, getattr(response, "usage", None))
+        if response.choices:
+            tracer.capture("completion", response.choices[0].message.content)
+        return response
+
+
+async def stream_chat(stage: str, **kwargs):
+    """Yield the content deltas of a streamed completion, instrumented under `stage`.
+
+    Records time to first token as well as total time; usage arrives on the final chunk.
+    """
+    model = kwargs.get("model", "")
+    with tracer.span(f"openai:{stage}", model=model, stream=True):
+        tracer.capture("messages", kwargs.get("messages"))
+        start = time.perf_counter()
+        first = True
+        try:
+            stream = cassette.stream(
+                "openai_stream", stage, kwargs,
+                # The limit covers opening the stream, not reading it.
+                lambda: openai_backend.call(
+                    lambda: get_client().chat.completions.create(stream=True, stream_options={"include_usage": True}, **kwargs)
+                ),
+                encode=_dump, decode=_chunk,
+            )
+            async for chunk in stream:
+                if getattr(chunk, "usage", None) is not None:
+                    _record_usage(stage, model, chunk.usage)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    if first:
+                        first = False
+                        metrics.external_latency.observe(time.perf_counter() - start, service="openai", op=f"{stage}_first_token")
+                        tracer.event("first_token")
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            metrics.external_errors.inc(service="openai", op=stage, type=type(e).__name__)
+            raise
+        finally:
+            metrics.external_latency.observe(time.perf_counter() - start, service="openai", op=stage)
@@ -0,0 +1,288 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+from config.settings import (
+    MCP_SSE_URL,
+    MCP_POOL_SIZE,
+    MCP_CONNECT_TIMEOUT,
+    MCP_HEALTHCHECK_INTERVAL,
+)
+from services import metrics
+from services.cassette import cassette
+from services.resilience import mcp_backend, zoho_backend
+from services.tracing import tracer
+
+pool_wait = metrics.histogram("mcp_pool_wait_seconds", "Time spent waiting for a free MCP pool slot")
+pool_connects = metrics.counter(
+    "mcp_pool_connects_total",
+    "MCP pool session connects, by trigger (start/request/healthcheck) and outcome (ok/failed)",
+)
+
+
+class PooledSession:
+    """A long-lived, initialized MCP session and its tool registry.
+
+    The SSE client and ClientSession are entered and exited inside a dedicated
+    runner task, because their anyio cancel scopes must be closed by the task
+    that opened them. Requests only ever talk to the session through `tools`.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.session = None
+        self.tools = {}
+        self.broken = False
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._runner = None
+        self._error = None
+
+    async def connect(self, timeout: float = MCP_CONNECT_TIMEOUT):
+        self._runner = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            await self.close()
+            raise
+        if self._error is not None:
+            raise self._error
+
+    async def _run(self):
+        # Imported on first connect: the MCP client stack is slow to import.
+        from mcp import ClientSession
+        from mcp.client.sse import sse_client
+        from langchain_mcp_adapters.tools import load_mcp_tools
+
+        try:
+            async with sse_client(self.url) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    tools = await load_mcp_tools(session)
+                    self.session = session
+                    self.tools = {t.name: t for t in tools}
+                    cassette.record_tools({t.name: _describe(t) for t in tools})
+                    self._ready.set()
+                    await self._closing.wait()
+        except Exception as e:
+            # Either the handshake failed or the SSE stream dropped later on.
+            self._error = e
+        finally:
+            self.session = None
+            self.broken = True
+            self._ready.set()
+
+    def tool(self, name: str):
+        return self.tools[name]
+
+    async def invoke(self, name: str, args: dict):
+        return _text(await self.tools[name].ainvoke(args))
+
+    async def ping(self, timeout: float = 5) -> bool:
+        if self.broken or self.session is None:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout)
+            return True
+        except Exception:
+            self.broken = True
+            return False
+
+    async def close(self, timeout: float = 5):
+        self._closing.set()
+        if self._runner is None:
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(self._runner), timeout)
+        except Exception:
+            self._runner.cancel()
+        self.broken = True
+
+
+def _text(result):
+    """Newer langchain_mcp_adapters return a list of content blocks; callers expect the text."""
+    if isinstance(result, list) and result and all(isinstance(b, dict) and b.get("type") == "text" for b in result):
+        return "".join(b.get("text", "") for b in result)
+    return result
+
+
+def _describe(tool) -> dict:
+    schema = getattr(tool, "args_schema", None)
+    if schema is not None and not isinstance(schema, dict):
+        schema = schema.model_json_schema()
+    return {"description": tool.description, "args_schema": schema}
+
+
+class ReplaySession(PooledSession):
+    """A session that never connects: tools and results come from the cassette."""
+
+    async def connect(self, timeout: float = MCP_CONNECT_TIMEOUT):
+        self.tools = {name: SimpleNamespace(name=name, **spec) for name, spec in cassette.tools.items()}
+
+    async def ping(self, timeout: float = 5) -> bool:
+        return True
+
+    async def close(self, timeout: float = 5):
+        pass
+
+
+class MCPSessionPool:
+    """Fixed-size pool of PooledSession slots shared across requests."""
+
+    def __init__(self, url: str = MCP_SSE_URL, size: int = MCP_POOL_SIZE,
+                 healthcheck_interval: float = MCP_HEALTHCHECK_INTERVAL):
+        self.url = url
+        self.size = max(1, size)
+        self.healthcheck_interval = healthcheck_interval
+        self._idle = asyncio.Queue()
+        self._slots = []
+        self._started = False
+        self._health_task = None
+
+    async def start(self):
+        if self._started:
+            return
+        self._started = True
+        self._slots = [None] * self.size
+        results = await asyncio.gather(
+            *(self._connect() for _ in range(self.size)), return_exceptions=True
+        )
+        for i, result in enumerate(results):
+            # A slot that failed here is reconnected by its first borrower.
+            if isinstance(result, Exception):
+                pool_connects.inc(trigger="start", outcome="failed")
+            else:
+                pool_connects.inc(trigger="start", outcome="ok")
+                self._slots[i] = result
+            self._idle.put_nowait(i)
+        if self.healthcheck_interval > 0:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def close(self):
+        if self._health_task:
+            self._health_task.cancel()
+            self._health_task = None
+        await asyncio.gather(
+            *(s.close() for s in self._slots if s is not None), return_exceptions=True
+        )
+        self._slots = []
+        self._idle = asyncio.Queue()
+        self._started = False
+
+    async def _connect(self) -> PooledSession:
+        pooled = (ReplaySession if cassette.replaying else PooledSession)(self.url)
+        start = time.perf_counter()
+        try:
+            with tracer.span("mcp:connect"):
+                await pooled.connect()
+        except Exception as e:
+            metrics.external_errors.inc(service="mcp", op="connect", type=type(e).__name__)
+            raise
+        finally:
+            metrics.external_latency.observe(time.perf_counter() - start, service="mcp", op="connect")
+        return pooled
+
+    async def _ensure(self, i: int, trigger: str = "request") -> PooledSession:
+        pooled = self._slots[i]
+        if pooled is not None and not pooled.broken:
+            return pooled
+        if pooled is not None:
+            await pooled.close()
+        self._slots[i] = None
+        tracer.event("mcp_slot_reconnect", slot=i)
+        try:
+            self._slots[i] = await self._connect()
+        except Exception:
+            pool_connects.inc(trigger=trigger, outcome="failed")
+            raise
+        pool_connects.inc(trigger=trigger, outcome="ok")
+        return self._slots[i]
+
+    def connected(self) -> int:
+        return sum(s is not None and not s.broken for s in self._slots)
+
+    @asynccontextmanager
+    async def _slot(self):
+        """Borrow a slot index; its session is (re)connected by _ensure."""
+        if not self._started:
+            await self.start()
+        start = time.perf_counter()
+        with tracer.span("mcp:acquire"):
+            i = await self._idle.get()
+            tracer.annotate(slot=i)
+        try:
+            pool_wait.observe(time.perf_counter() - start)
+            yield i
+        finally:
+            self._idle.put_nowait(i)
+
+    async def _call(self, i: int, name: str, args: dict):
+        pooled = await self._ensure(i)
+        try:
+            return await pooled.invoke(name, args)
+        except Exception:
+            # A failing tool call may mean the stream is gone; find out now
+            # so the next attempt or borrower gets a fresh session.
+            await pooled.ping()
+            raise
+
+    @asynccontextmanager
+    async def acquire(self):
+        async with self._slot() as i:
+            yield await self._ensure(i)
+
+    async def invoke(self, name: str, args: dict):
+        """Call tool `name` on a borrowed slot, held only for the call itself.
+
+        Every retry goes through _ensure, so an attempt that failed on a
+        dropped stream is retried on a reconnected session, not the dead one.
+        """
+        with tracer.span(f"mcp:{name}", **{k: v for k, v in args.items() if k in ("url", "module", "complexity")}):
+            start = time.perf_counter()
+            try:
+                # fetch_zoho_results is limited as Zoho traffic, everything else as MCP.
+                backend = zoho_backend if name == "fetch_zoho_results" else mcp_backend
+                async with self._slot() as i:
+                    return await cassette.call("mcp", name, args, lambda: backend.call(lambda: self._call(i, name, args)))
+            except Exception as e:
+                metrics.external_errors.inc(service="mcp", op=name, type=type(e).__name__)
+                raise
+            finally:
+                metrics.external_latency.observe(time.perf_counter() - start, service="mcp", op=name)
+
+    async def tool(self, name: str):
+        """Metadata (description, args schema) of tool `name`; the same on every session."""
+        for pooled in self._slots:
+            if pooled is not None and pooled.tools:
+                return pooled.tool(name)
+        async with self.acquire() as pooled:
+            return pooled.tool(name)
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.healthcheck_interval)
+            # One slot out of the queue at a time, so borrowers only ever
+            # wait for the slot being checked.
+            for _ in range(self._idle.qsize()):
+                try:
+                    i = self._idle.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                try:
+                    pooled = self._slots[i]
+                    if pooled is None or not await pooled.ping():
+                        await self._ensure(i, trigger="healthcheck")
+                except Exception:
+                    # Counted in pool_connects; the next borrower tries again.
+                    pass
+                finally:
+                    self._idle.put_nowait(i)
+
+
+mcp_pool = MCPSessionPool()
+
+metrics.gauge_callback(
+    "mcp_pool_sessions", "Connected MCP pool sessions, out of MCP_POOL_SIZE",
+    lambda: [({}, mcp_pool.connected())],
+)
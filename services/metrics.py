@@ -0,0 +1,210 @@
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+class Counter:
+    def __init__(self, name: str, help: str = ""):
+        self.name = name
+        self.help = help
+        self._values = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] += amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def snapshot(self) -> dict:
+        return {",".join(f"{k}={v}" for k, v in key) or "total": value for key, value in self._values.items()}
+
+
+class Gauge:
+    def __init__(self, name: str, help: str = ""):
+        self.name = name
+        self.help = help
+        self._values = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] += amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    @contextmanager
+    def track(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def samples(self) -> dict:
+        return dict(self._values)
+
+    def snapshot(self) -> dict:
+        return {",".join(f"{k}={v}" for k, v in key) or "total": value for key, value in self.samples().items()}
+
+
+class CallbackGauge(Gauge):
+    """A gauge read at scrape time from `fn`, which returns [(labels dict, value), ...]."""
+
+    def __init__(self, name: str, help: str = "", fn=None):
+        super().__init__(name, help)
+        self.fn = fn
+
+    def samples(self) -> dict:
+        try:
+            return {_label_key(labels): value for labels, value in self.fn()}
+        except Exception as e:
+            print(f"Metrics: gauge {self.name} failed: {e}")
+            return {}
+
+
+class Histogram:
+    """Bucketed histogram plus a window of recent samples for percentiles."""
+
+    def __init__(self, name: str, help: str = "", buckets=DEFAULT_BUCKETS, window: int = 1024):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.window = window
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    "counts": [0] * len(self.buckets),
+                    "count": 0,
+                    "sum": 0.0,
+                    "recent": deque(maxlen=self.window),
+                }
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+                    break
+            series["count"] += 1
+            series["sum"] += value
+            series["recent"].append(value)
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def percentile(self, q: float, **labels):
+        series = self._series.get(_label_key(labels))
+        if not series or not series["recent"]:
+            return None
+        samples = sorted(series["recent"])
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def snapshot(self) -> dict:
+        result = {}
+        for key, series in self._series.items():
+            samples = sorted(series["recent"])
+            n = len(samples)
+            result[",".join(f"{k}={v}" for k, v in key) or "total"] = {
+                "count": series["count"],
+                "mean": series["sum"] / series["count"],
+                "p50": samples[int(0.50 * n)] if n else None,
+                "p95": samples[min(n - 1, int(0.95 * n))] if n else None,
+                "p99": samples[min(n - 1, int(0.99 * n))] if n else None,
+            }
+        return result
+
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def _get_or_create(cls, name: str, help: str, **kwargs):
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = cls(name, help, **kwargs)
+        return metric
+
+
+def counter(name: str, help: str = "") -> Counter:
+    return _get_or_create(Counter, name, help)
+
+
+def histogram(name: str, help: str = "", **kwargs) -> Histogram:
+    return _get_or_create(Histogram, name, help, **kwargs)
+
+
+def gauge(name: str, help: str = "") -> Gauge:
+    return _get_or_create(Gauge, name, help)
+
+
+def gauge_callback(name: str, help: str, fn) -> CallbackGauge:
+    return _get_or_create(CallbackGauge, name, help, fn=fn)
+
+
+def snapshot() -> dict:
+    return {name: metric.snapshot() for name, metric in sorted(_registry.items())}
+
+
+# Shared by every client wrapper (OpenAI, MCP, Zoho OAuth).
+external_latency = histogram("external_call_seconds", "Latency of calls to external services, by service and operation")
+external_errors = counter("external_call_errors_total", "Failed external calls, by service, operation and exception type")
+
+
+def _labels_text(key: tuple, extra: tuple = ()) -> str:
+    pairs = [*key, *extra]
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def render_prometheus() -> str:
+    """Every registered metric in the Prometheus text exposition format (0.0.4)."""
+    lines = []
+    for name, metric in sorted(_registry.items()):
+        kind = {Counter: "counter", Histogram: "histogram"}.get(type(metric), "gauge")
+        if metric.help:
+            lines.append(f"# HELP {name} {metric.help}")
+        lines.append(f"# TYPE {name} {kind}")
+        if isinstance(metric, Histogram):
+            with metric._lock:
+                series = [(key, list(s["counts"]), s["count"], s["sum"]) for key, s in metric._series.items()]
+            for key, counts, count, total in series:
+                cumulative = 0
+                for bound, n in zip(metric.buckets, counts):
+                    cumulative += n
+                    lines.append(f"{name}_bucket{_labels_text(key, (('le', bound),))} {cumulative}")
+                lines.append(f"{name}_bucket{_labels_text(key, (('le', '+Inf'),))} {count}")
+                lines.append(f"{name}_sum{_labels_text(key)} {total}")
+                lines.append(f"{name}_count{_labels_text(key)} {count}")
+        else:
+            values = metric.samples() if isinstance(metric, Gauge) else dict(metric._values)
+            for key, value in values.items():
+                lines.append(f"{name}{_labels_text(key)} {value}")
+    return "\n".join(lines) + "\n"
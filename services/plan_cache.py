@@ -0,0 +1,145 @@
+import math
+import re
+from collections import Counter
+
+from config.settings import (
+    PLAN_CACHE_ENABLED,
+    PLAN_CACHE_SIZE,
+    PLAN_CACHE_TTL,
+    PLAN_CACHE_SIMILARITY,
+)
+from services.cache import TTLCache
+
+_NUMBER_SUFFIX = re.compile(r"(\d+(?:\.\d+)?)\s*([km])\b")
+_NON_WORD = re.compile(r"[^a-z0-9.\s]")
+
+# Phrases that mean the same thing to the planner collapse to one token.
+_PHRASES = [
+    (re.compile(r"\b(greater than or equal to|at least|no less than)\b"), "gte"),
+    (re.compile(r"\b(less than or equal to|at most|no more than)\b"), "lte"),
+    (re.compile(r"\b(greater than|more than|higher than|larger than|bigger than|over|above|exceeding)\b"), "gt"),
+    (re.compile(r"\b(less than|lower than|smaller than|under|below)\b"), "lt"),
+]
+
+_STOPWORDS = {
+    "a", "an", "the", "me", "my", "our", "us", "i", "we", "please", "can", "you",
+    "could", "would", "all", "of", "for", "with", "that", "which", "are", "is",
+    "to", "in", "on", "whose", "have", "has", "do", "give", "some", "any",
+}
+
+
+def _expand_number(match) -> str:
+    value = float(match.group(1)) * (1_000 if match.group(2) == "k" else 1_000_000)
+    return str(int(value)) if value.is_integer() else str(value)
+
+
+def normalize_query(query: str) -> str:
+    text = query.lower().replace(",", "")
+    text = _NUMBER_SUFFIX.sub(_expand_number, text)
+    text = _NON_WORD.sub(" ", text)
+    text = re.sub(r"\.(?!\d)", " ", text)
+    for pattern, token in _PHRASES:
+        text = pattern.sub(token, text)
+    return " ".join(text.split())
+
+
+def query_vector(normalized: str) -> dict:
+    """Sparse term vector over content words and their bigrams."""
+    words = [w for w in normalized.split() if w not in _STOPWORDS]
+    terms = Counter(words)
+    terms.update(f"{a}_{b}" for a, b in zip(words, words[1:]))
+    norm = math.sqrt(sum(v * v for v in terms.values())) or 1.0
+    return {t: v / norm for t, v in terms.items()}
+
+
+def _cosine(a: dict, b: dict) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(t, 0.0) for t, v in a.items())
+
+
+def _numbers(normalized: str) -> frozenset:
+    return frozenset(re.findall(r"\d+(?:\.\d+)?", normalized))
+
+
+class PlanCache:
+    """Two-tier cache for reasoning_step plans.
+
+    The exact tier is keyed on the normalized query. The similarity tier scans
+    the same entries by cosine similarity of their term vectors, and only
+    accepts a candidate that mentions exactly the same numbers, so "deals over
+    10k" can reuse "deals greater than 10000" but never "deals over 20k".
+
+    Every entry belongs to a `version` (docs hash + today's date); a lookup with
+    a different version drops the whole cache.
+    """
+
+    def __init__(self, maxsize: int = PLAN_CACHE_SIZE, ttl: float = PLAN_CACHE_TTL,
+                 threshold: float = PLAN_CACHE_SIMILARITY, enabled: bool = PLAN_CACHE_ENABLED):
+        self.threshold = threshold
+        self.enabled = enabled
+        self.version = None
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def _check_version(self, version: str):
+        if version != self.version:
+            self._entries.clear()
+            self.version = version
+
+    def get(self, query: str, version: str):
+        if not self.enabled:
+            return None
+        self._check_version(version)
+        key = normalize_query(query)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.exact_hits += 1
+            return dict(entry["plan"])
+
+        if self.threshold < 1:
+            vector = query_vector(key)
+            numbers = _numbers(key)
+            best, best_score = None, self.threshold
+            for _, candidate in self._entries.items():
+                if candidate["numbers"] != numbers:
+                    continue
+                score = _cosine(vector, candidate["vector"])
+                if score >= best_score:
+                    best, best_score = candidate, score
+            if best is not None:
+                self.semantic_hits += 1
+                return dict(best["plan"])
+
+        self.misses += 1
+        return None
+
+    def set(self, query: str, version: str, plan: dict):
+        if not self.enabled:
+            return
+        self._check_version(version)
+        key = normalize_query(query)
+        self._entries.set(key, {
+            "plan": dict(plan),
+            "vector": query_vector(key),
+            "numbers": _numbers(key),
+        })
+
+    def invalidate(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.exact_hits + self.semantic_hits) / lookups if lookups else 0.0,
+        }
+
+
+plan_cache = PlanCache()
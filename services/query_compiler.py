@@ -0,0 +1,245 @@
+import re
+
+from model.filter import Filter, Value, Operator
+
+# Rule-based compiler for trivially structured queries ("deals greater than
+# 10000", "leads with status New", "contacts whose email starts with x").
+# It only answers when the whole query is consumed by the grammar below;
+# anything it does not fully understand goes to the LLM path instead.
+
+MODULE_NOUNS = {
+    "Deals": ["deals", "deal", "opportunities", "opportunity"],
+    "Leads": ["leads", "lead", "prospects", "prospect"],
+    "Contacts": ["contacts", "contact"],
+}
+
+# Picklist values a query may name for an equals condition; anything else goes to the LLM.
+LEAD_SOURCES = [
+    "Advertisement", "Cold Call", "Referral", "Employee Referral", "External Referral", "Online Store",
+    "Partner", "Public Relations", "Sales Email Alias", "Seminar Partner", "Internal Seminar",
+    "Trade Show", "Web Download", "Web Research", "Website", "Chat", "Facebook", "Twitter",
+]
+INDUSTRIES = [
+    "ASP", "Data/Telecom OEM", "ERP", "Government/Military", "Large Enterprise", "Management ISV",
+    "MSP", "Network Equipment Enterprise", "Non-management ISV", "Optical Networking",
+    "Service Provider", "Small/Medium Enterprise", "Storage Equipment", "Storage Service Provider",
+    "Systems Integrator", "Wireless Industry", "Healthcare", "Education", "Finance", "Manufacturing",
+    "Real Estate", "Retail", "Technology",
+]
+
+FIELDS = {
+    "Deals": {
+        "Amount": {"type": "number", "aliases": ["amount", "deal value", "deal size", "value", "size", "price"]},
+        "Probability": {"type": "number", "aliases": ["probability", "win probability"]},
+        "Stage": {"type": "picklist", "aliases": ["deal stage", "stage", "deal status", "status"], "values": [
+            "Qualification", "Needs Analysis", "Value Proposition", "Identify Decision Makers",
+            "Proposal/Price Quote", "Negotiation/Review", "Closed Won", "Closed Lost",
+            "Closed Lost to Competition",
+        ]},
+        "Closing_Date": {"type": "date", "aliases": ["closing date", "close date", "closing"]},
+        "Deal_Name": {"type": "text", "aliases": ["deal name", "name"]},
+        "Lead_Source": {"type": "picklist", "aliases": ["lead source", "source"], "values": LEAD_SOURCES},
+    },
+    "Leads": {
+        "Lead_Status": {"type": "picklist", "aliases": ["lead status", "status"], "values": [
+            "Attempted to Contact", "Contact in Future", "Contacted", "Junk Lead", "Lost Lead",
+            "Not Contacted", "Pre-Qualified", "Not Qualified",
+        ]},
+        "Lead_Source": {"type": "picklist", "aliases": ["lead source", "source"], "values": LEAD_SOURCES},
+        "Industry": {"type": "picklist", "aliases": ["industry"], "values": INDUSTRIES},
+        "Company": {"type": "text", "aliases": ["company", "company name"]},
+        "Email": {"type": "text", "aliases": ["email address", "email"]},
+        "First_Name": {"type": "text", "aliases": ["first name"]},
+        "Last_Name": {"type": "text", "aliases": ["last name", "surname"]},
+        "Annual_Revenue": {"type": "number", "aliases": ["annual revenue", "revenue"]},
+        "No_of_Employees": {"type": "number", "aliases": ["number of employees", "employees", "employee count"]},
+    },
+    "Contacts": {
+        "Email": {"type": "text", "aliases": ["email address", "email"]},
+        "First_Name": {"type": "text", "aliases": ["first name"]},
+        "Last_Name": {"type": "text", "aliases": ["last name", "surname"]},
+        "Phone": {"type": "text", "aliases": ["phone number", "phone"]},
+        "Title": {"type": "text", "aliases": ["job title", "title"]},
+        "Department": {"type": "text", "aliases": ["department"]},
+        "Mailing_City": {"type": "text", "aliases": ["mailing city", "city"]},
+        "Lead_Source": {"type": "picklist", "aliases": ["lead source", "source"], "values": LEAD_SOURCES},
+    },
+}
+
+# Field used when a comparison names no field at all ("deals over 10k").
+DEFAULT_NUMBER_FIELD = {"Deals": "Amount"}
+
+_OPERATORS = [
+    (Operator.greater_equal, ["greater than or equal to", "at least", "no less than", ">="]),
+    (Operator.less_equal, ["less than or equal to", "at most", "no more than", "<="]),
+    (Operator.greater_than, ["greater than", "more than", "higher than", "larger than", "bigger than",
+                             "exceeding", "over", "above", ">"]),
+    (Operator.less_than, ["less than", "lower than", "smaller than", "under", "below", "<"]),
+    (Operator.equals, ["equal to", "equals", "exactly", "="]),
+]
+_OPERATOR_BY_PHRASE = {phrase: op for op, phrases in _OPERATORS for phrase in phrases}
+_DATE_OPERATORS = {"before": Operator.less_than, "after": Operator.greater_than, "on": Operator.equals}
+
+# A free-text value containing any of these is a negation, a choice, a time
+# range or a question about emptiness, not a literal to match.
+_NOT_A_LITERAL = re.compile(
+    r"\b(?:not|no|non|none|nor|or|but|except|other|than|in|is|are|any|anything|either|neither|"
+    r"missing|empty|blank|null|unknown|this|last|next|past|since|today|yesterday|tomorrow|"
+    r"week|month|quarter|year)\b|[<>!]",
+    re.IGNORECASE,
+)
+
+# A free-text value must look like one: each word capitalised, numeric or an
+# email address ("Acme Corp", "CEO", "555 1234", "jane@acme.com"). This stops
+# the value at the first word the grammar does not know ("CEO at Acme",
+# "Sales only", "CEO sorted by name"), so those go to the LLM.
+_TEXT_VALUE = re.compile(r"(?:[A-Z0-9+(]\S*|\S+@\S+)(?:\s+(?:[A-Z0-9(&]\S*|\S+@\S+))*")
+
+_NUMBER = r"\$?\d[\d,]*(?:\.\d+)?\s*[km]?"
+_DATE = r"\d{4}-\d{2}-\d{2}"
+_PREFIX = re.compile(
+    r"(?:please\s+)?(?:(?:show|list|find|get|display|give|fetch|search|pull)(?:\s+me)?\s+)?"
+    r"(?:(?:all|any)\s+)?(?:(?:the|of the)\s+)?(?:my\s+)?",
+    re.IGNORECASE,
+)
+_CONNECTOR = r"(?:(?:with|where|whose|having|that have|which have|that has|which has|that are|which are|in)\s+)?(?:(?:an?|the|its)\s+)?"
+_AND = re.compile(r"\s*(?:,\s*)?(?:and\s+)?", re.IGNORECASE)
+_END = re.compile(r"\s*[.?!]?\s*$")
+
+
+def _alternation(phrases) -> str:
+    return "|".join(re.escape(p) for p in sorted(phrases, key=len, reverse=True))
+
+
+def _parse_number(text: str):
+    text = text.lower().replace("$", "").replace(",", "").strip()
+    multiplier = 1
+    if text[-1] in "km":
+        multiplier = 1_000 if text[-1] == "k" else 1_000_000
+        text = text[:-1].strip()
+    value = float(text) * multiplier
+    return int(value) if value.is_integer() else value
+
+
+def _build_grammar(module: str) -> list:
+    fields = FIELDS[module]
+    alias_to_field = {alias: name for name, spec in fields.items() for alias in spec["aliases"]}
+    any_field = f"(?P<field>{_alternation(alias_to_field)})"
+    ops = f"(?P<op>{_alternation(_OPERATOR_BY_PHRASE)})"
+    value = r"(?P<value>.+?)(?=\s*(?:,\s*)?\band\b|\s*[.?!]?\s*$)"
+
+    def field_of(match, kind=None):
+        alias = match.groupdict().get("field")
+        if alias is None:
+            name = DEFAULT_NUMBER_FIELD.get(module) if kind == "number" else None
+        else:
+            name = alias_to_field[alias.lower()]
+        if name is None or (kind and fields[name]["type"] != kind):
+            return None
+        return name
+
+    def between(m):
+        name = field_of(m, "number")
+        low, high = _parse_number(m.group("low")), _parse_number(m.group("high"))
+        if low > high:
+            return None
+        return name and (name, Operator.between, [low, high])
+
+    def compare(m):
+        name = field_of(m, "number")
+        return name and (name, _OPERATOR_BY_PHRASE[m.group("op").lower()], _parse_number(m.group("num")))
+
+    def date_compare(m):
+        name = field_of(m, "date")
+        return name and (name, _DATE_OPERATORS[m.group("op").lower()], m.group("date"))
+
+    def starts_with(m):
+        name = field_of(m)
+        return name and fields[name]["type"] != "number" and (name, Operator.starts_with, m.group("value"))
+
+    def equals(m):
+        name = field_of(m)
+        if not name or fields[name]["type"] not in ("picklist", "text"):
+            return None
+        text = m.group("value").strip().strip("'\"")
+        if fields[name]["type"] == "picklist":
+            # Only a value the picklist actually has; "not New", "New or Contacted"
+            # and "New this week" are left to the LLM.
+            known = {v.lower(): v for v in fields[name].get("values", [])}
+            value = known.get(text.lower())
+            return value and (name, Operator.equals, value)
+        if not _TEXT_VALUE.fullmatch(text) or _NOT_A_LITERAL.search(text):
+            return None
+        return (name, Operator.equals, text)
+
+    def in_stage(m):
+        stages = {v.lower(): v for v in fields["Stage"]["values"]}
+        stage = stages.get(m.group("value").strip().lower())
+        return stage and ("Stage", Operator.equals, stage)
+
+    grammar = [
+        (rf"{_CONNECTOR}(?:{any_field}\s+)?(?:(?:is|are)\s+)?between\s+(?P<low>{_NUMBER})\s+and\s+(?P<high>{_NUMBER})", between),
+        (rf"{_CONNECTOR}(?:{any_field}\s+)?(?:(?:is|are|of)\s+)?{ops}\s+(?P<num>{_NUMBER})\b", compare),
+        (rf"{_CONNECTOR}{any_field}\s+(?:(?:is|are)\s+)?(?P<op>before|after|on)\s+(?P<date>{_DATE})", date_compare),
+        (rf"{_CONNECTOR}{any_field}\s+(?:starts|starting|begins|beginning)\s+with\s+(?P<value>\S+?)(?=\s|[.?!]?$)", starts_with),
+        (rf"{_CONNECTOR}{any_field}\s+(?:(?:is|=|of|equals|equal to)\s+)?{value}", equals),
+    ]
+    if "Stage" in fields:
+        grammar.insert(0, (r"(?:that are\s+|which are\s+)?in\s+(?:the\s+)?(?P<value>.+?)\s+stage\b", in_stage))
+    return [(re.compile(pattern, re.IGNORECASE), handler) for pattern, handler in grammar]
+
+
+_GRAMMARS = {module: _build_grammar(module) for module in FIELDS}
+_MODULE_NOUN = re.compile(
+    "(?P<module>" + _alternation([n for nouns in MODULE_NOUNS.values() for n in nouns]) + r")\b",
+    re.IGNORECASE,
+)
+_NOUN_TO_MODULE = {n: module for module, nouns in MODULE_NOUNS.items() for n in nouns}
+
+
+def parse_query(query: str):
+    """Parse `query` into (module, [(field, Operator, value), ...]) or None."""
+    text = " ".join(query.split())
+    pos = _PREFIX.match(text).end()
+    noun = _MODULE_NOUN.match(text, pos)
+    if not noun:
+        return None
+    module = _NOUN_TO_MODULE[noun.group("module").lower()]
+    pos = noun.end()
+
+    conditions = []
+    while True:
+        if _END.match(text, pos):
+            break
+        sep = re.compile(r"\s+").match(text, pos) if not conditions else _AND.match(text, pos)
+        if sep is None or (conditions and sep.end() == pos):
+            return None
+        pos = sep.end()
+
+        for pattern, handler in _GRAMMARS[module]:
+            match = pattern.match(text, pos)
+            if match and match.end() > pos:
+                condition = handler(match)
+                if condition:
+                    conditions.append(condition)
+                    pos = match.end()
+                    break
+        else:
+            return None
+
+    if not conditions:
+        return None
+    return module, conditions
+
+
+def compile_query(query: str):
+    """Compile a simple query straight to Filters, or return None to use the LLM path."""
+    parsed = parse_query(query)
+    if parsed is None:
+        return None
+    module, conditions = parsed
+    return {
+        "module": module,
+        "complexity": "simple",
+        "filters": [Filter(key=key, value=Value(operator=op, value=value)) for key, op, value in conditions],
+    }
@@ -0,0 +1,108 @@
+import math
+import re
+from collections import Counter
+
+from static.literature import DEALS_DOC, CONTACTS_DOC, LEADS_DOC
+
+# Cheap, local routing decisions made before any LLM call.
+
+_COMPLEX_MARKERS = re.compile(
+    r"\b(compare|comparison|versus|vs|trend|trends|over time|breakdown|break down|group|grouped|"
+    r"per|each|by owner|by stage|by month|average|avg|total|sum|distribution|analy[sz]e|analysis|"
+    r"overview|summary|summari[sz]e|insight|insights|why|forecast|correlat\w*|across|both|either)\b",
+    re.IGNORECASE,
+)
+_CLAUSE_JOINERS = re.compile(r"\b(and|or|but|then|also)\b|[,;]", re.IGNORECASE)
+
+SIMPLE_MAX_WORDS = 16
+SIMPLE_MAX_CLAUSES = 2
+
+
+def classify_complexity(query: str) -> str:
+    """'simple' for short single-intent lookups, 'complex' for anything analytic or multi-part."""
+    words = query.split()
+    if len(words) > SIMPLE_MAX_WORDS or _COMPLEX_MARKERS.search(query):
+        return "complex"
+    if len(_CLAUSE_JOINERS.findall(query)) >= SIMPLE_MAX_CLAUSES:
+        return "complex"
+    return "simple"
+
+
+_MODULE_DOCS = {"Deals": DEALS_DOC, "Contacts": CONTACTS_DOC, "Leads": LEADS_DOC}
+_TOKEN = re.compile(r"[a-z]+")
+_STOPWORDS = {"the", "and", "for", "with", "from", "are", "who", "what", "which", "show", "find",
+              "list", "get", "all", "looking", "finding", "searching", "specific", "certain"}
+
+# Naming the module outright beats any amount of term overlap.
+_MODULE_NOUNS = {
+    "Deals": {"deal", "opportunity", "opportunitie"},
+    "Contacts": {"contact"},
+    "Leads": {"lead", "prospect"},
+}
+_NOUN_BONUS = 2.0
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
+
+def _stem(word: str) -> str:
+    return word[:-1] if len(word) > 3 and word.endswith("s") else word
+
+
+def _terms(text: str) -> list:
+    return [_stem(w) for w in _TOKEN.findall(text.lower()) if len(w) > 2 and w not in _STOPWORDS]
+
+
+def _routing_text(doc: str) -> str:
+    """The parts of a module doc that say what users ask for: its bolded field
+    names and the "Common Query Patterns" / "Synonyms and Related Terms" lists."""
+    parts = re.findall(r"\*\*(.+?)\*\*", doc)
+    for heading in ("Common Query Patterns:", "Synonyms and Related Terms:"):
+        section = doc.split(heading, 1)[1] if heading in doc else ""
+        parts.extend(line.strip("- ") for line in section.strip().split("\n\n", 1)[0].splitlines())
+    return "\n".join(parts)
+
+
+_DOC_TERMS = {module: Counter(_terms(_routing_text(doc))) for module, doc in _MODULE_DOCS.items()}
+_DOC_LEN = {module: sum(tf.values()) for module, tf in _DOC_TERMS.items()}
+_AVG_LEN = sum(_DOC_LEN.values()) / len(_DOC_LEN)
+_IDF = {
+    term: math.log((len(_DOC_TERMS) - df + 0.5) / (df + 0.5) + 1)
+    for term, df in Counter(t for tf in _DOC_TERMS.values() for t in tf).items()
+}
+
+
+def score_modules(query: str) -> dict:
+    """BM25 score of `query` against each module's routing text."""
+    terms = set(_terms(query))
+    scores = {}
+    for module, tf in _DOC_TERMS.items():
+        norm = _BM25_K1 * (1 - _BM25_B + _BM25_B * _DOC_LEN[module] / _AVG_LEN)
+        score = sum(
+            _IDF[t] * tf[t] * (_BM25_K1 + 1) / (tf[t] + norm)
+            for t in terms if t in tf
+        )
+        scores[module] = score + _NOUN_BONUS * len(terms & _MODULE_NOUNS[module])
+    return scores
+
+
+def rank_modules(query: str) -> list:
+    scores = score_modules(query)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+def classify_module(query: str):
+    """(best module, confidence in [0, 1]) where confidence is the winner's
+    margin over the runner-up relative to its own score."""
+    scores = score_modules(query)
+    ranked = sorted(scores.values(), reverse=True)
+    best = max(scores, key=scores.get)
+    if ranked[0] <= 0:
+        return best, 0.0
+    return best, (ranked[0] - ranked[1]) / ranked[0]
+
+
+def named_module(query: str):
+    """The module the query names outright ("deals", "prospects"...), if exactly one."""
+    terms = set(_terms(query))
+    named = [module for module, nouns in _MODULE_NOUNS.items() if terms & nouns]
+    return named[0] if len(named) == 1 else None
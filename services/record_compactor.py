@@ -0,0 +1,69 @@
+from config.settings import SUMMARY_TOKEN_BUDGET, SUMMARY_OVERFLOW
+
+# Fields worth showing for each module regardless of what was filtered on.
+DISPLAY_FIELDS = {
+    "Deals": ["Deal_Name", "Amount", "Stage", "Closing_Date", "Probability", "Account_Name", "Owner"],
+    "Leads": ["First_Name", "Last_Name", "Company", "Email", "Lead_Status", "Lead_Source", "Owner"],
+    "Contacts": ["First_Name", "Last_Name", "Email", "Phone", "Title", "Account_Name", "Owner"],
+}
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def project_fields(module: str, filter_keys=()) -> list:
+    fields = []
+    for name in list(filter_keys) + DISPLAY_FIELDS.get(module, []):
+        if name not in fields:
+            fields.append(name)
+    return fields
+
+
+def _cell(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, dict):
+        value = value.get("name") or value.get("email") or value.get("id") or ""
+    elif isinstance(value, list):
+        value = ", ".join(_cell(v) for v in value)
+    return str(value).replace("\t", " ").replace("\r", " ").replace("\n", " ")
+
+
+def _pick(n: int, k: int) -> list:
+    """k indices spread evenly over range(n), in order."""
+    if k >= n:
+        return list(range(n))
+    return [int(i * n / k) for i in range(k)]
+
+
+def compact_records(records: list, module: str, filter_keys=(), token_budget: int = SUMMARY_TOKEN_BUDGET,
+                    overflow: str = SUMMARY_OVERFLOW):
+    """Serialize records as tab-separated rows of the projected fields only.
+
+    Returns (text, shown, total). When the rows do not fit in `token_budget`
+    they are cut to the first ones that fit ("truncate") or to an evenly
+    spaced sample of the same size ("sample").
+    """
+    fields = [f for f in project_fields(module, filter_keys) if any(f in r for r in records)]
+    if not fields:
+        fields = sorted({k for r in records for k in r if not k.startswith("$")})
+
+    header = "\t".join(fields)
+    rows = ["\t".join(_cell(r.get(f)) for f in fields) for r in records]
+
+    budget = token_budget * CHARS_PER_TOKEN - len(header) - 1
+    fit, used = 0, 0
+    for row in rows:
+        used += len(row) + 1
+        if used > budget:
+            break
+        fit += 1
+
+    if fit < len(rows):
+        keep = _pick(len(rows), fit) if overflow == "sample" else list(range(fit))
+        rows = [rows[i] for i in keep]
+
+    return "\n".join([header] + rows), len(rows), len(records)
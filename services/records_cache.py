@@ -0,0 +1,103 @@
+import hashlib
+import json
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from config.settings import (
+    RECORDS_CACHE_MAX_BYTES,
+    RECORDS_CACHE_TTL,
+    RECORDS_CACHE_MODULE_TTLS,
+    RECORDS_CACHE_SHARED,
+)
+from services.cache import TTLCache
+from services.shared_state import shared_state
+from services.singleflight import SingleFlight
+
+
+def canonical_url(url: str) -> str:
+    """Same search, same key: lowercase scheme/host, sorted params, trimmed values."""
+    parts = urlsplit(url.strip())
+    params = sorted((k, " ".join(v.split())) for k, v in parse_qsl(parts.query, keep_blank_values=True))
+    return urlunsplit((
+        parts.scheme.lower(),
+        parts.netloc.lower(),
+        parts.path.rstrip("/"),
+        urlencode(params, safe="():,$"),
+        "",
+    ))
+
+
+def _sizeof(result) -> int:
+    return len(json.dumps(result, separators=(",", ":"), default=str))
+
+
+class RecordsCache:
+    """Zoho search results keyed by (module, canonical URL).
+
+    Identical fetches that arrive while one is in flight share its result,
+    and the cache is bounded by the serialized size of what it holds. With
+    RECORDS_CACHE_SHARED, results are also kept in shared state for the other
+    workers; invalidation bumps a shared generation so their copies stop
+    matching, while in-memory copies age out within their TTL.
+    """
+
+    def __init__(self, max_bytes: int = RECORDS_CACHE_MAX_BYTES, ttl: float = RECORDS_CACHE_TTL,
+                 module_ttls: dict = None, store=None):
+        self.ttl = ttl
+        self.module_ttls = RECORDS_CACHE_MODULE_TTLS if module_ttls is None else module_ttls
+        self._cache = TTLCache(maxsize=100_000, ttl=ttl, max_bytes=max_bytes, sizeof=_sizeof)
+        self._flights = SingleFlight()
+        if store is None and RECORDS_CACHE_SHARED:
+            store = shared_state
+        self._shared = None if store is None or store.name == "memory" else store
+        self.shared_hits = 0
+
+    def ttl_for(self, module: str) -> float:
+        return self.module_ttls.get(module, self.ttl)
+
+    async def fetch(self, module: str, url: str, fetch_fn):
+        key = (module, canonical_url(url))
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        async def load():
+            shared_key = None
+            if self._shared is not None:
+                generation = await self._shared.get("records:generation") or 0
+                shared_key = "records:" + hashlib.sha256(json.dumps([*key, generation]).encode()).hexdigest()
+                stored = await self._shared.get(shared_key)
+                if stored is not None:
+                    self.shared_hits += 1
+                    self._cache.set(key, stored, ttl=self.ttl_for(module))
+                    return stored
+
+            result = await fetch_fn()
+            if isinstance(result, dict) and "error" not in result and self.ttl_for(module) > 0:
+                self._cache.set(key, result, ttl=self.ttl_for(module))
+                if shared_key is not None:
+                    await self._shared.set(shared_key, result, self.ttl_for(module))
+            return result
+
+        return await self._flights.do(key, load)
+
+    async def invalidate_module(self, module: str = None) -> int:
+        keys = [k for k in self._cache.keys() if module is None or k[0].lower() == module.lower()]
+        for key in keys:
+            self._cache.pop(key)
+        if self._shared is not None:
+            # Shared entries cannot be listed, so every module's are dropped.
+            generation = await self._shared.get("records:generation") or 0
+            await self._shared.set("records:generation", generation + 1)
+        return len(keys)
+
+    def stats(self) -> dict:
+        return {
+            **self._cache.stats(),
+            "max_bytes": self._cache.max_bytes,
+            "coalesced": self._flights.followers,
+            "shared_hits": self.shared_hits,
+            "shared": self._shared.name if self._shared is not None else None,
+        }
+
+
+records_cache = RecordsCache()
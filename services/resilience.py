@@ -0,0 +1,352 @@
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+from config.settings import (
+    OPENAI_MAX_CONCURRENCY,
+    MCP_MAX_CONCURRENCY,
+    ZOHO_MAX_CONCURRENCY,
+    LIMITER_LATENCY_TOLERANCE,
+    BACKEND_QUEUE_TIMEOUT,
+    BACKEND_QUEUE_MAX,
+    RETRY_MAX_ATTEMPTS,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+    BREAKER_FAILURES,
+    BREAKER_COOLDOWN,
+)
+from services import metrics
+
+# Protection for the three dependencies (OpenAI, the MCP server, Zoho behind
+# it). Each gets an adaptive concurrency limit with a bounded wait queue,
+# retries for 429 / 5xx / transport errors that honour Retry-After, and a
+# circuit breaker that fails fast while the dependency is down. Callers see
+# BackendUnavailable (with a retry_after hint) once protection gives up.
+
+queue_wait = metrics.histogram("backend_queue_wait_seconds", "Time spent waiting for a backend concurrency slot, by backend")
+retries = metrics.counter("backend_retries_total", "Backend calls retried, by backend and reason (rate_limited/failure)")
+rejections = metrics.counter("backend_rejections_total", "Backend calls refused without being sent, by backend and reason")
+
+
+class BackendUnavailable(Exception):
+    """A dependency cannot take this call now; try again after `retry_after` seconds."""
+
+    def __init__(self, backend: str, retry_after: float, reason: str):
+        super().__init__(f"{backend} unavailable ({reason}); retry in {retry_after:.0f}s")
+        self.backend = backend
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class CircuitOpen(BackendUnavailable):
+    pass
+
+
+class Overloaded(BackendUnavailable):
+    pass
+
+
+class BackendError(Exception):
+    """An error a backend reported inside an otherwise successful response."""
+
+    def __init__(self, status_code: int, message: str, retry_after: float = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+# Connection-level errors from the HTTP and MCP client libraries.
+_TRANSPORT_ERRORS = {
+    "APIConnectionError", "APITimeoutError", "ConnectError", "ReadTimeout", "RemoteProtocolError",
+    "ClosedResourceError", "BrokenResourceError", "EndOfStream", "McpError",
+}
+
+
+def _retry_after(headers) -> float:
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_error(e: Exception):
+    """("rate_limited" | "failure" | "other", retry_after seconds or None)."""
+    response = getattr(e, "response", None)
+    status = getattr(e, "status_code", None) or getattr(response, "status_code", None)
+    retry_after = getattr(e, "retry_after", None) or _retry_after(getattr(response, "headers", None))
+    if status == 429:
+        return "rate_limited", retry_after
+    if isinstance(status, int) and status >= 500:
+        return "failure", retry_after
+    if status is None and (isinstance(e, (ConnectionError, TimeoutError, asyncio.TimeoutError)) or type(e).__name__ in _TRANSPORT_ERRORS):
+        return "failure", None
+    return "other", None
+
+
+def check_zoho_result(result):
+    """Raise BackendError for a rate-limit or server error that fetch_zoho_results passed through."""
+    if isinstance(result, str):
+        # Record pages are large and never errors; only small payloads are worth parsing.
+        if len(result) > 4096 or ("error" not in result and "TOO_MANY_REQUESTS" not in result):
+            return
+        try:
+            result = json.loads(result)
+        except ValueError:
+            return
+    if not isinstance(result, dict):
+        return
+    body = result.get("results") if isinstance(result.get("results"), dict) else result
+    status = body.get("status") if isinstance(body.get("status"), int) else None
+    if body.get("code") == "TOO_MANY_REQUESTS" or status == 429:
+        raise BackendError(429, body.get("message") or "Zoho rate limit", _retry_after(body.get("headers")))
+    if status is not None and status >= 500:
+        raise BackendError(status, str(body.get("error") or body.get("message") or "Zoho server error"))
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit: +1/limit per healthy call, x0.9 on rising latency, x0.5 on overload.
+
+    Latency is judged against the recent best (which drifts up slowly), so no
+    per-backend latency target is needed. At most one decrease happens per
+    baseline latency, so one burst of failures does not collapse the limit.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1, tolerance: float = LIMITER_LATENCY_TOLERANCE,
+                 queue_timeout: float = BACKEND_QUEUE_TIMEOUT, queue_max: int = BACKEND_QUEUE_MAX,
+                 clock=time.monotonic):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = float(max_limit)
+        self.tolerance = tolerance
+        self.queue_timeout = queue_timeout
+        self.queue_max = queue_max
+        self.clock = clock
+        self.in_flight = 0
+        self.baseline = None
+        self._last_decrease = 0.0
+        self._waiters = deque()
+
+    def capacity(self) -> int:
+        return max(self.min_limit, int(self.limit))
+
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self):
+        """Take a slot; raises asyncio.TimeoutError after queue_timeout and OverflowError when the queue is full."""
+        if not self._waiters and self.in_flight < self.capacity():
+            self.in_flight += 1
+            return
+        if len(self._waiters) >= self.queue_max:
+            raise OverflowError("queue full")
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up.
+                self._release_slot()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def release(self, latency: float, outcome: str):
+        """outcome: "ok", "dropped" (429 / failure) or "ignore" (says nothing about load)."""
+        now = self.clock()
+        if outcome == "dropped":
+            self._decrease(0.5, now)
+        elif outcome == "ok":
+            self.baseline = latency if self.baseline is None else min(latency, self.baseline + (latency - self.baseline) * 0.01)
+            if latency > self.baseline * self.tolerance:
+                self._decrease(0.9, now)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        self._release_slot()
+
+    def _decrease(self, factor: float, now: float):
+        if now - self._last_decrease >= max(self.baseline or 0.0, 0.1):
+            self.limit = max(self.min_limit, self.limit * factor)
+            self._last_decrease = now
+
+    def _release_slot(self):
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < self.capacity():
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+
+class CircuitBreaker:
+    """closed -> open after `failures` consecutive failures -> half-open after `cooldown` (one probe)."""
+
+    def __init__(self, failures: int = BREAKER_FAILURES, cooldown: float = BREAKER_COOLDOWN, clock=time.monotonic):
+        self.threshold = failures
+        self.cooldown = cooldown
+        self.clock = clock
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def retry_after(self) -> float:
+        if self.state != "open":
+            return 0.0
+        return max(0.0, self.opened_at + self.cooldown - self.clock())
+
+    def is_open(self) -> bool:
+        return self.state == "open" and self.retry_after() > 0
+
+    def allow(self) -> bool:
+        if self.state == "open":
+            if self.retry_after() > 0:
+                return False
+            self.state = "half_open"
+        if self.state == "half_open":
+            if self._probing:
+                return False
+            self._probing = True
+        return True
+
+    def success(self):
+        self.state = "closed"
+        self.failures = 0
+        self._probing = False
+
+    def failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.threshold:
+            self.state = "open"
+            self.opened_at = self.clock()
+        self._probing = False
+
+    def abandon(self):
+        """The call was cancelled before it said anything about the backend."""
+        self._probing = False
+
+
+class Backend:
+    def __init__(self, name: str, max_concurrency: int, check=None):
+        self.name = name
+        self.limiter = AdaptiveLimiter(max_concurrency)
+        self.breaker = CircuitBreaker()
+        self.check = check
+
+    async def _slot(self):
+        if not self.breaker.allow():
+            rejections.inc(backend=self.name, reason="circuit_open")
+            raise CircuitOpen(self.name, self.breaker.retry_after() or 1.0, "circuit open")
+        start = time.perf_counter()
+        try:
+            await self.limiter.acquire()
+        except (asyncio.TimeoutError, OverflowError) as e:
+            self.breaker.abandon()
+            reason = "queue_full" if isinstance(e, OverflowError) else "queue_timeout"
+            rejections.inc(backend=self.name, reason=reason)
+            raise Overloaded(self.name, self.limiter.queue_timeout, reason.replace("_", " ")) from None
+        except BaseException:
+            self.breaker.abandon()
+            raise
+        queue_wait.observe(time.perf_counter() - start, backend=self.name)
+
+    async def call(self, fn):
+        """await fn() under this backend's limit, breaker and retry policy."""
+        for attempt in range(1, RETRY_MAX_ATTEMPTS + 1):
+            await self._slot()
+            start = time.monotonic()
+            try:
+                result = await fn()
+                if self.check is not None:
+                    self.check(result)
+            except asyncio.CancelledError:
+                self.limiter.release(time.monotonic() - start, "ignore")
+                self.breaker.abandon()
+                raise
+            except Exception as e:
+                kind, retry_after = classify_error(e)
+                self.limiter.release(time.monotonic() - start, "ignore" if kind == "other" else "dropped")
+                if kind == "failure":
+                    self.breaker.failure()
+                else:
+                    # A 429 or a bad request still means the backend is up.
+                    self.breaker.success()
+                if kind == "other":
+                    raise
+                delay = _backoff(attempt) if retry_after is None else retry_after + random.uniform(0, RETRY_BASE_DELAY)
+                if attempt == RETRY_MAX_ATTEMPTS or delay > RETRY_MAX_DELAY:
+                    raise BackendUnavailable(self.name, max(1.0, retry_after or delay), kind.replace("_", " ")) from e
+                retries.inc(backend=self.name, reason=kind)
+                await asyncio.sleep(delay)
+                continue
+            self.limiter.release(time.monotonic() - start, "ok")
+            self.breaker.success()
+            return result
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limiter.capacity(),
+            "in_flight": self.limiter.in_flight,
+            "waiting": self.limiter.waiting(),
+            "baseline_ms": None if self.limiter.baseline is None else round(self.limiter.baseline * 1000, 1),
+            "circuit": self.breaker.state,
+            "retry_after": round(self.breaker.retry_after(), 1),
+        }
+
+
+def _backoff(attempt: int) -> float:
+    # Full jitter: anywhere between 0 and the exponential step.
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1)))
+
+
+openai_backend = Backend("openai", OPENAI_MAX_CONCURRENCY)
+mcp_backend = Backend("mcp", MCP_MAX_CONCURRENCY)
+zoho_backend = Backend("zoho", ZOHO_MAX_CONCURRENCY, check=check_zoho_result)
+backends = {b.name: b for b in (openai_backend, mcp_backend, zoho_backend)}
+
+# Every /chat run needs MCP and Zoho; without OpenAI the pipeline degrades instead.
+REQUIRED_BACKENDS = ("mcp", "zoho")
+
+
+def shed_reason():
+    """(reason, retry_after) when a new /chat run is bound to fail, else None."""
+    for name in REQUIRED_BACKENDS:
+        backend = backends[name]
+        if backend.breaker.is_open():
+            return f"{name} is unavailable", backend.breaker.retry_after()
+        if backend.limiter.waiting() >= backend.limiter.queue_max:
+            return f"{name} is overloaded", backend.limiter.queue_timeout
+    return None
+
+
+def backend_stats() -> dict:
+    return {name: backend.stats() for name, backend in backends.items()}
+
+
+_STATES = {"closed": 0, "half_open": 1, "open": 2}
+metrics.gauge_callback(
+    "backend_concurrency_limit", "Current adaptive concurrency limit of each backend",
+    lambda: [({"backend": name}, b.limiter.capacity()) for name, b in backends.items()],
+)
+metrics.gauge_callback(
+    "backend_in_flight", "Calls in flight to each backend",
+    lambda: [({"backend": name}, b.limiter.in_flight) for name, b in backends.items()],
+)
+metrics.gauge_callback(
+    "backend_circuit_state", "Circuit breaker state of each backend (0 closed, 1 half-open, 2 open)",
+    lambda: [({"backend": name}, _STATES[b.breaker.state]) for name, b in backends.items()],
+)
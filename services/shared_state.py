@@ -0,0 +1,287 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+
+from config.settings import SHARED_STATE_URL, SHARED_STATE_PURGE_INTERVAL
+from services import metrics
+
+# Key/value state that every uvicorn worker (and, with Redis, every node)
+# sees the same way: the Zoho token, refresh locks and shared cache tiers.
+# Values must be JSON-serializable; a ttl of None means no expiry.
+
+purged = metrics.counter("shared_state_purged_total", "Expired shared state entries removed, by backend")
+
+
+class LockTimeout(Exception):
+    pass
+
+
+class SharedState(ABC):
+    name = "abstract"
+    _purger = None
+
+    @abstractmethod
+    async def get(self, key: str):
+        """The stored value, or None if it is missing or expired."""
+
+    @abstractmethod
+    async def set(self, key: str, value, ttl: float = None):
+        ...
+
+    @abstractmethod
+    async def set_if_absent(self, key: str, value, ttl: float = None) -> bool:
+        """Store only if `key` is missing or expired; True if this call stored it."""
+
+    @abstractmethod
+    async def delete(self, key: str, value=None):
+        """Remove `key`; when `value` is given, only if it still holds that value."""
+
+    def purge_expired(self) -> int:
+        """Drop expired entries; backends that expire keys on their own have nothing to do."""
+        return 0
+
+    async def start(self, interval: float = SHARED_STATE_PURGE_INTERVAL):
+        """Purge expired entries every `interval` seconds, so unread keys do not pile up."""
+        if interval > 0 and self._purger is None and type(self).purge_expired is not SharedState.purge_expired:
+            self._purger = asyncio.create_task(self._purge_loop(interval))
+
+    async def _purge_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                purged.inc(await asyncio.to_thread(self.purge_expired), backend=self.name)
+            except Exception as e:
+                print(f"Shared state purge failed: {e}")
+
+    async def close(self):
+        if self._purger is not None:
+            self._purger.cancel()
+            try:
+                await self._purger
+            except asyncio.CancelledError:
+                pass
+            self._purger = None
+
+    @asynccontextmanager
+    async def lock(self, name: str, ttl: float = 30, wait: float = 30, poll: float = 0.1):
+        """Cross-worker mutex on top of set_if_absent; expires after `ttl` if the holder dies."""
+        key, owner = f"lock:{name}", uuid.uuid4().hex
+        deadline = time.monotonic() + wait
+        while not await self.set_if_absent(key, owner, ttl):
+            if time.monotonic() >= deadline:
+                raise LockTimeout(name)
+            await asyncio.sleep(poll)
+        try:
+            yield
+        finally:
+            await self.delete(key, owner)
+
+
+class InProcessState(SharedState):
+    """Plain dict; only shared within one process. Fine for a single worker (memory://)."""
+
+    name = "memory"
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._data = {}
+
+    def _live(self, key: str):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= self.clock():
+            del self._data[key]
+            return None
+        return entry
+
+    async def get(self, key: str):
+        entry = self._live(key)
+        return None if entry is None else entry[0]
+
+    async def set(self, key: str, value, ttl: float = None):
+        self._data[key] = (value, None if ttl is None else self.clock() + ttl)
+
+    async def set_if_absent(self, key: str, value, ttl: float = None) -> bool:
+        if self._live(key) is not None:
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def delete(self, key: str, value=None):
+        entry = self._live(key)
+        if entry is not None and (value is None or entry[0] == value):
+            del self._data[key]
+
+    def purge_expired(self) -> int:
+        now = self.clock()
+        expired = [k for k, (_, expires_at) in list(self._data.items()) if expires_at is not None and expires_at <= now]
+        for key in expired:
+            self._data.pop(key, None)
+        return len(expired)
+
+
+class SqliteState(SharedState):
+    """One sqlite file in WAL mode: safe for several worker processes on one box.
+
+    Each operation is a short transaction run in a worker thread; BEGIN
+    IMMEDIATE makes set_if_absent atomic across processes.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, clock=time.time):
+        self.path = path
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self):
+        # Opened on first use (under self._lock), so importing this module
+        # does not create the file.
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS shared_state ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _get(self, key: str):
+        with self._lock:
+            row = self._db().execute(
+                "SELECT value, expires_at FROM shared_state WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or (row[1] is not None and row[1] <= self.clock()):
+            return None
+        return json.loads(row[0])
+
+    def _expiry(self, ttl):
+        return None if ttl is None else self.clock() + ttl
+
+    def _set(self, key: str, value, ttl):
+        with self._lock:
+            self._db().execute(
+                "INSERT OR REPLACE INTO shared_state (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, default=str), self._expiry(ttl)),
+            )
+
+    def _set_if_absent(self, key: str, value, ttl) -> bool:
+        with self._lock:
+            conn = self._db()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "DELETE FROM shared_state WHERE key = ? AND expires_at IS NOT NULL AND expires_at <= ?",
+                    (key, self.clock()),
+                )
+                inserted = conn.execute(
+                    "INSERT OR IGNORE INTO shared_state (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value, default=str), self._expiry(ttl)),
+                ).rowcount == 1
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return inserted
+
+    def _delete(self, key: str, value):
+        with self._lock:
+            if value is None:
+                self._db().execute("DELETE FROM shared_state WHERE key = ?", (key,))
+            else:
+                self._db().execute(
+                    "DELETE FROM shared_state WHERE key = ? AND value = ?", (key, json.dumps(value, default=str))
+                )
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            return self._db().execute(
+                "DELETE FROM shared_state WHERE expires_at IS NOT NULL AND expires_at <= ?", (self.clock(),)
+            ).rowcount
+
+    async def get(self, key: str):
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value, ttl: float = None):
+        await asyncio.to_thread(self._set, key, value, ttl)
+
+    async def set_if_absent(self, key: str, value, ttl: float = None) -> bool:
+        return await asyncio.to_thread(self._set_if_absent, key, value, ttl)
+
+    async def delete(self, key: str, value=None):
+        await asyncio.to_thread(self._delete, key, value)
+
+    async def close(self):
+        await super().close()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class RedisState(SharedState):
+    """Redis (or anything speaking its protocol) for state shared across nodes.
+
+    Needs the `redis` package, which is only imported when this backend is used.
+    """
+
+    name = "redis"
+
+    # Delete only if the key still holds our value (lock release).
+    _DELETE_IF = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+    def __init__(self, url: str, prefix: str = "zoho-mcp:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("SHARED_STATE_URL points at Redis but the 'redis' package is not installed") from e
+        self.prefix = prefix
+        self._client = redis.from_url(url)
+
+    async def get(self, key: str):
+        raw = await self._client.get(self.prefix + key)
+        return None if raw is None else json.loads(raw)
+
+    async def set(self, key: str, value, ttl: float = None):
+        await self._client.set(self.prefix + key, json.dumps(value, default=str),
+                               px=None if ttl is None else int(ttl * 1000))
+
+    async def set_if_absent(self, key: str, value, ttl: float = None) -> bool:
+        return bool(await self._client.set(self.prefix + key, json.dumps(value, default=str), nx=True,
+                                           px=None if ttl is None else int(ttl * 1000)))
+
+    async def delete(self, key: str, value=None):
+        if value is None:
+            await self._client.delete(self.prefix + key)
+        else:
+            await self._client.eval(self._DELETE_IF, 1, self.prefix + key, json.dumps(value, default=str))
+
+    async def close(self):
+        await super().close()
+        await self._client.aclose()
+
+
+def create_state(url: str) -> SharedState:
+    """memory:// | sqlite:///path/to/state.db | redis://host:6379/0"""
+    if not url or url.startswith("memory:"):
+        return InProcessState()
+    if url.startswith("sqlite:///"):
+        return SqliteState(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisState(url)
+    raise ValueError(f"Unsupported SHARED_STATE_URL: {url}")
+
+
+shared_state = create_state(SHARED_STATE_URL)
@@ -0,0 +1,44 @@
+import asyncio
+
+
+class SingleFlight:
+    """Collapse concurrent calls that share a key into one in-flight task.
+
+    The shared task is shielded from its callers: a caller that is cancelled
+    stops waiting, but the work carries on for everyone else.
+    """
+
+    def __init__(self):
+        self.leaders = 0
+        self.followers = 0
+        self._inflight = {}
+
+    async def do(self, key, fn):
+        task = self._inflight.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self.followers += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every caller went away.
+            task.exception()
+
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    def stats(self) -> dict:
+        calls = self.leaders + self.followers
+        return {
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "in_flight": len(self._inflight),
+            "coalescing_ratio": self.followers / calls if calls else 0.0,
+        }
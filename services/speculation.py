@@ -0,0 +1,47 @@
+import asyncio
+
+from services import metrics
+from services.tracing import tracer
+
+speculations = metrics.counter("speculation_total", "Descriptor prefetches resolved, by outcome (hit/miss)")
+speculation_waste = metrics.counter("speculation_wasted_total", "Descriptor prefetches thrown away, by state (cancelled/completed)")
+
+
+class DescriptorSpeculation:
+    """Prefetch filter descriptors for likely modules while reasoning runs.
+
+    `fetch` is called as fetch(module, complexity) for each candidate. When the
+    plan is known, resolve() keeps the prefetch that matches it and cancels
+    the rest.
+    """
+
+    def __init__(self, fetch, candidates: list, complexity: str):
+        self.complexity = complexity
+        self._tasks = {module: asyncio.create_task(fetch(module, complexity)) for module in candidates}
+
+    async def resolve(self, module: str, complexity: str):
+        task = self._tasks.pop(module, None) if complexity == self.complexity else None
+        self.cancel()
+
+        if task is None:
+            speculations.inc(outcome="miss")
+            return None
+        try:
+            result = await task
+        except Exception as e:
+            tracer.event("speculation_error", type=type(e).__name__, error=str(e))
+            speculations.inc(outcome="miss")
+            return None
+        speculations.inc(outcome="hit")
+        return result
+
+    def cancel(self):
+        for task in self._tasks.values():
+            if task.done():
+                speculation_waste.inc(state="completed")
+                if not task.cancelled():
+                    task.exception()
+            else:
+                task.cancel()
+                speculation_waste.inc(state="cancelled")
+        self._tasks = {}
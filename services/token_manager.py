@@ -0,0 +1,224 @@
+import asyncio
+import json
+import os
+import time
+
+from config.settings import (
+    ZOHO_CLIENT_ID,
+    ZOHO_CLIENT_SECRET,
+    ZOHO_TOKEN_URL,
+    TOKEN_STORE_PATH,
+    TOKEN_REFRESH_MARGIN,
+    TOKEN_REFRESH_RETRY,
+)
+from services import metrics
+from services.shared_state import LockTimeout, shared_state
+from services.singleflight import SingleFlight
+
+TOKEN_KEY = "zoho:token"
+
+token_refreshes = metrics.counter("zoho_token_refreshes_total", "Zoho token refreshes by outcome (ok/failed)")
+
+
+class TokenRefreshError(Exception):
+    pass
+
+
+def _read(path: str):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+class TokenManager:
+    """Holds the Zoho OAuth token and refreshes it before it expires.
+
+    The token lives in shared state, so every worker serves the same one.
+    A background task refreshes it `refresh_margin` seconds ahead of expiry;
+    `get()` also refreshes if called on a token that is already due. Refreshes
+    are single-flight within a worker and hold a shared-state lock across
+    workers, so the OAuth endpoint sees one refresh at a time.
+    """
+
+    def __init__(self, store=None, legacy_path: str = TOKEN_STORE_PATH, token_url: str = ZOHO_TOKEN_URL,
+                 client_id: str = ZOHO_CLIENT_ID, client_secret: str = ZOHO_CLIENT_SECRET,
+                 refresh_margin: float = TOKEN_REFRESH_MARGIN, retry_after: float = TOKEN_REFRESH_RETRY,
+                 clock=time.time):
+        self.store = store if store is not None else shared_state
+        self.legacy_path = legacy_path
+        self.token_url = token_url
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.refresh_margin = refresh_margin
+        self.retry_after = retry_after
+        self.clock = clock
+        self.refreshes = 0
+        self.failures = 0
+        self.last_error = None
+        self._token = None
+        self._migrated = False
+        self._flights = SingleFlight()
+        self._changed = asyncio.Event()
+        self._task = None
+        self._http = None
+
+    @property
+    def can_refresh(self) -> bool:
+        return bool(self.client_id and self.client_secret)
+
+    def expires_at(self, token: dict = None):
+        token = token or self._token
+        if not token:
+            return None
+        return token.get("timestamp", 0) + int(token.get("expires_in", 3600))
+
+    def _due(self) -> bool:
+        expires = self.expires_at()
+        return expires is not None and self.clock() >= expires - self.refresh_margin
+
+    async def load(self):
+        """Re-read the token from shared state; another worker may have replaced it."""
+        token = await self.store.get(TOKEN_KEY)
+        if token is None and not self._migrated:
+            self._migrated = True
+            legacy = await asyncio.to_thread(_read, self.legacy_path)
+            if legacy and await self.store.set_if_absent(TOKEN_KEY, legacy):
+                token = legacy
+        self._token = token
+        return token
+
+    async def save(self, token_data: dict):
+        """Store a token (from the OAuth callback or a refresh) and persist it."""
+        token_data = dict(token_data)
+        token_data.setdefault("timestamp", int(self.clock()))
+        await self.store.set(TOKEN_KEY, token_data)
+        self._token = token_data
+        self._changed.set()
+        return token_data
+
+    async def get(self):
+        """The current token, refreshed first if it is due; None if there is none."""
+        token = await self.load()
+        if token is None or not self.can_refresh or not self._due():
+            return token
+        try:
+            return await self.refresh()
+        except TokenRefreshError:
+            # Still usable until it actually expires.
+            if self.clock() < self.expires_at():
+                return self._token
+            raise
+
+    async def refresh(self):
+        return await self._flights.do("refresh", self._refresh)
+
+    async def _refresh(self):
+        try:
+            try:
+                async with self.store.lock("zoho-token-refresh", ttl=30, wait=30):
+                    # Another worker may have refreshed while we waited for the lock.
+                    token = await self.load()
+                    if token is not None and not self._due():
+                        return token
+                    return await self._refresh_locked(token or {})
+            except LockTimeout as e:
+                raise TokenRefreshError("Timed out waiting for another worker's token refresh") from e
+        except TokenRefreshError as e:
+            token_refreshes.inc(outcome="failed")
+            self.last_error = str(e)
+            raise
+
+    async def _refresh_locked(self, token: dict):
+        refresh_token = token.get("refresh_token")
+        if not refresh_token or not self.can_refresh:
+            raise TokenRefreshError("No refresh token or client credentials configured")
+        if self._http is None:
+            import httpx
+            self._http = httpx.AsyncClient(timeout=15)
+        start = time.perf_counter()
+        try:
+            response = await self._http.post(self.token_url, data={
+                "grant_type": "refresh_token",
+                "refresh_token": refresh_token,
+                "client_id": self.client_id,
+                "client_secret": self.client_secret,
+            })
+            body = response.json()
+        except Exception as e:
+            self.failures += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            metrics.external_errors.inc(service="zoho_oauth", op="refresh", type=type(e).__name__)
+            raise TokenRefreshError(self.last_error) from e
+        finally:
+            metrics.external_latency.observe(time.perf_counter() - start, service="zoho_oauth", op="refresh")
+
+        if "access_token" not in body:
+            self.failures += 1
+            self.last_error = str(body.get("error", f"HTTP {response.status_code}"))
+            raise TokenRefreshError(f"Token refresh failed: {self.last_error}")
+
+        # Zoho does not send the refresh token again on a refresh grant.
+        body.setdefault("refresh_token", refresh_token)
+        body["timestamp"] = int(self.clock())
+        self.refreshes += 1
+        self.last_error = None
+        token_refreshes.inc(outcome="ok")
+        return await self.save(body)
+
+    async def _refresh_loop(self):
+        while True:
+            self._changed.clear()
+            await self.load()
+            expires = self.expires_at()
+            if not self.can_refresh:
+                delay = None
+            elif expires is None:
+                # The token may arrive through another worker's /save-token.
+                delay = self.retry_after
+            else:
+                delay = max(0.0, expires - self.refresh_margin - self.clock())
+            if delay == 0:
+                try:
+                    await self.refresh()
+                    continue
+                except TokenRefreshError:
+                    # Counted and kept in last_error by _refresh; try again later.
+                    delay = self.retry_after
+            try:
+                # A new token via save() re-plans the next refresh.
+                await asyncio.wait_for(self._changed.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self):
+        await self.load()
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def stats(self) -> dict:
+        expires = self.expires_at()
+        return {
+            "backend": self.store.name,
+            "has_token": self._token is not None,
+            "expires_in": None if expires is None else int(expires - self.clock()),
+            "can_refresh": self.can_refresh,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+
+token_manager = TokenManager()
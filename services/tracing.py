@@ -0,0 +1,260 @@
+import asyncio
+import json
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from config.settings import (
+    TRACE_ENABLED,
+    TRACE_SAMPLE_RATE,
+    TRACE_BUFFER_SIZE,
+    TRACE_PAYLOAD_MAX_CHARS,
+    TRACE_CAPTURE_QUEUE_SIZE,
+    TRACE_EXPORT_PATH,
+)
+
+# Per-request timelines. Every /chat call gets a trace; graph nodes and
+# external calls open spans under it, and what used to be print() calls are
+# recorded as span events. Large payloads (prompts, completions, records) are
+# only kept for a sampled share of traces and serialized off the request path.
+
+_trace = ContextVar("trace", default=None)
+_span = ContextVar("span", default=None)
+
+
+class Span:
+    __slots__ = ("id", "parent_id", "name", "start", "end", "attrs", "events", "payloads", "error")
+
+    def __init__(self, name: str, parent_id: str, start: float, attrs: dict):
+        self.id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.start = start
+        self.end = None
+        self.attrs = attrs
+        self.events = []
+        self.payloads = {}
+        self.error = None
+
+    def to_dict(self, origin: float) -> dict:
+        return {
+            "span_id": self.id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 3),
+            "duration_ms": None if self.end is None else round((self.end - self.start) * 1000, 3),
+            "attrs": self.attrs,
+            "events": [{"at_ms": round((at - origin) * 1000, 3), "message": m, **a} for at, m, a in self.events],
+            "payloads": self.payloads,
+            "error": self.error,
+        }
+
+
+class Trace:
+    def __init__(self, name: str, sampled: bool, attrs: dict):
+        self.id = uuid.uuid4().hex
+        self.started_at = time.time()
+        self.origin = time.perf_counter()
+        self.sampled = sampled
+        self.root = Span(name, None, self.origin, attrs)
+        self.spans = [self.root]
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.id,
+            "started_at": self.started_at,
+            "duration_ms": None if self.root.end is None else round((self.root.end - self.origin) * 1000, 3),
+            "sampled": self.sampled,
+            "spans": [s.to_dict(self.origin) for s in self.spans],
+        }
+
+
+def _serialize(value, limit: int) -> str:
+    text = value if isinstance(value, str) else json.dumps(value, default=str)
+    return text if len(text) <= limit else text[:limit] + f"... [{len(text) - limit} more chars]"
+
+
+class Tracer:
+    """Keeps the last `buffer_size` traces and serializes captured payloads.
+
+    Captures are queued as object references and turned into (truncated)
+    text by a background task, or on read if that task is not running.
+    Finished traces are appended to `export_path` as JSON lines when set.
+    Both queues are bounded like the trace buffer, so without the task the
+    oldest entries are dropped instead of piling up.
+    """
+
+    def __init__(self, enabled: bool = TRACE_ENABLED, sample_rate: float = TRACE_SAMPLE_RATE,
+                 buffer_size: int = TRACE_BUFFER_SIZE, payload_max_chars: int = TRACE_PAYLOAD_MAX_CHARS,
+                 export_path: str = TRACE_EXPORT_PATH, capture_queue_size: int = TRACE_CAPTURE_QUEUE_SIZE):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.buffer_size = buffer_size
+        self.payload_max_chars = payload_max_chars
+        self.export_path = export_path
+        self._traces = OrderedDict()
+        self._lock = threading.Lock()
+        self._captures = deque(maxlen=capture_queue_size)
+        self._finished = deque(maxlen=buffer_size)
+        self._wakeup = None
+        self._task = None
+
+    # -- recording -------------------------------------------------------
+
+    @contextmanager
+    def trace(self, name: str, sample: bool = None, **attrs):
+        if not self.enabled:
+            yield None
+            return
+        sampled = sample if sample is not None else random.random() < self.sample_rate
+        trace = Trace(name, sampled, attrs)
+        trace_token = _trace.set(trace)
+        span_token = _span.set(trace.root)
+        try:
+            yield trace
+        except BaseException as e:
+            trace.root.error = type(e).__name__
+            raise
+        finally:
+            trace.root.end = time.perf_counter()
+            try:
+                _span.reset(span_token)
+                _trace.reset(trace_token)
+            except ValueError:
+                # A streaming generator closed from another context.
+                _span.set(None)
+                _trace.set(None)
+            self._store(trace)
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        trace = _trace.get()
+        if trace is None:
+            yield None
+            return
+        parent = _span.get()
+        span = Span(name, parent.id if parent else None, time.perf_counter(), attrs)
+        trace.spans.append(span)
+        token = _span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end = time.perf_counter()
+            _span.reset(token)
+
+    def event(self, message: str, **attrs):
+        span = _span.get()
+        if span is not None:
+            span.events.append((time.perf_counter(), message, attrs))
+
+    def annotate(self, **attrs):
+        span = _span.get()
+        if span is not None:
+            span.attrs.update(attrs)
+
+    def capture(self, name: str, value):
+        """Attach a large payload to the current span, for sampled traces only."""
+        trace, span = _trace.get(), _span.get()
+        if trace is None or not trace.sampled or span is None:
+            return
+        self._captures.append((span, name, value))
+        self._wake()
+
+    def current_trace_id(self):
+        trace = _trace.get()
+        return trace.id if trace else None
+
+    # -- buffering -------------------------------------------------------
+
+    def _store(self, trace: Trace):
+        with self._lock:
+            self._traces[trace.id] = trace
+            while len(self._traces) > self.buffer_size:
+                self._traces.popitem(last=False)
+        if self.export_path:
+            self._finished.append(trace)
+            self._wake()
+
+    def _wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _drain_captures(self):
+        while self._captures:
+            span, name, value = self._captures.popleft()
+            span.payloads[name] = _serialize(value, self.payload_max_chars)
+
+    def _export(self):
+        lines = []
+        while self._finished:
+            lines.append(json.dumps(self._finished.popleft().to_dict(), default=str))
+        if lines:
+            with open(self.export_path, "a") as f:
+                f.write("\n".join(lines) + "\n")
+
+    async def _flush_loop(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            # Let the request that queued the work finish first.
+            await asyncio.sleep(0.05)
+            try:
+                await asyncio.to_thread(self._drain_captures)
+                # Payloads are serialized before their trace is exported.
+                if self._finished:
+                    await asyncio.to_thread(self._export)
+            except Exception as e:
+                print(f"Tracing: flush failed: {e}")
+
+    async def start(self):
+        if self._task is None and self.enabled:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+        self._drain_captures()
+        if self.export_path:
+            self._export()
+
+    # -- reading ---------------------------------------------------------
+
+    def get(self, trace_id: str):
+        with self._lock:
+            trace = self._traces.get(trace_id)
+        if trace is None:
+            return None
+        self._drain_captures()
+        return trace.to_dict()
+
+    def recent(self, limit: int = 50) -> list:
+        with self._lock:
+            traces = list(self._traces.values())[-limit:]
+        return [
+            {
+                "trace_id": t.id,
+                "name": t.root.name,
+                "started_at": t.started_at,
+                "duration_ms": None if t.root.end is None else round((t.root.end - t.origin) * 1000, 3),
+                "sampled": t.sampled,
+                "error": t.root.error,
+            }
+            for t in reversed(traces)
+        ]
+
+
+tracer = Tracer()
@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+from config.settings import WARMUP_MODE
+from services import llm, metrics
+from services.agent_runner import init_graph
+from services.mcp_pool import mcp_pool
+
+# Everything the first request would otherwise pay for: the compiled graph
+# (and the langgraph import behind it), the pooled MCP sessions (and the MCP
+# client import), and the OpenAI client with an open connection. The steps
+# are independent, so they run concurrently.
+
+startup_seconds = metrics.gauge("startup_seconds", "Time each warmup step took at startup")
+
+STEPS = {
+    "graph": init_graph,
+    "mcp": mcp_pool.start,
+    "openai": llm.warmup,
+}
+
+_task = None
+_done = {}
+
+
+async def _step(name: str, fn):
+    start = time.perf_counter()
+    try:
+        await fn()
+        _done[name] = "ok"
+    except Exception as e:
+        _done[name] = f"{type(e).__name__}: {e}"
+        print(f"Warmup: {name} failed: {e}")
+    finally:
+        startup_seconds.set(time.perf_counter() - start, step=name)
+
+
+async def warmup():
+    start = time.perf_counter()
+    await asyncio.gather(*(_step(name, fn) for name, fn in STEPS.items()))
+    startup_seconds.set(time.perf_counter() - start, step="total")
+
+
+async def start(mode: str = WARMUP_MODE):
+    global _task
+    if mode == "blocking":
+        await warmup()
+    elif mode == "background":
+        _task = asyncio.create_task(warmup())
+
+
+async def close():
+    global _task
+    if _task is not None and not _task.done():
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+    _task = None
+
+
+def stats() -> dict:
+    return {
+        "mode": WARMUP_MODE,
+        "steps": dict(_done),
+        "seconds": {k: round(v, 3) for k, v in startup_seconds.snapshot().items()},
+    }
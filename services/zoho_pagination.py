@@ -0,0 +1,117 @@
+import asyncio
+import json
+import re
+from collections import deque
+
+from config.settings import ZOHO_PER_PAGE, ZOHO_PAGE_CONCURRENCY, ZOHO_PAGE_READ_AHEAD, ZOHO_MAX_RECORDS, ZOHO_MAX_BYTES
+
+
+_PAGE_PARAMS = re.compile(r"[?&](?:page|per_page)=[^&]*")
+
+
+def page_url(url: str, page: int, per_page: int = ZOHO_PER_PAGE) -> str:
+    # Edited as text: the criteria value is not URL-encoded, so it must not be
+    # re-parsed (a "+" in a phone number would turn into a space).
+    base = _PAGE_PARAMS.sub("", url)
+    if "?" not in base and "&" in base:
+        base = base.replace("&", "?", 1)
+    separator = "&" if "?" in base else "?"
+    return f"{base}{separator}page={page}&per_page={per_page}"
+
+
+def unwrap_page(result):
+    """(records, info) from a fetch_zoho_results payload; Zoho answers 204 with no body when nothing matches."""
+    if not isinstance(result, dict):
+        return [], {}
+    body = result.get("results", result) or {}
+    return body.get("data") or [], body.get("info") or {}
+
+
+class Page:
+    def __init__(self, number: int, records: list, info: dict, nbytes: int):
+        self.number = number
+        self.records = records
+        self.info = info
+        self.nbytes = nbytes
+
+
+class PageStats:
+    def __init__(self):
+        self.pages = 0
+        self.records = 0
+        self.bytes = 0
+        self.more_records = False
+        self.truncated = False
+        self.error = None
+
+
+async def iter_pages(fetch, url: str, stats: PageStats = None, per_page: int = ZOHO_PER_PAGE,
+                     concurrency: int = ZOHO_PAGE_CONCURRENCY, read_ahead: int = ZOHO_PAGE_READ_AHEAD,
+                     max_records: int = ZOHO_MAX_RECORDS, max_bytes: int = ZOHO_MAX_BYTES):
+    """Yield the pages of a Zoho search in order, fetching ahead concurrently.
+
+    Page n + 1 is known to exist once page n says `info.more_records`. Up to
+    `concurrency` pages are in flight at once, but none more than `read_ahead`
+    past the last page known to exist: a request cannot be taken back, and
+    each one past the end costs API quota. Nothing is fetched past
+    `max_records`. Iteration stops at the last page, at the first failed page,
+    or once `max_records`/`max_bytes` is reached; `stats` records which.
+    """
+    stats = stats if stats is not None else PageStats()
+    max_pages = max(1, -(-max_records // per_page))
+    pending = deque()
+    next_page = 1
+    known = 1  # highest page known to exist
+
+    def schedule(limit):
+        nonlocal next_page
+        while len(pending) < limit and next_page <= min(max_pages, known + read_ahead):
+            pending.append((next_page, asyncio.ensure_future(fetch(page_url(url, next_page, per_page)))))
+            next_page += 1
+
+    try:
+        schedule(1)  # the first page says whether there is more
+        while pending:
+            number, task = pending.popleft()
+            result = await task
+            if isinstance(result, dict) and result.get("error"):
+                stats.error = result
+                stats.truncated = stats.pages > 0
+                return
+
+            records, info = unwrap_page(result)
+            nbytes = len(json.dumps(records, separators=(",", ":"), default=str))
+            room = max_records - stats.records
+            if len(records) > room:
+                records = records[:room]
+                stats.truncated = True
+            if stats.bytes + nbytes > max_bytes and stats.pages > 0:
+                stats.truncated = True
+                stats.more_records = True
+                return
+
+            stats.pages += 1
+            stats.records += len(records)
+            stats.bytes += nbytes
+            stats.more_records = bool(info.get("more_records"))
+            yield Page(number, records, info, nbytes)
+
+            if not stats.more_records or not records:
+                return
+            if stats.records >= max_records or stats.bytes >= max_bytes:
+                stats.truncated = True
+                return
+            known = max(known, number + 1)
+            schedule(max(1, concurrency))
+        if stats.more_records:
+            stats.truncated = True
+    finally:
+        for _, task in pending:
+            task.cancel()
+
+
+async def iter_records(fetch, url: str, stats: PageStats = None, **kwargs):
+    """Record-at-a-time view over iter_pages."""
+    async for page in iter_pages(fetch, url, stats, **kwargs):
+        for record in page.records:
+            yield record
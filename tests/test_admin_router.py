@@ -0,0 +1,29 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routers import admin_router, debug_router
+
+
+def client(monkeypatch, enabled: bool, token: str = "") -> TestClient:
+    monkeypatch.setattr(debug_router, "DEBUG_ENDPOINTS_ENABLED", enabled)
+    monkeypatch.setattr(debug_router, "DEBUG_TOKEN", token)
+    app = FastAPI()
+    app.include_router(admin_router.router)
+    return TestClient(app)
+
+
+def test_records_invalidation_is_off_by_default(monkeypatch):
+    assert client(monkeypatch, enabled=False).post("/admin/cache/records/invalidate").status_code == 404
+
+
+def test_records_invalidation_needs_the_debug_token(monkeypatch):
+    c = client(monkeypatch, enabled=True, token="s3cret")
+    assert c.post("/admin/cache/records/invalidate").status_code == 401
+    response = c.post("/admin/cache/records/invalidate?module=Deals", headers={"X-Debug-Token": "s3cret"})
+    assert response.status_code == 200
+    assert response.json()["module"] == "Deals"
@@ -0,0 +1,47 @@
+import pytest
+
+from services.analytics import RecordTable, answer, parse_intent
+
+
+@pytest.mark.parametrize("query, module, intent", [
+    ("how many deals over 50k", "Deals", {"op": "count"}),
+    ("what is the number of contacts in Pune", "Contacts", {"op": "count"}),
+    ("total amount of closed won deals", "Deals", {"op": "sum", "metric": "Amount"}),
+    ("average deal amount for deals with probability over 50", "Deals", {"op": "avg", "metric": "Amount"}),
+    ("average employee count of leads in IT", "Leads", {"op": "avg", "metric": "No_of_Employees"}),
+    ("top 5 deals by probability", "Deals", {"op": "top", "metric": "Probability", "n": 5, "reverse": True}),
+    ("bottom 3 leads by annual revenue", "Leads", {"op": "top", "metric": "Annual_Revenue", "n": 3, "reverse": False}),
+    ("who owns the biggest deal", "Deals", {"op": "top", "metric": "Amount", "n": 1, "reverse": True}),
+    ("deals over 10k by stage", "Deals", {"op": "group", "by": "Stage", "metric": None}),
+    ("total amount of deals by stage", "Deals", {"op": "group", "by": "Stage", "metric": "Amount"}),
+    ("how many leads per owner?", "Leads", {"op": "group", "by": "Owner", "metric": None}),
+])
+def test_aggregate_questions(query, module, intent):
+    assert parse_intent(query, module) == intent
+
+
+@pytest.mark.parametrize("query, module", [
+    ("show leads with number of employees over 500", "Leads"),
+    ("deals sorted by amount, highest first", "Deals"),
+    ("deals from the biggest accounts", "Deals"),
+    ("Tell me about the biggest open deals owned by Priya", "Deals"),
+    ("leads from the top 5 trade shows", "Leads"),
+    ("list deals with a total value over 10000", "Deals"),
+    ("deals created by stage owners", "Deals"),
+    ("leads created by source", "Leads"),
+    ("deals with amount over 10000", "Deals"),
+])
+def test_filters_are_not_aggregates(query, module):
+    assert parse_intent(query, module) is None
+
+
+def test_answer_sums_over_the_table():
+    table = RecordTable.from_records([
+        {"Deal_Name": "A", "Amount": 100, "Stage": "Closed Won"},
+        {"Deal_Name": "B", "Amount": 250, "Stage": "Closed Won"},
+        {"Deal_Name": "C", "Amount": None, "Stage": "Qualification"},
+    ])
+    assert answer(table, "Deals", {"op": "sum", "metric": "Amount"}) == \
+        "The total amount across 2 matching deals is 350."
+    assert answer(table, "Deals", {"op": "top", "metric": "Amount", "n": 1, "reverse": True}) == \
+        "B has the highest amount: 250."
@@ -0,0 +1,70 @@
+import asyncio
+
+from services import agent_runner
+from services.singleflight import SingleFlight
+
+
+def fake_execute(monkeypatch, delay: float = 0.05):
+    runs = []
+
+    async def execute(query):
+        runs.append(query)
+        await asyncio.sleep(delay)
+        return {"response": f"answer to {query}", "messages": [], "tool_output": {"path": "fast_path"},
+                "trace_id": "leader"}
+
+    monkeypatch.setattr(agent_runner, "CHAT_COALESCING_ENABLED", True)
+    monkeypatch.setattr(agent_runner, "chat_flights", SingleFlight())
+    monkeypatch.setattr(agent_runner, "_execute", execute)
+    return runs
+
+
+def test_identical_queries_share_one_run(monkeypatch):
+    runs = fake_execute(monkeypatch)
+
+    async def scenario():
+        return await asyncio.gather(
+            *(agent_runner.run_agent("deals over 10k") for _ in range(5)),
+            agent_runner.run_agent("  deals over 10k "),
+            agent_runner.run_agent("leads with status Contacted"),
+        )
+
+    results = asyncio.run(scenario())
+    assert sorted(runs) == ["deals over 10k", "leads with status Contacted"]
+    assert {r["response"] for r in results[:6]} == {"answer to deals over 10k"}
+    assert agent_runner.chat_flights.stats()["followers"] == 5
+
+
+def test_cancelled_follower_does_not_stop_the_run(monkeypatch):
+    runs = fake_execute(monkeypatch)
+
+    async def scenario():
+        leader = asyncio.ensure_future(agent_runner.run_agent("deals over 10k"))
+        follower = asyncio.ensure_future(agent_runner.run_agent("deals over 10k"))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        return await leader, follower.cancelled()
+
+    result, cancelled = asyncio.run(scenario())
+    assert cancelled and result["response"] == "answer to deals over 10k"
+    assert len(runs) == 1
+
+
+def test_leader_disconnect_leaves_the_run_to_its_followers(monkeypatch):
+    runs = fake_execute(monkeypatch)
+
+    async def scenario():
+        leader = asyncio.ensure_future(agent_runner.run_agent("deals over 10k"))
+        await asyncio.sleep(0.01)
+        followers = [asyncio.ensure_future(agent_runner.run_agent("deals over 10k")) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        results = await asyncio.gather(*followers)
+        # The finished run is not reused by a later call.
+        later = await agent_runner.run_agent("deals over 10k")
+        return results, later
+
+    results, later = asyncio.run(scenario())
+    assert [r["response"] for r in results] == ["answer to deals over 10k"] * 2
+    assert later["response"] == "answer to deals over 10k"
+    assert len(runs) == 2
@@ -0,0 +1,76 @@
+from model.filter import Filter, Operator, Value
+from services.coql import build_coql, build_condition, parse_aggregate
+
+
+def f(key, op, value):
+    return Filter(key=key, value=Value(operator=op, value=value))
+
+
+def test_numbers_are_plain_decimals():
+    assert build_condition(f("Amount", Operator.greater_than, 1e16)) == "Amount > 10000000000000000"
+    assert build_condition(f("Probability", Operator.less_than, 2.5e-7)) == "Probability < 0.00000025"
+    assert build_condition(f("Amount", Operator.between, [1000, 2500])) == "Amount between 1000 and 2500"
+    assert build_coql("Deals", [f("Amount", Operator.greater_equal, 1e20)], {"op": "count"}) == (
+        "select COUNT(id) from Deals where Amount >= 100000000000000000000"
+    )
+
+
+def test_count_with_nested_conditions():
+    filters = [
+        f("Amount", Operator.greater_than, 10000),
+        f("Stage", Operator.equals, "Closed Won"),
+        f("Deal_Name", Operator.starts_with, "Acme"),
+    ]
+    assert build_coql("Deals", filters, {"op": "count"}) == (
+        "select COUNT(id) from Deals where ((Amount > 10000 and Stage = 'Closed Won') and Deal_Name like 'Acme%')"
+    )
+
+
+def test_sum_avg_and_group():
+    filters = [f("Lead_Source", Operator.in_, ["Referral", "Website"])]
+    assert build_coql("Deals", filters, {"op": "sum", "metric": "Amount"}) == (
+        "select COUNT(Amount), SUM(Amount) from Deals where Lead_Source in ('Referral', 'Website')"
+    )
+    assert build_coql("Deals", filters, {"op": "group", "by": "Stage", "metric": "Amount"}) == (
+        "select Stage, COUNT(id), SUM(Amount) from Deals where Lead_Source in ('Referral', 'Website') "
+        "group by Stage limit 2000"
+    )
+
+
+def test_values_are_quoted_safely():
+    assert build_condition(f("Company", Operator.equals, "O'Brien \\ Co")) == "Company = 'O\\'Brien \\\\ Co'"
+
+
+def test_what_coql_cannot_express_stays_on_the_search_path():
+    amount = f("Amount", Operator.greater_than, 10000)
+    assert build_coql("Deals", [], {"op": "count"}) is None
+    assert build_coql("Deals", [amount], {"op": "top", "metric": "Amount"}) is None
+    assert build_coql("Deals", [amount], None) is None
+    assert build_coql("Deals", [amount, f("Owner", Operator.equals, "Priya Shah")], {"op": "count"}) is None
+    assert build_coql("Deals", [amount], {"op": "group", "by": "Owner", "metric": None}) is None
+    assert build_coql("Deals", [amount], {"op": "sum", "metric": "Amount; drop"}) is None
+    assert build_coql("Deals", [f("Amount) or (1", Operator.equals, 1)], {"op": "count"}) is None
+
+
+def test_parse_count_and_sum():
+    assert parse_aggregate({"results": {"data": [{"COUNT(id)": 42}]}}, {"op": "count"}) == {"count": 42, "sum": None}
+    result = {"results": {"data": [{"COUNT(Amount)": 3, "SUM(Amount)": 45000}]}}
+    assert parse_aggregate(result, {"op": "sum", "metric": "Amount"}) == {"count": 3, "sum": 45000.0}
+
+
+def test_parse_group_orders_by_count():
+    rows = [
+        {"Stage": "Qualification", "COUNT(id)": 2, "SUM(Amount)": 300},
+        {"Stage": None, "COUNT(id)": 1, "SUM(Amount)": 50},
+        {"Stage": "Closed Won", "COUNT(id)": 5, "SUM(Amount)": 9000},
+    ]
+    parsed = parse_aggregate({"results": {"data": rows}}, {"op": "group", "by": "Stage", "metric": "Amount"})
+    assert parsed == {"count": 8, "groups": {"Closed Won": (5, 9000.0), "Qualification": (2, 300.0), "(none)": (1, 50.0)}}
+
+
+def test_parse_empty_error_and_unexpected():
+    assert parse_aggregate({"results": None}, {"op": "count"}) == {"count": 0, "sum": None}
+    assert parse_aggregate({"results": None}, {"op": "group", "by": "Stage"}) == {"count": 0, "groups": {}}
+    assert parse_aggregate({"error": "HTTP 400"}, {"op": "count"}) is None
+    assert parse_aggregate({"results": {"data": [{"total": 1}]}}, {"op": "count"}) is None
+    assert parse_aggregate("not json", {"op": "count"}) is None
@@ -0,0 +1,67 @@
+import asyncio
+import time
+
+import pytest
+
+from services.deadline import BudgetExhausted, run_within, scaled_budgets
+
+
+async def slow():
+    await asyncio.sleep(1)
+
+
+async def inner_timeout():
+    await asyncio.wait_for(asyncio.sleep(1), 0.01)
+
+
+def test_stage_over_budget_raises_budget_exhausted():
+    deadline = time.monotonic() + 0.05
+    with pytest.raises(BudgetExhausted):
+        asyncio.run(run_within("tools", deadline, slow()))
+
+
+def test_timeout_inside_the_stage_is_not_a_budget_overrun():
+    deadline = time.monotonic() + 5
+    with pytest.raises(asyncio.TimeoutError) as raised:
+        asyncio.run(run_within("tools", deadline, inner_timeout()))
+    assert not isinstance(raised.value, BudgetExhausted)
+
+
+def test_run_budgets_replace_the_default_ones(monkeypatch):
+    monkeypatch.setattr("services.deadline.STAGE_BUDGETS", {"tools": 0.01})
+    deadline = time.monotonic() + 5
+    with pytest.raises(BudgetExhausted):
+        asyncio.run(run_within("tools", deadline, slow()))
+    assert asyncio.run(run_within("tools", deadline, asyncio.sleep(0.05, "ok"), {"tools": 1})) == "ok"
+
+
+def test_scaled_budgets(monkeypatch):
+    monkeypatch.setattr("services.deadline.STAGE_BUDGETS", {"reasoning": 8, "tools": 15})
+    monkeypatch.setattr("services.deadline.REQUEST_DEADLINE", 30)
+    assert scaled_budgets(120) == {"reasoning": 32, "tools": 60}
+    assert scaled_budgets(0) == {"reasoning": 8, "tools": 15}
+
+
+def test_summary_stream_stops_at_its_budget_and_keeps_context(monkeypatch):
+    import contextvars
+
+    from services import agent_runner
+
+    span = contextvars.ContextVar("span", default=None)
+
+    async def tokens():
+        # Like tracer.span: set and reset in the generator, across awaits.
+        token = span.set("summary")
+        try:
+            for word in ("one ", "two ", "three "):
+                await asyncio.sleep(0.03)
+                yield word
+        finally:
+            span.reset(token)
+
+    async def relay(deadline):
+        return [t async for t in agent_runner._stream_within_budget(tokens(), deadline)]
+
+    monkeypatch.setattr(agent_runner, "stage_budget", lambda stage, deadline, budgets=None: deadline)
+    assert asyncio.run(relay(None)) == ["one ", "two ", "three "]
+    assert asyncio.run(relay(0.05)) == ["one ", None]
@@ -0,0 +1,28 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routers import debug_router
+
+
+def client(monkeypatch, enabled: bool, token: str = "") -> TestClient:
+    monkeypatch.setattr(debug_router, "DEBUG_ENDPOINTS_ENABLED", enabled)
+    monkeypatch.setattr(debug_router, "DEBUG_TOKEN", token)
+    app = FastAPI()
+    app.include_router(debug_router.router)
+    return TestClient(app)
+
+
+def test_traces_are_hidden_by_default(monkeypatch):
+    assert client(monkeypatch, enabled=False).get("/debug/traces").status_code == 404
+
+
+def test_traces_need_the_token_when_one_is_set(monkeypatch):
+    c = client(monkeypatch, enabled=True, token="s3cret")
+    assert c.get("/debug/traces").status_code == 401
+    assert c.get("/debug/traces", headers={"X-Debug-Token": "wrong"}).status_code == 401
+    assert c.get("/debug/traces", headers={"X-Debug-Token": "s3cret"}).status_code == 200
@@ -0,0 +1,51 @@
+import asyncio
+
+from model.filter import Filter, Operator, Value
+from services.filter_cache import FilterCache
+from services.shared_state import InProcessState, SqliteState
+
+FILTERS = [Filter(key="Amount", value=Value(operator=Operator.greater_than, value=10000))]
+CRITERIA = "(Amount:greater_than:10000)"
+
+
+def test_key_covers_module_query_descriptors_and_date():
+    key = FilterCache.make_key("Deals", "deals over 10k", "abc", "2026-10-18")
+    assert key == FilterCache.make_key("Deals", " deals over 10k ", "abc", "2026-10-18")
+    assert key != FilterCache.make_key("Leads", "deals over 10k", "abc", "2026-10-18")
+    assert key != FilterCache.make_key("Deals", "deals over 20k", "abc", "2026-10-18")
+    assert key != FilterCache.make_key("Deals", "deals over 10k", "abd", "2026-10-18")
+    assert key != FilterCache.make_key("Deals", "deals over 10k", "abc", "2026-10-19")
+
+
+def test_memory_tier_returns_a_copy():
+    cache = FilterCache(maxsize=8, ttl=60, store=InProcessState())
+
+    async def scenario():
+        await cache.set("k", FILTERS, CRITERIA)
+        filters, criteria = await cache.get("k")
+        filters.clear()
+        return await cache.get("k")
+
+    assert asyncio.run(scenario()) == (FILTERS, CRITERIA)
+    assert cache.stats()["shared"] is None
+
+
+def test_shared_tier_serves_another_worker(tmp_path):
+    store = SqliteState(str(tmp_path / "filters.db"))
+    writer = FilterCache(maxsize=8, ttl=60, store=store)
+    reader = FilterCache(maxsize=8, ttl=60, store=store)
+
+    async def scenario():
+        await writer.set("k", FILTERS, CRITERIA)
+        first = await reader.get("k")
+        second = await reader.get("k")
+        missing = await reader.get("other")
+        await store.close()
+        return first, second, missing
+
+    first, second, missing = asyncio.run(scenario())
+    assert first == second == (FILTERS, CRITERIA)
+    assert isinstance(first[0][0], Filter)
+    assert missing is None
+    # The second lookup came from the reader's own LRU.
+    assert reader.shared_hits == 1
@@ -0,0 +1,64 @@
+import asyncio
+
+from config.settings import JOB_DEADLINE, STAGE_BUDGETS
+from services import jobs
+from services.deadline import scaled_budgets
+from services.shared_state import InProcessState
+
+
+def run_job(monkeypatch, *events, budgets=None):
+    async def fake_stream_agent(query, deadline=None, stage_budgets=None):
+        if budgets is not None:
+            budgets.update(stage_budgets)
+        for event in events:
+            yield event
+
+    monkeypatch.setattr(jobs, "stream_agent", fake_stream_agent)
+    queue = jobs.JobQueue(workers=1, simple_workers=0, state=InProcessState())
+
+    async def scenario():
+        await queue.start()
+        job = await queue.submit("deals in stage Closed Won")
+        while (await queue.get(job["id"]))["status"] in ("queued", "running"):
+            await asyncio.sleep(0.01)
+        await queue.close()
+        return await queue.get(job["id"])
+
+    return asyncio.run(asyncio.wait_for(scenario(), 5))
+
+
+def test_done_without_tool_output_is_done(monkeypatch):
+    job = run_job(monkeypatch, {"event": "fast_path"}, {"event": "done", "response": "ok", "messages": []})
+    assert job["status"] == "done"
+    assert job["result"] == {"response": "ok", "messages": []}
+
+
+def test_jobs_run_with_scaled_stage_budgets(monkeypatch):
+    budgets = {}
+    run_job(monkeypatch, {"event": "done", "response": "ok"}, budgets=budgets)
+    assert budgets == scaled_budgets(JOB_DEADLINE)
+    assert budgets["tools"] > STAGE_BUDGETS["tools"]
+
+
+def test_error_with_null_tool_output_is_failed(monkeypatch):
+    job = run_job(monkeypatch, {"event": "error", "response": "An error occurred.", "tool_output": None})
+    assert job["status"] == "failed"
+
+
+def test_busy_answer_is_failed(monkeypatch):
+    job = run_job(monkeypatch, {"event": "done", "response": "busy", "tool_output": {"retry_after": 5}})
+    assert job["status"] == "failed"
+
+
+def test_store_failure_is_counted(monkeypatch):
+    class FailingState(InProcessState):
+        async def set(self, key, value, ttl=None):
+            if value["status"] == "cancelled":
+                raise OSError("disk full")
+            return await super().set(key, value, ttl)
+
+    queue = jobs.JobQueue(workers=1, state=FailingState())
+    before = jobs.job_errors.value(where="store", type="OSError")
+    job = {"id": "1", "lane": "simple", "status": "queued"}
+    asyncio.run(queue._finish(job, "cancelled"))
+    assert jobs.job_errors.value(where="store", type="OSError") == before + 1
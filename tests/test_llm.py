@@ -0,0 +1,42 @@
+import asyncio
+
+from services import llm
+
+
+def make_create(*delays):
+    """create() whose n-th call answers after delays[n]."""
+    calls = []
+
+    async def create():
+        delay = delays[len(calls)]
+        calls.append(delay)
+        await asyncio.sleep(delay)
+        return delay
+
+    return create
+
+
+def test_overtaken_original_is_recorded_at_cancellation(monkeypatch):
+    monkeypatch.setattr(llm, "LLM_HEDGE_DELAY", 0.05)
+    stage = "test_hedge_won"
+    result = asyncio.run(llm._hedged(stage, make_create(1.0, 0.01)))
+    assert result == 0.01
+    [sample] = llm._latencies[stage]
+    # The hedge's own 10 ms is not a sample; the original's ~60 ms so far is.
+    assert 0.05 <= sample < 0.5
+
+
+def test_original_that_wins_is_recorded_in_full(monkeypatch):
+    monkeypatch.setattr(llm, "LLM_HEDGE_DELAY", 0.02)
+    stage = "test_hedge_lost"
+    result = asyncio.run(llm._hedged(stage, make_create(0.05, 1.0)))
+    assert result == 0.05
+    [sample] = llm._latencies[stage]
+    assert 0.05 <= sample < 0.5
+
+
+def test_estimated_saving_uses_slower_samples():
+    stage = "test_saving"
+    llm._latencies[stage].extend([0.1, 0.2, 1.0, 2.0, 3.0])
+    assert llm._estimated_saving(stage, 0.5) == 2.0 - 0.5
+    assert llm._estimated_saving(stage, 5.0) == 0.0
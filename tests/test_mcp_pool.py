@@ -0,0 +1,69 @@
+import asyncio
+
+from services.mcp_pool import MCPSessionPool, pool_connects
+
+
+class ClosedResourceError(Exception):
+    pass
+
+
+class FakeSession:
+    def __init__(self, dead: bool):
+        self.dead = dead
+        self.broken = False
+        self.calls = 0
+        self.tools = {"get_filter_descriptors": None}
+
+    async def invoke(self, name, args):
+        self.calls += 1
+        if self.dead:
+            raise ClosedResourceError()
+        return "ok"
+
+    async def ping(self, timeout=5):
+        if self.dead:
+            self.broken = True
+        return not self.dead
+
+    async def close(self, timeout=5):
+        self.broken = True
+
+
+def test_retry_reconnects_a_dead_session(monkeypatch):
+    monkeypatch.setattr("services.resilience.RETRY_BASE_DELAY", 0.001)
+    sessions = [FakeSession(dead=True), FakeSession(dead=False)]
+    pool = MCPSessionPool(size=1, healthcheck_interval=0)
+
+    async def connect():
+        return sessions.pop(0)
+
+    monkeypatch.setattr(pool, "_connect", connect)
+
+    async def scenario():
+        result = await pool.invoke("get_filter_descriptors", {"question": "q"})
+        return result, pool._slots[0]
+
+    dead = sessions[0]
+    before = pool_connects.value(trigger="request", outcome="ok")
+    result, slot = asyncio.run(scenario())
+    assert result == "ok"
+    assert dead.calls == 1 and dead.broken
+    assert slot is not dead and slot.calls == 1
+    assert pool_connects.value(trigger="request", outcome="ok") == before + 1
+
+
+def test_start_counts_failed_slots_and_serves_from_the_rest(monkeypatch):
+    sessions = [FakeSession(dead=False), ConnectionError("refused")]
+    pool = MCPSessionPool(size=2, healthcheck_interval=0)
+
+    async def connect():
+        result = sessions.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(pool, "_connect", connect)
+    before = pool_connects.value(trigger="start", outcome="failed")
+    asyncio.run(pool.start())
+    assert pool_connects.value(trigger="start", outcome="failed") == before + 1
+    assert pool.connected() == 1
@@ -0,0 +1,56 @@
+from services.plan_cache import PlanCache, normalize_query
+
+PLAN = {"module": "Deals", "complexity": "simple", "semantic_query": "deals with amount greater than 10000"}
+
+
+def make_cache(**kwargs):
+    return PlanCache(maxsize=16, ttl=60, threshold=kwargs.pop("threshold", 0.9), enabled=True, **kwargs)
+
+
+def test_normalize_collapses_phrasing_and_numbers():
+    assert normalize_query("Deals over 10k!") == normalize_query("deals greater than 10,000") == "deals gt 10000"
+
+
+def test_exact_tier():
+    cache = make_cache()
+    cache.set("deals greater than 10000", "v1", PLAN)
+    assert cache.get("Deals over 10k", "v1") == PLAN
+    assert cache.stats()["exact_hits"] == 1
+
+
+def test_similarity_tier_hits_a_rephrased_query():
+    cache = make_cache()
+    cache.set("find the deals above 10000 owned by Priya", "v1", PLAN)
+    assert cache.get("deals over 10k owned by Priya", "v1") == PLAN
+    assert cache.get("deals over 10k owned by Sara", "v1") is None
+    assert cache.stats()["semantic_hits"] == 1
+
+
+def test_similarity_tier_never_crosses_numbers():
+    cache = make_cache(threshold=0.1)
+    cache.set("deals greater than 10000", "v1", PLAN)
+    assert cache.get("show deals greater than 20000", "v1") is None
+    assert cache.get("deals greater than 10000 and probability over 50", "v1") is None
+    assert cache.stats()["misses"] == 2
+
+
+def test_version_change_drops_every_entry():
+    cache = make_cache()
+    cache.set("deals greater than 10000", "docs-a:2026-10-18", PLAN)
+    assert cache.get("deals greater than 10000", "docs-a:2026-10-19") is None
+    assert cache.stats()["size"] == 0
+    # The old version does not come back either.
+    assert cache.get("deals greater than 10000", "docs-a:2026-10-18") is None
+
+
+def test_returned_plan_is_a_copy():
+    cache = make_cache()
+    cache.set("deals greater than 10000", "v1", PLAN)
+    cache.get("deals greater than 10000", "v1")["module"] = "Leads"
+    assert cache.get("deals greater than 10000", "v1")["module"] == "Deals"
+
+
+def test_disabled_cache_stores_nothing():
+    cache = PlanCache(enabled=False)
+    cache.set("deals greater than 10000", "v1", PLAN)
+    assert cache.get("deals greater than 10000", "v1") is None
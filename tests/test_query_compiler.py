@@ -0,0 +1,22 @@
+import json
+import os
+
+import pytest
+
+from services.query_compiler import compile_query
+
+CORPUS = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "query_compiler_corpus.json")
+
+with open(CORPUS) as f:
+    CASES = json.load(f)
+
+
+@pytest.mark.parametrize("case", CASES, ids=[case["query"] for case in CASES])
+def test_corpus(case):
+    compiled = compile_query(case["query"])
+    if case["expected"] is None:
+        assert compiled is None
+    else:
+        assert compiled is not None
+        got = [[f.key, f.value.operator.value, f.value.value] for f in compiled["filters"]]
+        assert {"module": compiled["module"], "filters": got} == case["expected"]
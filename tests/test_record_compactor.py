@@ -0,0 +1,43 @@
+from benchmarks.fake_zoho import make_records
+from services.record_compactor import compact_records, estimate_tokens
+
+
+def parse(text: str):
+    header, *rows = text.split("\n")
+    fields = header.split("\t")
+    return fields, [dict(zip(fields, row.split("\t"))) for row in rows]
+
+
+def test_keeps_filter_and_display_fields_only():
+    records = make_records("Deals", 20)
+    text, shown, total = compact_records(records, "Deals", filter_keys=["Lead_Source"], token_budget=10_000)
+    fields, rows = parse(text)
+    assert fields == ["Lead_Source", "Deal_Name", "Amount", "Stage", "Closing_Date", "Probability", "Account_Name", "Owner"]
+    assert (shown, total) == (20, 20)
+    assert rows[0]["Deal_Name"] == records[0]["Deal_Name"]
+    assert rows[0]["Amount"] == str(records[0]["Amount"])
+    # Lookups are shown by name.
+    assert rows[0]["Owner"] == records[0]["Owner"]["name"]
+    assert rows[0]["Account_Name"] == records[0]["Account_Name"]["name"]
+    assert "$approval" not in text and "Created_By" not in fields
+
+
+def test_over_budget_truncates_or_samples():
+    records = make_records("Leads", 300)
+    text, shown, total = compact_records(records, "Leads", token_budget=500, overflow="truncate")
+    assert total == 300 and 0 < shown < 300
+    assert estimate_tokens(text) <= 500
+    _, rows = parse(text)
+    assert [r["First_Name"] for r in rows] == [f"Lead{i}" for i in range(shown)]
+
+    text, sampled, _ = compact_records(records, "Leads", token_budget=500, overflow="sample")
+    _, rows = parse(text)
+    assert sampled == len(rows) > 0
+    assert rows[-1]["First_Name"] != f"Lead{sampled - 1}"
+
+
+def test_unknown_module_falls_back_to_record_fields():
+    records = [{"id": "1", "Name": "x", "$state": "save"}]
+    fields, rows = parse(compact_records(records, "Tasks")[0])
+    assert fields == ["Name", "id"]
+    assert rows == [{"Name": "x", "id": "1"}]
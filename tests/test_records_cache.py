@@ -0,0 +1,95 @@
+import asyncio
+
+from services.records_cache import RecordsCache, canonical_url
+from services.shared_state import SqliteState
+
+PAGE = {"results": {"data": [{"id": "1", "Amount": 20000}], "info": {"count": 1, "more_records": False}}}
+
+
+def counting_fetch(result=PAGE):
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return result
+
+    return fetch, calls
+
+
+def test_canonical_url_ignores_case_order_and_spacing():
+    a = "HTTPS://www.ZohoAPIs.com/crm/v7/Deals/search/?per_page=200&criteria=(Amount:greater_than:10000)&page=1"
+    b = "https://www.zohoapis.com/crm/v7/Deals/search?page=1&criteria=(Amount:greater_than:10000)&per_page=200 "
+    assert canonical_url(a) == canonical_url(b)
+    assert canonical_url(a) != canonical_url(b.replace("page=1", "page=2"))
+    # Criteria values are case-sensitive.
+    assert canonical_url(a) != canonical_url(a.replace("Amount", "amount"))
+
+
+def test_identical_fetches_share_one_call_and_the_cache():
+    cache = RecordsCache(max_bytes=1_000_000, ttl=60, module_ttls={})
+    fetch, calls = counting_fetch()
+    url = "https://x/crm/v7/Deals/search?criteria=(Amount:greater_than:10000)"
+
+    async def scenario():
+        results = await asyncio.gather(*(cache.fetch("Deals", url, fetch) for _ in range(5)))
+        results.append(await cache.fetch("Deals", url + "&", fetch))
+        return results
+
+    assert all(r == PAGE for r in asyncio.run(scenario()))
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_errors_and_zero_ttl_modules_are_not_cached():
+    cache = RecordsCache(max_bytes=1_000_000, ttl=60, module_ttls={"Leads": 0})
+    error_fetch, error_calls = counting_fetch({"error": "HTTP 500"})
+    fetch, calls = counting_fetch()
+
+    async def scenario():
+        for _ in range(2):
+            await cache.fetch("Deals", "https://x/a", error_fetch)
+            await cache.fetch("Leads", "https://x/b", fetch)
+
+    asyncio.run(scenario())
+    assert len(error_calls) == 2 and len(calls) == 2
+
+
+def test_byte_budget_evicts_oldest_results():
+    budget = 3 * len('{"results":{"data":[{"id":"1","Amount":20000}],"info":{"count":1,"more_records":false}}}')
+    cache = RecordsCache(max_bytes=budget, ttl=60, module_ttls={})
+    fetch, calls = counting_fetch()
+
+    async def scenario():
+        for i in range(4):
+            await cache.fetch("Deals", f"https://x/{i}", fetch)
+        await cache.fetch("Deals", "https://x/3", fetch)
+        await cache.fetch("Deals", "https://x/0", fetch)
+
+    asyncio.run(scenario())
+    stats = cache.stats()
+    assert stats["bytes"] <= budget and stats["evictions"] >= 1
+    # /3 was still cached, /0 had been evicted.
+    assert len(calls) == 5
+
+
+def test_invalidation_bumps_the_shared_generation(tmp_path):
+    store = SqliteState(str(tmp_path / "records.db"))
+    worker_a = RecordsCache(max_bytes=1_000_000, ttl=60, module_ttls={}, store=store)
+    worker_b = RecordsCache(max_bytes=1_000_000, ttl=60, module_ttls={}, store=store)
+    fetch, calls = counting_fetch()
+    url = "https://x/crm/v7/Deals/search?criteria=(Stage:equals:Closed Won)"
+
+    async def scenario():
+        await worker_a.fetch("Deals", url, fetch)
+        await worker_b.fetch("Deals", url, fetch)
+        assert worker_b.shared_hits == 1 and len(calls) == 1
+
+        assert await worker_a.invalidate_module("deals") == 1
+        # Worker C has no in-memory copy; the old shared entry no longer matches.
+        worker_c = RecordsCache(max_bytes=1_000_000, ttl=60, module_ttls={}, store=store)
+        await worker_c.fetch("Deals", url, fetch)
+        assert worker_c.shared_hits == 0 and len(calls) == 2
+        await store.close()
+
+    asyncio.run(scenario())
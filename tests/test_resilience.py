@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from services import resilience
+from services.resilience import AdaptiveLimiter, Backend, CircuitBreaker
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_limiter_grows_additively_on_healthy_calls():
+    limiter = AdaptiveLimiter(max_limit=10, clock=Clock())
+    limiter.limit = 4.0
+
+    async def scenario():
+        for _ in range(4):
+            await limiter.acquire()
+            limiter.release(0.1, "ok")
+
+    asyncio.run(scenario())
+    # +1/limit per call: four calls at limit ~4 add about one slot.
+    assert 4.9 < limiter.limit < 5.0
+    assert limiter.capacity() == 4
+
+
+def test_limiter_halves_on_drop_at_most_once_per_baseline():
+    clock = Clock()
+    limiter = AdaptiveLimiter(max_limit=16, clock=clock)
+
+    async def scenario():
+        await limiter.acquire()
+        limiter.release(0.2, "ok")
+        for _ in range(3):
+            await limiter.acquire()
+            limiter.release(0.2, "dropped")
+        assert limiter.capacity() == 8
+        clock.now += 0.5
+        await limiter.acquire()
+        limiter.release(0.2, "dropped")
+        assert limiter.capacity() == 4
+
+    asyncio.run(scenario())
+
+
+def test_limiter_backs_off_on_rising_latency_and_never_below_min():
+    clock = Clock()
+    limiter = AdaptiveLimiter(max_limit=10, min_limit=2, tolerance=2.0, clock=clock)
+
+    async def scenario():
+        await limiter.acquire()
+        limiter.release(0.1, "ok")
+        for _ in range(30):
+            clock.now += 1
+            await limiter.acquire()
+            limiter.release(1.0, "ok")
+
+    asyncio.run(scenario())
+    assert limiter.capacity() == 2
+
+
+def test_limiter_queue_full_and_timeout():
+    limiter = AdaptiveLimiter(max_limit=1, queue_timeout=0.01, queue_max=1, clock=Clock())
+
+    async def scenario():
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(OverflowError):
+            await limiter.acquire()
+        with pytest.raises(asyncio.TimeoutError):
+            await waiter
+        assert limiter.waiting() == 0 and limiter.in_flight == 1
+
+    asyncio.run(scenario())
+
+
+def test_breaker_open_half_open_closed():
+    clock = Clock()
+    breaker = CircuitBreaker(failures=2, cooldown=10, clock=clock)
+    breaker.failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.failure()
+    assert breaker.state == "open" and breaker.is_open() and not breaker.allow()
+    assert breaker.retry_after() == 10
+
+    clock.now += 10
+    assert breaker.allow() and breaker.state == "half_open"
+    assert not breaker.allow()  # one probe at a time
+    breaker.success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_breaker_reopens_when_probe_fails():
+    clock = Clock()
+    breaker = CircuitBreaker(failures=1, cooldown=5, clock=clock)
+    breaker.failure()
+    clock.now += 5
+    assert breaker.allow()
+    breaker.failure()
+    assert breaker.state == "open" and breaker.retry_after() == 5
+
+
+def test_shed_reason(monkeypatch):
+    clock = Clock()
+    mcp, zoho = Backend("mcp", 4), Backend("zoho", 4)
+    mcp.breaker = CircuitBreaker(failures=1, cooldown=15, clock=clock)
+    monkeypatch.setattr(resilience, "backends", {"mcp": mcp, "zoho": zoho, "openai": Backend("openai", 4)})
+    assert resilience.shed_reason() is None
+
+    zoho.limiter.queue_max = 0
+    assert resilience.shed_reason() == ("zoho is overloaded", zoho.limiter.queue_timeout)
+
+    mcp.breaker.failure()
+    assert resilience.shed_reason() == ("mcp is unavailable", 15)
+    clock.now += 15
+    zoho.limiter.queue_max = 1
+    assert resilience.shed_reason() is None
@@ -0,0 +1,58 @@
+import asyncio
+
+from services.shared_state import InProcessState, SqliteState, create_state
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_sqlite_purge_removes_only_expired_rows(tmp_path):
+    clock = Clock()
+    state = SqliteState(str(tmp_path / "state.db"), clock=clock)
+
+    async def scenario():
+        await state.set("short", 1, ttl=10)
+        await state.set("long", 2, ttl=100)
+        await state.set("forever", 3)
+        clock.now += 50
+        assert state.purge_expired() == 1
+        rows = {key for (key,) in state._conn.execute("SELECT key FROM shared_state")}
+        assert rows == {"long", "forever"}
+        await state.close()
+
+    asyncio.run(scenario())
+
+
+def test_purge_runs_periodically_once_started():
+    clock = Clock()
+    state = InProcessState(clock=clock)
+
+    async def scenario():
+        await state.set("job:1", {"status": "done"}, ttl=10)
+        await state.start(interval=0.01)
+        clock.now += 20
+        await asyncio.sleep(0.05)
+        assert "job:1" not in state._data
+        await state.close()
+        assert state._purger is None
+
+    asyncio.run(scenario())
+
+
+def test_sqlite_file_is_created_on_first_use(tmp_path):
+    path = tmp_path / "sub" / "state.db"
+    state = create_state(f"sqlite:///{path}")
+    assert not path.exists()
+
+    async def scenario():
+        await state.set("k", 1)
+        assert await state.get("k") == 1
+        await state.close()
+
+    asyncio.run(scenario())
+    assert path.exists()
@@ -0,0 +1,35 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from config.settings import SPECULATION_CANDIDATES
+from langgraph import graph_agent
+from services.query_router import rank_modules
+
+QUERY = "Which deals from referrals are most likely to close soon?"
+
+
+def completion(content: str):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def test_descriptors_only_for_the_likeliest_modules(monkeypatch):
+    fetched = []
+
+    async def fetch_descriptors(query, module, complexity):
+        fetched.append(module)
+        return {"pinecone_results": [], "descriptors": f"{module} fields", "format_instructions": "JSON"}
+
+    async def chat(stage, **kwargs):
+        return completion(json.dumps({
+            "module": "Deals", "semantic_query": QUERY,
+            "filters": [{"key": "Lead_Source", "value": {"operator": "equals", "value": "Referral"}}],
+        }))
+
+    monkeypatch.setattr(graph_agent, "fetch_descriptors", fetch_descriptors)
+    monkeypatch.setattr(graph_agent.llm, "chat", chat)
+    planning = asyncio.run(graph_agent.plan_and_filter_step(QUERY))
+
+    assert sorted(fetched) == sorted(rank_modules(QUERY)[:SPECULATION_CANDIDATES])
+    assert len(fetched) < len(graph_agent.MODULE_DOCS)
+    assert planning["module"] == "Deals" and planning["path"] == "single_shot"
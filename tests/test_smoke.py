@@ -0,0 +1,56 @@
+"""End to end: `uvicorn main:app` against the fakes in benchmarks/ (OpenAI, MCP, Zoho).
+
+Run from the repo root:
+    python -m pytest tests/test_smoke.py
+"""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("uvicorn")
+pytest.importorskip("mcp")
+httpx = pytest.importorskip("httpx")
+
+from benchmarks.bench_load import start_stack, stop_stack
+
+
+@pytest.fixture(scope="module")
+def app():
+    args = SimpleNamespace(records=200, zoho_latency=0.01, mcp_latency=0.01, coql=False, llm_latency=0.02,
+                           llm_per_token=0.0, warm=False, workers=1)
+    processes, port = start_stack(args)
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+            yield client
+    finally:
+        stop_stack(processes)
+
+
+@pytest.mark.parametrize("query, paths", [
+    ("deals in stage Closed Won", {"fast_path"}),
+    # Planned by the (fake) LLM.
+    ("Which deals from referrals are most likely to close soon and who owns them?", {"single_shot", "two_step"}),
+])
+def test_chat_answers_from_records(app, query, paths):
+    response = app.post("/chat", json={"query": query})
+    assert response.status_code == 200
+    body = response.json()
+    tool_output = body["tool_output"]
+    assert "error" not in tool_output
+    assert tool_output["path"] in paths
+    assert tool_output["records_response"]["results"]["info"]["count"] > 0
+    assert body["response"]
+
+
+def test_chat_stream_ends_with_done(app):
+    with app.stream("POST", "/chat/stream", json={"query": "deals with amount greater than 1000"}) as response:
+        assert response.status_code == 200
+        events = [json.loads(line) for line in response.iter_lines() if line]
+    assert [e["event"] for e in events][:2] == ["fast_path", "tools"]
+    assert events[-1]["event"] == "done"
+    assert events[-1]["response"] == "".join(e["text"] for e in events if e["event"] == "token")
+
+
+def test_warmup_steps_succeed(app):
+    assert app.get("/admin/stats").json()["startup"]["steps"] == {"graph": "ok", "mcp": "ok", "openai": "ok"}
@@ -0,0 +1,59 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from langgraph import graph_agent
+from services.filter_cache import FilterCache
+from services.shared_state import InProcessState
+from services.speculation import DescriptorSpeculation
+from services.tracing import Tracer
+
+QUERY = "Which referral deals over 10k close soon?"
+SEMANTIC = "Deals with Lead_Source Referral and Amount greater than 10000"
+DESCRIPTORS = {"pinecone_results": [], "descriptors": "Deals fields", "format_instructions": "JSON"}
+
+
+def completion(content: str):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def test_unprefetched_descriptors_use_the_users_query(monkeypatch):
+    questions = []
+
+    async def invoke(name, args):
+        questions.append(args["question"])
+        return json.dumps(DESCRIPTORS)
+
+    async def chat(stage, **kwargs):
+        return completion(json.dumps({"filters": [{"key": "Amount", "value": {"operator": "greater_than", "value": 10000}}]}))
+
+    monkeypatch.setattr(graph_agent.mcp_pool, "invoke", invoke)
+    monkeypatch.setattr(graph_agent.llm, "chat", chat)
+    monkeypatch.setattr(graph_agent, "filter_cache", FilterCache(maxsize=8, ttl=60, store=InProcessState()))
+    constructed = asyncio.run(graph_agent.construct_filters(
+        SEMANTIC, "Deals", "simple", "2026-10-18", None, descriptor_query=QUERY,
+    ))
+
+    # Speculation can only ever see QUERY, so the fallback looks it up too.
+    assert questions == [QUERY]
+    assert constructed["criteria"] == "(Amount:greater_than:10000)"
+
+
+def test_failed_prefetch_is_a_traced_miss(monkeypatch):
+    tracer = Tracer(enabled=True, sample_rate=0)
+    monkeypatch.setattr("services.speculation.tracer", tracer)
+
+    async def fetch(module, complexity):
+        raise ConnectionError("stream closed")
+
+    async def scenario():
+        with tracer.trace("chat") as trace:
+            speculation = DescriptorSpeculation(fetch, ["Deals", "Leads"], "simple")
+            result = await speculation.resolve("Deals", "simple")
+        return result, trace
+
+    result, trace = asyncio.run(scenario())
+    assert result is None
+    [(_, message, attrs)] = trace.root.events
+    assert message == "speculation_error"
+    assert attrs == {"type": "ConnectionError", "error": "stream closed"}
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from services import token_manager as token_module
+from services.shared_state import InProcessState
+from services.token_manager import TOKEN_KEY, TokenManager, TokenRefreshError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeOAuth:
+    """Stands in for the httpx client: answers refresh grants after a short delay."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.posts = 0
+
+    async def post(self, url, data):
+        self.posts += 1
+        await asyncio.sleep(0.05)
+        body = {"error": "invalid_code"} if self.fail else {"access_token": f"access-{self.posts}", "expires_in": 3600}
+        return type("Response", (), {"status_code": 200, "json": lambda self: body})()
+
+
+def make_manager(store, clock, oauth, tmp_path):
+    manager = TokenManager(store=store, legacy_path=str(tmp_path / "none.json"), client_id="id",
+                           client_secret="secret", refresh_margin=300, clock=clock)
+    manager._http = oauth
+    return manager
+
+
+async def expired_token(store, clock):
+    await store.set(TOKEN_KEY, {"access_token": "old", "refresh_token": "r", "expires_in": 3600,
+                                "timestamp": int(clock.now) - 3500})
+
+
+def test_concurrent_callers_share_one_refresh(tmp_path):
+    store, clock, oauth = InProcessState(), Clock(), FakeOAuth()
+    manager = make_manager(store, clock, oauth, tmp_path)
+
+    async def scenario():
+        await expired_token(store, clock)
+        return await asyncio.gather(*(manager.get() for _ in range(10)))
+
+    tokens = asyncio.run(scenario())
+    assert oauth.posts == 1
+    assert {t["access_token"] for t in tokens} == {"access-1"}
+    assert tokens[0]["refresh_token"] == "r"
+    assert manager.refreshes == 1
+
+
+def test_waiting_worker_reads_the_token_the_lock_holder_wrote(tmp_path):
+    store, clock = InProcessState(), Clock()
+    # Two workers: separate managers and HTTP clients, one shared store.
+    first_oauth, second_oauth = FakeOAuth(), FakeOAuth()
+    first = make_manager(store, clock, first_oauth, tmp_path)
+    second = make_manager(store, clock, second_oauth, tmp_path)
+
+    async def scenario():
+        await expired_token(store, clock)
+        return await asyncio.gather(first.refresh(), second.refresh())
+
+    a, b = asyncio.run(scenario())
+    assert first_oauth.posts + second_oauth.posts == 1
+    assert a["access_token"] == b["access_token"]
+    assert first.refreshes + second.refreshes == 1
+
+
+def test_failed_refresh_keeps_a_token_that_has_not_expired(tmp_path):
+    store, clock = InProcessState(), Clock()
+    manager = make_manager(store, clock, FakeOAuth(fail=True), tmp_path)
+    before = token_module.token_refreshes.value(outcome="failed")
+
+    async def scenario():
+        await expired_token(store, clock)
+        assert (await manager.get())["access_token"] == "old"
+        clock.now += 200
+        with pytest.raises(TokenRefreshError):
+            await manager.get()
+
+    asyncio.run(scenario())
+    assert token_module.token_refreshes.value(outcome="failed") == before + 2
+    assert "invalid_code" in manager.last_error
@@ -0,0 +1,21 @@
+from services.tracing import Tracer
+
+
+def test_captures_without_a_flush_task_are_bounded():
+    tracer = Tracer(enabled=True, sample_rate=1, buffer_size=2, capture_queue_size=3, export_path="")
+    for n in range(10):
+        with tracer.trace("chat") as trace:
+            tracer.capture("prompt", f"prompt {n}")
+
+    assert len(tracer._captures) == 3
+    # The newest captures are kept and still land on their spans when read.
+    assert tracer.get(trace.id)["spans"][0]["payloads"] == {"prompt": "prompt 9"}
+    assert len(tracer.recent()) == 2
+
+
+def test_unexported_traces_are_bounded_like_the_buffer(tmp_path):
+    tracer = Tracer(enabled=True, sample_rate=0, buffer_size=2, export_path=str(tmp_path / "traces.jsonl"))
+    for _ in range(10):
+        with tracer.trace("chat"):
+            pass
+    assert len(tracer._finished) == 2
@@ -0,0 +1,91 @@
+"""services.zoho_pagination against benchmarks.fake_zoho over real HTTP."""
+import asyncio
+import json
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from benchmarks.fake_zoho import FakeZoho, matches_criteria
+from services.zoho_pagination import PageStats, iter_pages
+
+
+@pytest.fixture(scope="module")
+def zoho():
+    server = FakeZoho(records=450, latency=0).start()
+    yield server
+    server.stop()
+
+
+def _get(url: str):
+    try:
+        with urllib.request.urlopen(url.replace(" ", "%20")) as response:
+            body = response.read()
+    except urllib.error.HTTPError as e:
+        return {"error": f"HTTP {e.code}"}
+    return {"results": json.loads(body) if body else None}
+
+
+async def fetch(url: str):
+    return await asyncio.to_thread(_get, url)
+
+
+def read_all(url: str, **kwargs):
+    async def scenario():
+        stats = PageStats()
+        pages = [page async for page in iter_pages(fetch, url, stats, **kwargs)]
+        return pages, stats
+
+    return asyncio.run(scenario())
+
+
+def test_stops_at_last_page(zoho):
+    before = zoho.requests
+    pages, stats = read_all(f"{zoho.url}/crm/v7/Deals/search?criteria=(Amount:greater_than:0)",
+                            per_page=200, concurrency=1, max_records=10_000)
+    assert [p.number for p in pages] == [1, 2, 3]
+    assert [p.info["more_records"] for p in pages] == [True, True, False]
+    assert zoho.requests - before == 3
+    assert stats.records == 450 and not stats.more_records and not stats.truncated
+
+
+@pytest.mark.parametrize("read_ahead", [0, 1, 3])
+def test_read_ahead_bounds_requests_past_the_last_page(zoho, read_ahead):
+    before = zoho.requests
+    pages, stats = read_all(f"{zoho.url}/crm/v7/Deals/search?criteria=(Amount:greater_than:0)",
+                            per_page=100, concurrency=8, read_ahead=read_ahead, max_records=10_000)
+    time.sleep(0.1)  # requests already sent for later pages still reach the server
+    assert len(pages) == 5 and not stats.truncated
+    sent = zoho.requests - before
+    assert 5 <= sent <= 5 + read_ahead
+    if read_ahead == 0:
+        assert sent == 5
+
+
+def test_concurrent_pages_keep_order(zoho):
+    criteria = "(Stage:equals:Closed Won)"
+    expected = [r["id"] for r in zoho.data["Deals"] if matches_criteria(r, criteria)]
+    pages, stats = read_all(f"{zoho.url}/crm/v7/Deals/search?criteria={criteria}",
+                            per_page=20, concurrency=4, read_ahead=3, max_records=10_000)
+    assert [r["id"] for p in pages for r in p.records] == expected
+    assert not stats.truncated and stats.error is None
+
+
+def test_record_cap_truncates(zoho):
+    pages, stats = read_all(f"{zoho.url}/crm/v7/Deals/search?criteria=(Amount:greater_than:0)",
+                            per_page=200, max_records=250)
+    assert sum(len(p.records) for p in pages) == 250
+    assert stats.truncated
+
+
+def test_no_match_is_one_empty_page(zoho):
+    pages, stats = read_all(f"{zoho.url}/crm/v7/Deals/search?criteria=(Amount:less_than:0)")
+    assert [p.records for p in pages] == [[]]
+    assert not stats.truncated and stats.error is None
+
+
+def test_error_page_stops(zoho):
+    pages, stats = read_all(f"{zoho.url}/crm/v7/Nope/search?criteria=(Amount:greater_than:0)")
+    assert pages == []
+    assert stats.error == {"error": "HTTP 404"}